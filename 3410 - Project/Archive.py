@@ -0,0 +1,245 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import mmap
+import os
+import struct
+import sys
+
+
+class Archive:
+
+    # File signature and format version, checked before anything else is read
+    MAGIC = b"FLYARCH\x00"
+    VERSION = 2
+
+    # magic, version, byte order (0 little, 1 big), section count, size and mtime_ns of the source JSON file (0, 0 if none)
+    HEADER = struct.Struct("<8sHBxIQQ")
+
+    # Offset and length in bytes of one section, and the array typecode of its items
+    SECTION = struct.Struct("<QQc7x")
+
+    # Typecodes a section may have (those of array.array)
+    TYPECODES = {c.encode("ascii") for c in "bBhHiIlLqQfd"}
+
+    # Every section starts on a multiple of this, so typed views over the mapped file are aligned
+    ALIGN = 8
+
+    def __init__(self, filename="flybase.arc"):
+        """
+        Initializes a flight archive file: a list of typed arrays ("sections") laid out so that the file
+        can be memory-mapped and read in place. The layout is:
+
+            header      magic, version, byte order, section count, size and mtime_ns of the source JSON file
+            directory   per section its offset, its length in bytes and its array typecode
+            sections    the raw items of every array, in the machine's byte order, each 8-byte aligned
+
+        What each section holds is up to the caller (see ColumnarRepository.saveArchive and MappedRepository).
+
+        Parameters:
+            filename (str): The path of the archive file
+
+        Returns:
+            None
+        """
+
+        self.filename = filename
+
+    def source(self):
+        """
+        Retrieves the size and modification time of the JSON file the archive was made from.
+
+        Returns:
+            tuple[int, int] or None: (size, mtime_ns), or None if the archive is missing or unreadable
+        """
+
+        try:
+
+            with open(self.filename, "rb") as f:
+
+                magic, version, _, _, size, mtime_ns = self.HEADER.unpack(f.read(self.HEADER.size))
+
+        except (FileNotFoundError, struct.error):
+
+            return None
+
+        if magic != self.MAGIC or version != self.VERSION:
+
+            return None
+
+        return (size, mtime_ns)
+
+    def matches(self, source):
+        """
+        Checks whether the archive was made from the current contents of a JSON file.
+
+        Parameters:
+            source (str): The path of the JSON file
+
+        Returns:
+            bool: True if the archive records that file's current size and modification time
+        """
+
+        try:
+
+            st = os.stat(source)
+
+        except FileNotFoundError:
+
+            return False
+
+        return self.source() == (st.st_size, st.st_mtime_ns)
+
+    def write(self, sections, source=None):
+        """
+        Atomically writes the sections to the archive file, through a temporary file renamed over it.
+
+        Parameters:
+            sections (list): The arrays to write (array.array, memoryview, bytes, ...), in order
+            source (str or None): The JSON file the data was loaded from, whose size and mtime are recorded
+
+        Returns:
+            None
+        """
+
+        views = [memoryview(s) for s in sections]
+
+        st = os.stat(source) if source is not None else None
+
+        directory = []
+        pos = self._aligned(self.HEADER.size + len(views) * self.SECTION.size)
+
+        for view in views:
+
+            directory.append((pos, view.nbytes, view.format.encode("ascii")))
+
+            pos = self._aligned(pos + view.nbytes)
+
+        tmp = self.filename + ".tmp"
+
+        with open(tmp, "wb") as f:
+
+            f.write(self.HEADER.pack(
+
+                self.MAGIC, self.VERSION, sys.byteorder == "big", len(views),
+                st.st_size if st else 0, st.st_mtime_ns if st else 0
+
+            ))
+
+            for entry in directory:
+
+                f.write(self.SECTION.pack(*entry))
+
+            for view, (offset, _, _) in zip(views, directory):
+
+                f.write(bytes(offset - f.tell()))
+                f.write(view.cast("B"))
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, self.filename)
+
+    def open(self):
+        """
+        Memory-maps the archive file read-only. Nothing is copied or decoded: every section is a typed
+        memoryview over the mapped pages, which the OS reads in as they are touched.
+
+        Returns:
+            tuple[mmap.mmap, list[memoryview]]: The mapping (close it once the views are dropped), and the sections
+
+        Raises:
+            FileNotFoundError: If the archive does not exist
+            ValueError: If the file is not an archive, has another version or byte order, or is truncated
+        """
+
+        with open(self.filename, "rb") as f:
+
+            size = os.fstat(f.fileno()).st_size
+
+            if size < self.HEADER.size:
+
+                raise ValueError(f"{self.filename} is not a flight archive.")
+
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+
+            return mapped, self._sections(mapped)
+
+        except BaseException:
+
+            mapped.close()
+
+            raise
+
+    def _sections(self, mapped):
+        """
+        Checks the header and directory of a mapped archive and builds a view over every section.
+
+        Parameters:
+            mapped (mmap.mmap): The mapped archive file
+
+        Returns:
+            list[memoryview]: The sections, in order
+
+        Raises:
+            ValueError: If the header or directory is not valid for this file
+        """
+
+        magic, version, big_endian, count, _, _ = self.HEADER.unpack_from(mapped, 0)
+
+        if magic != self.MAGIC:
+
+            raise ValueError(f"{self.filename} is not a flight archive.")
+
+        if version != self.VERSION:
+
+            raise ValueError(f"{self.filename} is archive version {version}, expected {self.VERSION}.")
+
+        if bool(big_endian) != (sys.byteorder == "big"):
+
+            raise ValueError(f"{self.filename} was written on a machine with the other byte order.")
+
+        if self.HEADER.size + count * self.SECTION.size > len(mapped):
+
+            raise ValueError(f"{self.filename} is truncated: the section directory is cut short.")
+
+        entries = [
+
+            self.SECTION.unpack_from(mapped, self.HEADER.size + i * self.SECTION.size) for i in range(count)
+
+        ]
+
+        # Everything is checked before the first view is taken, so a bad file leaves no view pinning the mapping
+        for offset, length, typecode in entries:
+
+            if offset + length > len(mapped):
+
+                raise ValueError(f"{self.filename} is truncated: expected {offset + length} bytes, found {len(mapped)}.")
+
+            if typecode not in self.TYPECODES or length % struct.calcsize(typecode.decode("ascii")):
+
+                raise ValueError(f"{self.filename} has a corrupt section directory.")
+
+        whole = memoryview(mapped)
+
+        sections = [whole[offset:offset + length].cast(typecode.decode("ascii")) for offset, length, typecode in entries]
+
+        whole.release()
+
+        return sections
+
+    def _aligned(self, pos):
+        """
+        Rounds a file position up to the next section boundary.
+
+        Parameters:
+            pos (int): The position
+
+        Returns:
+            int: The first multiple of ALIGN at or after pos
+        """
+
+        return -(-pos // self.ALIGN) * self.ALIGN
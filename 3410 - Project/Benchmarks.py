@@ -0,0 +1,872 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+# Standalone benchmarks, run with e.g. "python Benchmarks.py bulk 100000 1000000"
+
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import threading
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from Client import Client
+from ColumnarRepository import ColumnarRepository
+from ConcurrentRepository import ConcurrentRepository
+from LazyRepository import LazyRepository
+from MappedRepository import MappedRepository
+from PartitionedRepository import PartitionedRepository
+from Repository import DATE_FORMAT, Repository, parseDate
+from Server import Server
+
+
+def makeRecords(n, seed=3410, invalid_every=0):
+    """
+    Generates n unique synthetic flight records.
+
+    Parameters:
+        n (int): The number of records to generate
+        seed (int): The random seed, so runs are repeatable
+        invalid_every (int): Give every invalid_every-th record a bad pilotID (0 for all valid)
+
+    Returns:
+        iterator[dict]: The generated records
+    """
+
+    rnd = random.Random(seed)
+
+    airlines = ["Air Canada", "WestJet", "CargoJet", "Porter", "RCAF", "Flair"]
+    models = ["A320", "B737", "767F", "Q400", "CC-130", "A220"]
+    airports = ["YHZ", "YYZ", "YVR", "YUL", "YYC", "YOW", "YHM", "YWG"]
+    missions = ["Training", "Patrol", "Transport", "Search and Rescue"]
+
+    # A realistic fleet and roster, much smaller than the number of flights
+    pilots = [f"{rnd.choice('ABCDEFGH')}{rnd.choice('WXYZ')}{p:04d}" for p in range(2000)]
+    aircraft = [f"AC{a:04d}" for a in range(1000)]
+
+    for i in range(n):
+
+        ft = rnd.choice(["public", "private", "cargo", "military"])
+
+        day, month, year = rnd.randint(1, 28), rnd.randint(1, 12), rnd.randint(2015, 2025)
+        hour = rnd.randint(0, 20)
+
+        # Schedules run on a 5-minute grid
+        dep_min, arr_min = 5 * rnd.randint(0, 11), 5 * rnd.randint(0, 11)
+
+        rec = {
+
+            "flightID": f"FLT{i:06d}",
+            "flightType": ft,
+            "pilotID": rnd.choice(pilots),
+            "airline": rnd.choice(airlines),
+            "departureDate": f"{hour:02d}:{dep_min:02d} {day:02d}/{month:02d}/{year}",
+            "departureLocation": rnd.choice(airports),
+            "arrivalDate": f"{hour + 3:02d}:{arr_min:02d} {day:02d}/{month:02d}/{year}",
+            "arrivalLocation": rnd.choice(airports),
+            "aircraftID": rnd.choice(aircraft),
+            "aircraftModel": rnd.choice(models)
+
+        }
+
+        if ft == "public":
+
+            rec["passengers"] = rnd.randint(20, 300)
+
+        elif ft == "cargo":
+
+            rec["cargoWeight"] = round(rnd.uniform(1, 60), 1)
+
+        elif ft == "military":
+
+            rec["mission"] = rnd.choice(missions)
+
+        if invalid_every and i % invalid_every == 0:
+
+            rec["pilotID"] = "BAD"
+
+        yield rec
+
+
+def benchMemory(n):
+    """
+    Compares the memory held by the dict and columnar backends after loading n records,
+    and times a few Server statistics on each.
+
+    Parameters:
+        n (int): The number of records to load
+
+    Returns:
+        None
+    """
+
+    print(f"=== Memory benchmark, {n} records ===")
+
+    for backend in (Repository, ColumnarRepository):
+
+        tracemalloc.start()
+
+        repo = backend()
+
+        for rec in makeRecords(n):
+
+            repo.insert(rec)
+
+        current, peak = tracemalloc.get_traced_memory()
+
+        tracemalloc.stop()
+
+        server = Server(repo)
+
+        start = time.perf_counter()
+
+        server.airlineYear("Air Canada", "2020")
+        server.flightsByType("cargo")
+        server.avgPassengers("A320")
+        server.avgCargo("767F")
+
+        elapsed = time.perf_counter() - start
+
+        print(f"{backend.__name__:20} {current / 2**20:9.1f} MiB held  "
+              f"{current / n:7.1f} B/record  {peak / 2**20:9.1f} MiB peak  "
+              f"stats {elapsed * 1000:8.1f} ms")
+
+
+def benchBulk(n):
+    """
+    Compares loading n records (5% invalid) with one insert call per record against one insert_many call.
+
+    Parameters:
+        n (int): The number of records to load
+
+    Returns:
+        None
+    """
+
+    print(f"=== Bulk insert benchmark, {n} records ===")
+
+    records = list(makeRecords(n, invalid_every=20))
+
+    repo = Repository()
+
+    start = time.perf_counter()
+
+    # insert prints every failure; keep that cost but not the terminal output
+    with contextlib.redirect_stdout(io.StringIO()):
+
+        accepted = sum(repo.insert(dict(rec)) for rec in records)
+
+    serial = time.perf_counter() - start
+
+    repo = Repository()
+
+    start = time.perf_counter()
+
+    report = repo.insert_many(dict(rec) for rec in records)
+
+    bulk = time.perf_counter() - start
+
+    print(f"insert loop   {serial:8.2f} s  ({accepted} accepted)")
+    print(f"insert_many   {bulk:8.2f} s  ({report['accepted']} accepted, {len(report['rejected'])} rejected)")
+    print(f"speedup       {serial / bulk:8.2f}x")
+
+
+def benchSnapshot(n):
+    """
+    Compares starting up from an n-record flybase.json (parse and validate every record)
+    against starting up from its binary snapshot (trusted, no re-validation).
+
+    Parameters:
+        n (int): The number of records in the database
+
+    Returns:
+        None
+    """
+
+    print(f"=== Startup benchmark, {n} records ===")
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        filename = os.path.join(folder, "flybase.json")
+
+        with open(filename, "w") as f:
+
+            json.dump(list(makeRecords(n)), f, indent=4)
+
+        timings = {}
+
+        for label, snapshot in (("JSON", False), ("JSON + snapshot write", True), ("snapshot", True)):
+
+            repo = Repository()
+
+            start = time.perf_counter()
+
+            count = repo.loadFromFile(filename, snapshot=snapshot)
+
+            timings[label] = time.perf_counter() - start
+
+            print(f"{label:22} {timings[label]:8.2f} s  ({count} records)")
+
+        # The Client saves after every change and refreshes the snapshot on exit, so the next start still uses it
+        rec = dict(next(makeRecords(1, seed=1)), flightID="FLT999999")
+
+        repo.insert(rec)
+        repo.appendToFile(filename)
+        repo.refreshSnapshot()
+
+        repo = Repository()
+
+        start = time.perf_counter()
+
+        count = repo.loadFromFile(filename, snapshot=True)
+
+        print(f"{'snapshot after a save':22} {time.perf_counter() - start:8.2f} s  ({count} records)")
+
+        print(f"file size: JSON {os.path.getsize(filename) / 1e6:.1f} MB, "
+              f"snapshot {os.path.getsize(filename + '.snap') / 1e6:.1f} MB; "
+              f"snapshot start is {timings['JSON'] / timings['snapshot']:.1f}x faster")
+
+
+def benchArchive(n):
+    """
+    Compares opening an n-record database as JSON (dict and columnar backends) against memory-mapping
+    its flight archive, with the memory held after opening and the time of a few statistics and lookups.
+    Opening times include the overhead of tracemalloc, which is much larger for the JSON loads.
+
+    Parameters:
+        n (int): The number of records in the database
+
+    Returns:
+        None
+    """
+
+    print(f"=== Archive benchmark, {n} records ===")
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        filename = os.path.join(folder, "flybase.json")
+        archive = os.path.join(folder, "flybase.arc")
+
+        with open(filename, "w") as f:
+
+            json.dump(list(makeRecords(n)), f, indent=4)
+
+        start = time.perf_counter()
+
+        columns = ColumnarRepository()
+        columns.loadFromFile(filename, stream=True)
+        columns.saveArchive(archive, source=filename)
+
+        print(f"archive build {time.perf_counter() - start:8.2f} s  "
+              f"(JSON {os.path.getsize(filename) / 1e6:.1f} MB, archive {os.path.getsize(archive) / 1e6:.1f} MB)")
+
+        del columns
+
+        rnd = random.Random(3410)
+        fids = [f"FLT{rnd.randrange(n):06d}" for _ in range(1000)]
+
+        for label, backend in (("Repository", Repository), ("ColumnarRepository", ColumnarRepository), ("MappedRepository", MappedRepository)):
+
+            tracemalloc.start()
+
+            start = time.perf_counter()
+
+            repo = backend()
+
+            if backend is MappedRepository:
+
+                repo.openArchive(archive)
+
+            else:
+
+                repo.loadFromFile(filename, stream=True)
+
+            opened = time.perf_counter() - start
+
+            current, _ = tracemalloc.get_traced_memory()
+
+            tracemalloc.stop()
+
+            server = Server(repo)
+
+            start = time.perf_counter()
+
+            server.airlineYear("Air Canada", "2020")
+            server.avgPassengers("A320")
+            server.avgCargo("767F")
+            server.busiestAirports()
+
+            stats = time.perf_counter() - start
+
+            start = time.perf_counter()
+
+            for fid in fids:
+
+                repo.getByFlightID(fid)
+
+            lookups = time.perf_counter() - start
+
+            print(f"{label:20} open {opened:8.2f} s  {current / 2**20:8.1f} MiB held  "
+                  f"stats {stats * 1000:8.1f} ms  1000 lookups {lookups * 1000:6.1f} ms")
+
+            if backend is MappedRepository:
+
+                repo.close()
+
+
+def benchPartitions(n):
+    """
+    Compares answering Server.airlineYear and saving one changed record from a fresh start, with the whole
+    n-record flybase.json against a partition folder (loaded lazily, and rewritten one partition at a time).
+
+    Parameters:
+        n (int): The number of records in the database
+
+    Returns:
+        None
+    """
+
+    print(f"=== Partition benchmark, {n} records ===")
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        filename = os.path.join(folder, "flybase.json")
+        parts = os.path.join(folder, "flybase.parts")
+
+        with open(filename, "w") as f:
+
+            json.dump(list(makeRecords(n)), f, indent=4)
+
+        start = time.perf_counter()
+
+        PartitionedRepository(Repository(), parts).loadFromFile(filename, stream=True)
+
+        print(f"split         {time.perf_counter() - start:8.2f} s")
+
+        for label, repo in (("JSON", Repository()), ("partitions", PartitionedRepository(Repository(), parts))):
+
+            start = time.perf_counter()
+
+            if label == "JSON":
+
+                repo.loadFromFile(filename, stream=True)
+
+            total = Server(repo).airlineYear("Air Canada", 2020)
+
+            query = time.perf_counter() - start
+
+            # JSON merges the change into the file (see appendToFile); partitions rewrite the one affected file
+            rec = repo.getByFlightID("FLT000000")
+            new = dict(rec, aircraftID="AC9999")
+
+            start = time.perf_counter()
+
+            repo.update(rec, new)
+            repo.appendToFile(filename)
+
+            save = time.perf_counter() - start
+
+            print(f"{label:12} airlineYear from cold {query:8.2f} s ({total} flights)  save one change {save * 1000:8.1f} ms")
+
+        start = time.perf_counter()
+
+        count = Repository().loadPartitions(parts, workers=2)
+
+        print(f"load every partition with 2 workers {time.perf_counter() - start:8.2f} s ({count} records)")
+
+
+def benchLazy(n):
+    """
+    Compares loading an n-record flybase.json fully (dict and columnar backends) against loading it lazily,
+    with the memory held afterwards and the time of a few statistics and of flightID lookups
+    (the first lookup of a record parses it from the file, repeats come from the cache of hydrated records).
+
+    Parameters:
+        n (int): The number of records in the database
+
+    Returns:
+        None
+    """
+
+    print(f"=== Lazy load benchmark, {n} records ===")
+
+    with tempfile.TemporaryDirectory() as folder:
+
+        filename = os.path.join(folder, "flybase.json")
+
+        with open(filename, "w") as f:
+
+            json.dump(list(makeRecords(n)), f, indent=4)
+
+        rnd = random.Random(3410)
+        fids = [f"FLT{rnd.randrange(n):06d}" for _ in range(100)]
+
+        for backend in (Repository, ColumnarRepository, LazyRepository):
+
+            repo = backend()
+
+            start = time.perf_counter()
+
+            repo.loadFromFile(filename, stream=True)
+
+            load = time.perf_counter() - start
+
+            tracemalloc.start()
+
+            # Measured by rebuilding under tracemalloc, so the timing above is not slowed down by it
+            traced = backend()
+            traced.loadFromFile(filename, stream=True)
+
+            current, _ = tracemalloc.get_traced_memory()
+
+            tracemalloc.stop()
+
+            del traced
+
+            server = Server(repo)
+
+            start = time.perf_counter()
+
+            server.airlineYear("Air Canada", "2020")
+            server.avgPassengers("A320")
+            server.busiestAirports()
+
+            stats = time.perf_counter() - start
+
+            timings = []
+
+            for _ in range(2):
+
+                start = time.perf_counter()
+
+                for fid in fids:
+
+                    repo.getByFlightID(fid)
+
+                timings.append(time.perf_counter() - start)
+
+            print(f"{backend.__name__:20} load {load:7.2f} s  {current / 2**20:8.1f} MiB held  stats {stats * 1000:8.1f} ms  "
+                  f"100 lookups {timings[0] * 1000:6.1f} ms first, {timings[1] * 1000:6.1f} ms again")
+
+
+def benchParallel(n):
+    """
+    Compares insert_many on n records (5% invalid) with 1, 2 and 4 validating processes,
+    and checks that every worker count gives the same result.
+
+    Parameters:
+        n (int): The number of records to load
+
+    Returns:
+        None
+    """
+
+    print(f"=== Parallel insert_many benchmark, {n} records ===")
+
+    records = list(makeRecords(n, invalid_every=20))
+
+    baseline = None
+
+    for workers in (1, 2, 4):
+
+        repo = Repository()
+
+        start = time.perf_counter()
+
+        report = repo.insert_many((dict(rec) for rec in records), workers=workers)
+
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+
+            baseline = (report, list(repo.records))
+
+        same = (report, list(repo.records)) == baseline
+
+        print(f"workers={workers}   {elapsed:8.2f} s  ({report['accepted']} accepted, "
+              f"{len(report['rejected'])} rejected, {'same' if same else 'DIFFERENT'} result)")
+
+
+def benchPilots(n):
+    """
+    Compares a roster report built with one Server.pilotSummary call per pilot against one
+    Server.allPilotSummaries pass, on n records.
+
+    Parameters:
+        n (int): The number of records to load
+
+    Returns:
+        None
+    """
+
+    print(f"=== Pilot roster benchmark, {n} records ===")
+
+    repo = Repository()
+    repo.insert_many(makeRecords(n))
+
+    server = Server(repo)
+
+    pilots = sorted({rec["pilotID"] for rec in repo.records})
+
+    start = time.perf_counter()
+
+    each = {p: server.pilotSummary(p) for p in pilots}
+
+    separate = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    together = server.allPilotSummaries()
+
+    single = time.perf_counter() - start
+
+    print(f"pilotSummary x {len(pilots)}   {separate:8.2f} s")
+    print(f"allPilotSummaries     {single:8.2f} s  ({'same' if together == each else 'DIFFERENT'} result)")
+
+
+def benchConflicts(n):
+    """
+    Times the bulk schedule conflict report on n records, and insert_many with the conflict rule off and on.
+
+    Parameters:
+        n (int): The number of records to load
+
+    Returns:
+        None
+    """
+
+    print(f"=== Schedule conflict benchmark, {n} records ===")
+
+    records = list(makeRecords(n))
+
+    for enabled in (False, True):
+
+        repo = Repository()
+        repo.setConflictCheck(enabled)
+
+        start = time.perf_counter()
+
+        report = repo.insert_many(dict(rec) for rec in records)
+
+        elapsed = time.perf_counter() - start
+
+        print(f"insert_many, check {'on ' if enabled else 'off'}  {elapsed:8.2f} s  "
+              f"({report['accepted']} accepted, {len(report['rejected'])} rejected)")
+
+    repo = Repository()
+    repo.insert_many(dict(rec) for rec in records)
+
+    start = time.perf_counter()
+
+    conflicts = repo.findConflicts()
+
+    print(f"findConflicts          {time.perf_counter() - start:8.2f} s  ({len(conflicts)} conflicting pairs)")
+
+
+def benchDates(n):
+    """
+    Times parsing n flight date strings with datetime.strptime and with Repository.parseDate,
+    and checks that both give the same date or the same error for every string.
+    One string in 50 is an impossible date (hour 24, 31/04, 29/02 outside leap years) and one in 50 is unpadded.
+
+    Parameters:
+        n (int): The number of date strings to parse
+
+    Returns:
+        None
+    """
+
+    print(f"=== Date parsing benchmark, {n} strings ===")
+
+    rnd = random.Random(3410)
+
+    strings = []
+
+    for i in range(n):
+
+        hour, minute = rnd.randrange(24), rnd.randrange(60)
+        day, month, year = rnd.randint(1, 28), rnd.randint(1, 12), rnd.randint(2000, 2030)
+
+        if i % 50 == 1:
+
+            hour, day, month = rnd.choice([(24, day, month), (hour, 31, 4), (hour, 29, 2)])
+            year = 2023
+
+        if i % 50 == 2:
+
+            strings.append(f"{hour}:{minute} {day}/{month}/{year}")
+
+        else:
+
+            strings.append(f"{hour:02d}:{minute:02d} {day:02d}/{month:02d}/{year}")
+
+    def parseAll(parse):
+
+        results = []
+
+        for value in strings:
+
+            try:
+
+                results.append(parse(value))
+
+            except ValueError as e:
+
+                results.append(str(e))
+
+        return results
+
+    timings = {}
+
+    for name, parse in (("strptime", lambda value: datetime.strptime(value, DATE_FORMAT)), ("parseDate", parseDate)):
+
+        start = time.perf_counter()
+
+        timings[name] = (parseAll(parse), time.perf_counter() - start)
+
+    for name, (results, elapsed) in timings.items():
+
+        print(f"{name:10} {elapsed:8.2f} s  ({elapsed / n * 1e6:.2f} us per string)")
+
+    same = timings["strptime"][0] == timings["parseDate"][0]
+
+    print(f"{'same' if same else 'DIFFERENT'} results, {timings['strptime'][1] / timings['parseDate'][1]:.1f}x faster")
+
+
+def benchRender(n):
+    """
+    Times rendering n flights as Client tables, page by page as the pager shows them,
+    in the wide layout and in the stacked layout. The output is discarded.
+
+    Parameters:
+        n (int): The number of records to render
+
+    Returns:
+        None
+    """
+
+    print(f"=== Table rendering benchmark, {n} records, {Client.PAGE_SIZE} per page ===")
+
+    records = list(makeRecords(n))
+
+    headers = list(records[0])
+
+    client = Client(Repository())
+
+    for mode in ("wide", "stacked"):
+
+        start = time.perf_counter()
+
+        sink = io.StringIO()
+
+        with contextlib.redirect_stdout(sink):
+
+            widths = client.column_widths(headers, [[rec.get(h, "N/A") for h in headers] for rec in records[:Client.WIDTH_SAMPLE]])
+
+            for first in range(0, n, Client.PAGE_SIZE):
+
+                rows = [[rec.get(h, "N/A") for h in headers] for rec in records[first:first + Client.PAGE_SIZE]]
+
+                if mode == "wide":
+
+                    client.display_table(headers, rows, widths)
+
+                else:
+
+                    client.display_narrow_table(headers, rows)
+
+        elapsed = time.perf_counter() - start
+
+        print(f"{mode:8} {elapsed:8.2f} s  ({n / elapsed:,.0f} rows/s, {sink.tell() / 1e6:.1f} MB of output)")
+
+
+def stressConcurrent(n, readers=8, writers=2, seconds=5.0):
+    """
+    Stress-checks ConcurrentRepository: reader threads run Server statistics and cross-check them
+    while writer threads insert, update and delete flights. Every reader check compares several queries
+    taken under one shared lock, so any torn or inconsistent state is reported as a violation.
+
+    Parameters:
+        n (int): The number of records loaded before the threads start
+        readers (int): How many query threads to run
+        writers (int): How many writer threads to run
+        seconds (float): How long to run
+
+    Returns:
+        None
+    """
+
+    print(f"=== Concurrency stress check, {n} records, {readers} readers, {writers} writers, {seconds:.0f} s ===")
+
+    repo = ConcurrentRepository(Repository())
+    repo.insert_many(makeRecords(n))
+
+    server = Server(repo)
+
+    airlines = ["Air Canada", "WestJet", "CargoJet", "Porter", "RCAF", "Flair"]
+    models = ["A320", "B737", "767F", "Q400", "CC-130", "A220"]
+
+    stop = threading.Event()
+    violations = []
+    counts = {"reads": 0, "writes": 0}
+
+    # flightIDs each writer currently has stored
+    expected = [dict() for _ in range(writers)]
+
+    def check(ok, message):
+
+        if not ok:
+
+            violations.append(message)
+
+    def reader(seed):
+
+        rnd = random.Random(seed)
+
+        while not stop.is_set():
+
+            with repo.reading():
+
+                total = len(repo.records)
+                by_airline = sum(server.airlineTotal(a) for a in airlines)
+
+                check(total == by_airline, f"{total} records but {by_airline} counted by airline")
+
+                model = rnd.choice(models)
+                public = repo.findWhere(aircraftModel=model, flightType="public")
+                average = server.avgPassengers(model)
+
+                if public:
+
+                    exact = sum(r["passengers"] for r in public) / len(public)
+
+                    check(average is not None and abs(average - exact) < 1e-6,
+                          f"avgPassengers({model}) is {average}, records give {exact}")
+
+                airline = rnd.choice(airlines)
+
+                for rec in repo.findWhere(airline=airline):
+
+                    check(len(rec) >= 10 and rec["airline"] == airline, f"torn record {rec}")
+
+            counts["reads"] += 1
+
+    def writer(w):
+
+        rnd = random.Random(1000 + w)
+
+        mine = expected[w]
+        next_id = 0
+
+        while not stop.is_set():
+
+            action = rnd.random()
+
+            if not mine or action < 0.4:
+
+                rec = next(makeRecords(1, seed=rnd.random()))
+                rec["flightID"] = f"FLT9{w:02d}{next_id % 1000:03d}"
+                rec["airline"] = rnd.choice(airlines)
+
+                next_id += 1
+
+                if rec["flightID"] not in mine and repo.insert(rec):
+
+                    mine[rec["flightID"]] = rec
+
+            elif action < 0.8:
+
+                fid = rnd.choice(list(mine))
+
+                new = dict(mine[fid], airline=rnd.choice(airlines))
+
+                check(repo.update(repo.getByFlightID(fid), new), f"update of {fid} failed")
+
+                mine[fid] = new
+
+            else:
+
+                fid = rnd.choice(list(mine))
+
+                repo.delete(repo.getByFlightID(fid))
+
+                del mine[fid]
+
+            counts["writes"] += 1
+
+    def guarded(target, arg):
+
+        # A crash (e.g. "dictionary changed size during iteration") is a violation too
+        try:
+
+            target(arg)
+
+        except Exception as e:
+
+            violations.append(f"{target.__name__} {arg} crashed: {e!r}")
+
+    threads = [threading.Thread(target=guarded, args=(reader, r)) for r in range(readers)]
+    threads += [threading.Thread(target=guarded, args=(writer, w)) for w in range(writers)]
+
+    for t in threads:
+
+        t.start()
+
+    time.sleep(seconds)
+
+    stop.set()
+
+    for t in threads:
+
+        t.join()
+
+    # The final state must be exactly the loaded records plus what the writers kept
+    for w, mine in enumerate(expected):
+
+        for fid, rec in mine.items():
+
+            check(repo.getByFlightID(fid) == rec, f"writer {w} lost {fid}")
+
+    check(len(repo.records) == n + sum(len(m) for m in expected), "final record count is wrong")
+
+    print(f"{counts['reads']} read checks, {counts['writes']} writes, {len(violations)} violations")
+
+    for message in violations[:10]:
+
+        print(f"  {message}")
+
+
+if __name__ == "__main__":
+
+    benchmarks = {
+
+        "memory": benchMemory,
+        "bulk": benchBulk,
+        "snapshot": benchSnapshot,
+        "archive": benchArchive,
+        "partitions": benchPartitions,
+        "lazy": benchLazy,
+        "parallel": benchParallel,
+        "pilots": benchPilots,
+        "conflicts": benchConflicts,
+        "render": benchRender,
+        "dates": benchDates,
+        "stress": stressConcurrent
+
+    }
+
+    if len(sys.argv) < 2 or sys.argv[1] not in benchmarks:
+
+        print(f"Usage: python Benchmarks.py ({'|'.join(benchmarks)}) [n ...]")
+
+        sys.exit(1)
+
+    for n in [int(a) for a in sys.argv[2:]] or [100000]:
+
+        benchmarks[sys.argv[1]](n)
@@ -3,23 +3,36 @@
 # Connor McDonald - B00938421
 
 from getpass import getpass
-from Repository import Repository
+from Repository import Repository, parseDate
 from Server import Server
-from datetime import datetime
+from itertools import chain, islice, zip_longest
 import shutil
+import sys
 
 class Client:
 
-    def __init__(self):
+    # Number of records shown per page of a flight table
+    PAGE_SIZE = 20
+
+    # Rows sampled to size the columns of a flight table, and the width past which a column wraps its cells
+    WIDTH_SAMPLE = 200
+    MAX_COLUMN_WIDTH = 30
+
+    def __init__(self, repo=None, journal=None):
         """
         Initialize the Client UI, create Repository and Server objects, and set the default user type.
 
+        Parameters:
+            repo (Repository or None): The Repository backend to use (e.g. a ColumnarRepository), a new Repository if None
+            journal (Journal or None): The write-ahead log to use for journaled mode, or None to rewrite flybase.json on every change
+
         Returns:
             None
         """
 
         self.userType = "General"
-        self.repo = Repository()
+        self.repo = repo if repo is not None else Repository()
+        self.journal = journal
         self.server = Server(self.repo)
 
     # ---------------------------------------------------------
@@ -62,6 +75,13 @@ class Client:
 
         self.login()
 
+        # In journaled mode the snapshot and log are loaded once, up front
+        if self.journal is not None:
+
+            count = self.repo.openJournal(self.journal, snapshot=True)
+
+            print(f"Loaded {count} records (journaled mode).")
+
         while True:
 
             print("\n=== Main Menu ===")
@@ -89,11 +109,23 @@ class Client:
 
             if choice == "0":
 
+                # Brings flybase.json.snap up to date with the saves of this session, for a fast next start
+                self.repo.refreshSnapshot()
+
                 return
 
+            elif choice == "1" and self.journal is not None:
+
+                print("Database is already loaded (journaled mode).")
+
             elif choice == "1":  
 
-                count = self.repo.loadFromFile()
+                # flybase.json.snap lets an unchanged database start without parsing and re-validating the JSON
+                count = self.repo.loadFromFile(
+                    stream=True,
+                    progress=lambda read, ok: print(f"  ...{read} read, {ok} loaded"),
+                    snapshot=True
+                )
 
                 print(f"Loaded {count} records.")
 
@@ -114,7 +146,15 @@ class Client:
 
             elif choice == "5" and self.userType == "Airline":
 
-                self.repo.saveToFile()
+                if self.journal is not None:
+
+                    self.repo.compactJournal()
+
+                else:
+
+                    self.repo.saveToFile()
+
+                self.repo.refreshSnapshot()
 
                 print("Saved.")
 
@@ -317,11 +357,44 @@ class Client:
         if success:
 
             print("\nRecord updated successfully!\n")
-            self.repo.saveToFile()
+            self.persistChanges()
         else:
 
             print("\nUpdate failed, invalid data.\n")
 
+    def persistChanges(self, append=False):
+        """
+        Saves the Repository to flybase.json after a change.
+        In journaled mode nothing is rewritten, since the Repository already logged the change.
+
+        Parameters:
+            append (bool): Whether to merge into the existing file (appendToFile) instead of overwriting it.
+                           If the file cannot be parsed, the user is told and the file is left as it is.
+
+        Returns:
+            None
+        """
+
+        if self.journal is not None:
+
+            return
+
+        if append:
+
+            try:
+
+                self.repo.appendToFile()
+
+            except ValueError as e:
+
+                # appendToFile leaves a file it cannot parse untouched, so nothing on disk is lost
+                print(f"Could not merge the change into flybase.json, which is not a valid JSON array ({e}).")
+                print("The change is kept in memory; use 'Save to File' to overwrite flybase.json with the current records.")
+
+        else:
+
+            self.repo.saveToFile()
+
     # ---------------------------------------------------------
     # UI HELPERS
     # ---------------------------------------------------------
@@ -342,14 +415,143 @@ class Client:
 
         return [text[i:i+width] for i in range(0, len(text), width)]
 
+    def column_widths(self, headers, rows):
+        """
+        Size each column to fit its header and every cell of the given rows, in one pass over the rows.
+        A column is capped at MAX_COLUMN_WIDTH (or its header, if longer); longer cells wrap when displayed.
+
+        Parameters:
+            headers (list[str]): Column headers
+            rows (list[list]): The rows to size the columns by, usually a sample of the table
+
+        Returns:
+            list[int]: The width of each column
+        """
+
+        widths = [len(h) for h in headers]
+
+        for row in rows:
+
+            for i, cell in enumerate(row):
+
+                n = len(str(cell))
+
+                if n > widths[i]:
+
+                    widths[i] = n
+
+        return [min(w, max(len(h), self.MAX_COLUMN_WIDTH)) for w, h in zip(widths, headers)]
+
+    def paginate(self, items, render, page_size=PAGE_SIZE):
+        """
+        Show items one page at a time, with controls for the next and previous page and for jumping to a page number.
+        Only the visible page is fetched and rendered. Lists and the record views of the Repository backends are sliced
+        directly; any other iterable (e.g. a generator) is read forward as pages are reached, keeping the pages seen for going back.
+
+        Parameters:
+            items (list or iterable): The items to show
+            render (callable): Displays one page, given the list of items on it
+            page_size (int): The number of items per page
+
+        Returns:
+            None
+        """
+
+        if hasattr(items, "__getitem__") and hasattr(items, "__len__"):
+
+            total = max(1, -(-len(items) // page_size))
+
+            fetch = lambda p: items[p * page_size:(p + 1) * page_size]
+
+        else:
+
+            source = iter(items)
+            seen = []
+
+            # Unknown until the iterable runs out
+            total = None
+
+            def fetch(p):
+
+                nonlocal total
+
+                while total is None and len(seen) <= p:
+
+                    page = list(islice(source, page_size))
+
+                    if page:
+
+                        seen.append(page)
+
+                    if len(page) < page_size:
+
+                        total = max(1, len(seen))
+
+                return seen[p] if p < len(seen) else []
+
+        page = 0
+        shown = None
+
+        while True:
+
+            if page != shown:
+
+                render(fetch(page))
+
+                shown = page
+
+                print(f"\nPage {page + 1}" + (f" of {total}" if total is not None else ""))
+
+                if total == 1:
+
+                    return
+
+            ch = input("[N]ext, [P]revious, page number, or [Q]uit: ").strip().lower()
+
+            if ch in ("", "n"):
+
+                target = page + 1
+
+            elif ch == "p":
+
+                target = page - 1
+
+            elif ch == "q":
+
+                return
+
+            elif ch.isdigit():
+
+                target = int(ch) - 1
+
+            else:
+
+                print("Invalid option.")
+
+                continue
+
+            # Reading a generator up to the target page tells whether that page exists
+            if total is None and target >= 0:
+
+                fetch(target)
+
+            if target < 0 or (total is not None and target >= total):
+
+                print(f"There is no page {target + 1}.")
+
+                continue
+
+            page = target
+
     def print_flights_table(self, flights):
         """
-        Build and display a formatted table of flight records.
+        Build and display a formatted table of flight records, one page at a time.
         Automatically hides restricted columns for General users,
-        determines column widths, and selects between wide or stacked view depending on terminal size.
+        sizes the columns from a sample of the flights, and selects between wide or stacked view depending on terminal size.
+        Rows are only built for the page on screen, so the first page shows at once however many flights there are.
         
         Parameters:
-            flights (list[dict]): List of flight record dictionaries to display
+            flights (list[dict] or iterable[dict]): The flight records to display, e.g. Repository.records or a generator
 
         Returns:
             None
@@ -410,18 +612,24 @@ class Client:
 
             ]
 
-        # Build rows in header order using the dictionary keys
-        rows = []
+        # Build the rows of one page in header order using the dictionary keys
+        def page_rows(page):
+
+            return [[rec.get(key_map[h], "N/A") for h in display_headers] for rec in page]
 
-        for rec in flights:
+        # Sizing columns based on the headers and the first WIDTH_SAMPLE flights
+        if hasattr(flights, "__getitem__") and hasattr(flights, "__len__"):
 
-            row = [rec.get(key_map[h], "N/A") for h in display_headers]
+            sample = flights[:self.WIDTH_SAMPLE]
 
-            rows.append(row)
+        else:
+
+            # Put the sampled flights back in front of the rest of the iterable
+            flights = iter(flights)
+            sample = list(islice(flights, self.WIDTH_SAMPLE))
+            flights = chain(sample, flights)
 
-       
-        # Sizing columns based on Header spacing
-        col_widths = [len(h) for h in display_headers]
+        col_widths = self.column_widths(display_headers, page_rows(sample))
 
         # Total width of table with " | " separators (3 chars each)
         sep_width = 3 * (len(display_headers) - 1)
@@ -432,7 +640,7 @@ class Client:
         if total_width <= terminal_width:
 
             # If the table fits within the terminal, show the table
-            self.display_table(display_headers, rows, col_widths)
+            render = lambda page: self.display_table(display_headers, page_rows(page), col_widths)
 
         else:
 
@@ -449,16 +657,27 @@ class Client:
            
                 case "1":
 
-                   self.display_table(display_headers, rows, col_widths)
+                   render = lambda page: self.display_table(display_headers, page_rows(page), col_widths)
 
                 case "2":
 
-                   self.display_narrow_table(display_headers, rows)
+                   print("\n[Table too wide for this terminal, showing stacked view]\n")
+
+                   render = lambda page: self.display_narrow_table(display_headers, page_rows(page))
+
+                case _:
+
+                   print("Invalid option.\n")
+
+                   return
+
+        self.paginate(flights, render)
 
     def display_table(self, headers, rows, col_widths):
         """
         Render a full-width formatted table using aligned columns.
         Wraps long cell contents by column width and prints row separators.
+        The table is built in one buffer and written with a single call.
         
         Parameters:
             headers (list[str]): Column headers
@@ -469,43 +688,44 @@ class Client:
             None
         """
 
-        # Print header
-        header_line = " | ".join(headers[i].ljust(col_widths[i]) for i in range(len(headers)))
+        # One format string pads every cell of a line at once
+        fmt = " | ".join(f"{{:<{w}}}" for w in col_widths)
 
-        print(header_line)
-        print("-" * len(header_line))
+        header_line = fmt.format(*headers)
+        separator = "-" * len(header_line)
 
-        # Print each row
-        for row in rows:
+        out = [header_line, separator]
 
-            wrapped = [
+        for row in rows:
 
-                self.wrap_cell(row[i], col_widths[i])
-                for i in range(len(row))
+            cells = [str(cell) for cell in row]
 
-            ]
+            line = fmt.format(*cells)
 
-            max_height = max(len(w) for w in wrapped)
+            # A longer line means some cell overflowed its column, so that row is wrapped over several lines
+            if len(line) == len(header_line):
 
-            for line_index in range(max_height):
+                out.append(line)
 
-                line = []
+            else:
 
-                for col_index, cell_lines in enumerate(wrapped):
+                wrapped = [self.wrap_cell(cell, w) for cell, w in zip(cells, col_widths)]
 
-                    text = cell_lines[line_index] if line_index < len(cell_lines) else ""
+                out.extend(fmt.format(*parts) for parts in zip_longest(*wrapped, fillvalue=""))
 
-                    line.append(text.ljust(col_widths[col_index]))
+            out.append(separator)
 
-                print(" | ".join(line))
+        out.append("")
 
-            print("-" * len(header_line))
+        sys.stdout.write("\n".join(out))
+        sys.stdout.flush()
 
     def display_narrow_table(self, headers, rows):
         """
         Render records in a stacked vertical layout for narrow terminals 
         Can be used when a full-width table would not fit inside terminal.
         Each record is displayed as key–value pairs.
+        The records are built in one buffer and written with a single call.
         
         Parameters:
             headers (list[str]): Column labels
@@ -515,7 +735,6 @@ class Client:
             None
         """
 
-        import shutil
         terminal_width = shutil.get_terminal_size((100, 20)).columns
 
         # Width for the "Header: " label part
@@ -524,25 +743,38 @@ class Client:
         # Width for values
         value_width = max(10, terminal_width - label_width - 1)
 
-        print("\n[Table too wide for this terminal, showing stacked view]\n")
+        labels = [h.ljust(label_width) for h in headers]
+        indent = " " * label_width
+        separator = "-" * terminal_width
+
+        out = []
 
         for row in rows:
 
-            for h, cell in zip(headers, row):
+            for label, cell in zip(labels, row):
 
                 cell_text = str(cell)
 
+                if len(cell_text) <= value_width:
+
+                    out.append(label + cell_text)
+
+                    continue
+
                 lines = self.wrap_cell(cell_text, value_width)
 
                 # First line: header + first part of value
-                print(f"{h.ljust(label_width)}{lines[0]}")
+                out.append(label + lines[0])
 
                 # Continuation lines: indent under value column
-                for cont in lines[1:]:
+                out.extend(indent + cont for cont in lines[1:])
+
+            out.append(separator)
 
-                    print(" " * label_width + cont)
+        out.append("")
 
-            print("-" * terminal_width)
+        sys.stdout.write("\n".join(out))
+        sys.stdout.flush()
 
     def printAllRecords(self):
         """
@@ -647,7 +879,7 @@ class Client:
 
             try:
 
-                datetime.strptime(x, "%H:%M %d/%m/%Y")
+                parseDate(x)
 
                 return True
 
@@ -727,7 +959,7 @@ class Client:
         # Final validation through repository
         if self.repo.insert(rec):
 
-            self.repo.appendToFile()
+            self.persistChanges(append=True)
 
             print(f"\nFlight {rec['flightID']} added successfully.\n")
 
@@ -746,7 +978,7 @@ class Client:
 
         fid = input("Enter flightID: ")
 
-        rec = next((r for r in self.repo.records if r["flightID"] == fid), None)
+        rec = self.repo.getByFlightID(fid)
 
         if not rec:
 
@@ -756,7 +988,7 @@ class Client:
 
         self.repo.delete(rec)
 
-        self.repo.saveToFile()
+        self.persistChanges()
 
         print("Deleted.")
 
@@ -880,16 +1112,13 @@ class Client:
 
         # ---- SORTING LOGIC ----
 
-        # Date fields need datetime sorting
+        # Date fields need datetime sorting, using the dates the Repository already parsed
         if field in ("departureDate", "arrivalDate"):
-            try:
-                sorted_records = sorted(
-                    self.repo.records,
-                    key=lambda r: datetime.strptime(r[field], "%H:%M %d/%m/%Y")
-                )
-            except:
-                print("Error: One or more dates are invalid format.")
-                return
+            pos = 0 if field == "departureDate" else 1
+            sorted_records = sorted(
+                self.repo.records,
+                key=lambda r: self.repo.parsedDates(r)[pos]
+            )
 
         else:
             # Non-date fields sorted alphabetically / numerically
@@ -925,6 +1154,9 @@ class Client:
             if self.userType == "Airline":
                 print("3. General Statistics")
                 print("4. Model Statistics")
+                print("5. Breakdown Table")
+                print("6. Route Statistics")
+                print("7. Scheduling Conflicts")
 
             ch = input("Choose: ").strip()
 
@@ -969,6 +1201,8 @@ class Client:
                 print("1. Total Flights in Database")
                 print("2. Total Flights by Given Year")
                 print("3. Total Flights by Flight Type")
+                print("4. Total Flights by Given Month")
+                print("5. Total Flights on Given Day")
 
                 sub = input("Choose: ")
 
@@ -983,6 +1217,14 @@ class Client:
                     ft = input("Enter Flight Type: ")
                     print(f"\nTotal {ft} flights: {len(self.server.flightsByType(ft))}\n")
 
+                elif sub == "4":
+                    month, _, year = input("Enter Month (MM/YYYY): ").strip().partition("/")
+                    print(f"\nFlights in {month}/{year}: {len(self.server.flightsByMonth(year, month))}\n")
+
+                elif sub == "5":
+                    day, month, year = (input("Enter Date (DD/MM/YYYY): ").strip().split("/") + ["", ""])[:3]
+                    print(f"\nFlights on {day}/{month}/{year}: {len(self.server.flightsByDay(year, month, day))}\n")
+
                 else:
                     print("Invalid option.\n")
 
@@ -1015,6 +1257,95 @@ class Client:
                 else:
                     print("Invalid option.\n")
 
+            # -----------------------------------------------------
+            # 5. BREAKDOWN TABLE (Airline User Only)
+            # -----------------------------------------------------
+            elif ch == "5" and self.userType == "Airline":
+                print("\nGroup by any of: " + ", ".join(self.server.GROUP_FIELDS))
+                by = [f.strip() for f in input("Group by (comma-separated): ").split(",") if f.strip()]
+
+                print("Measures: count, or sum/avg/min/max of passengers, cargoWeight or duration (e.g. avg:passengers)")
+                measures = [m.strip() for m in input("Measures (comma-separated, ENTER for count): ").split(",") if m.strip()]
+
+                try:
+                    table = self.server.groupBy(by, measures or ["count"])
+                except ValueError as e:
+                    print(f"{e}\n")
+                    continue
+
+                if not table:
+                    print("No data.\n")
+                    continue
+
+                headers = by + (measures or ["count"])
+
+                rows = [
+
+                    list(key) + [f"{v:.2f}" if isinstance(v, float) else ("N/A" if v is None else v) for v in values.values()]
+                    for key, values in table.items()
+
+                ]
+
+                col_widths = self.column_widths(headers, rows)
+
+                print()
+                self.display_table(headers, rows, col_widths)
+
+            # -----------------------------------------------------
+            # 6. ROUTE STATISTICS (Airline User Only)
+            # -----------------------------------------------------
+            elif ch == "6" and self.userType == "Airline":
+                print("\nRoute Statistics:")
+                print("1. Flights and Average Block Time on a Route")
+                print("2. Destinations from an Airport")
+                print("3. Busiest Airports")
+
+                sub = input("Choose: ")
+
+                if sub == "1":
+                    origin = input("Departure Location: ").strip()
+                    destination = input("Arrival Location: ").strip()
+                    block = self.server.avgBlockTime(origin, destination)
+                    if block is None:
+                        print("No flights on that route.\n")
+                    else:
+                        print(f"\nFlights {origin} -> {destination}: {self.server.routeTotal(origin, destination)}")
+                        print(f"Average Block Time: {block:.0f} minutes\n")
+
+                elif sub == "2":
+                    origin = input("Departure Location: ").strip()
+                    routes = self.server.routesFrom(origin)
+                    if not routes:
+                        print("No flights from that airport.\n")
+                    else:
+                        print()
+                        for destination, flights in routes.items():
+                            print(f"{origin} -> {destination}: {flights}")
+
+                elif sub == "3":
+                    print()
+                    for airport, departures, arrivals in self.server.busiestAirports():
+                        print(f"{airport}: {departures + arrivals} flights ({departures} departures, {arrivals} arrivals)")
+
+                else:
+                    print("Invalid option.\n")
+
+            # -----------------------------------------------------
+            # 7. SCHEDULING CONFLICTS (Airline User Only)
+            # -----------------------------------------------------
+            elif ch == "7" and self.userType == "Airline":
+                conflicts = self.server.conflictReport()
+
+                print(f"\n{len(conflicts)} overlapping bookings found.")
+
+                for c in conflicts[:20]:
+                    print(f"- {c['field']} {c['value']}: {c['flightID']} overlaps {c['otherFlightID']}")
+
+                if len(conflicts) > 20:
+                    print(f"... and {len(conflicts) - 20} more.")
+
+                print()
+
             else:
                 print("Invalid choice.\n")
 
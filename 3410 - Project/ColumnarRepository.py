@@ -0,0 +1,972 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import json
+import math
+import operator
+from array import array
+from collections import Counter
+from datetime import timedelta
+from functools import reduce
+from itertools import compress, count, islice
+
+from Archive import Archive
+from Repository import DATE_FORMAT, EPOCH, Repository
+
+
+class _Categories:
+
+    def __init__(self):
+        """
+        Initializes an interned string table for one categorical column.
+        Code 0 is reserved for deleted rows, so it never matches a query.
+
+        Returns:
+            None
+        """
+
+        self.values = [None]
+        self.codes = {}
+
+        # Lowercased value -> set of codes, for case-insensitive queries
+        self.by_lower = {}
+
+    def encode(self, value):
+        """
+        Retrieves the code of a value, adding the value to the table the first time it is seen.
+
+        Parameters:
+            value (str): The value to encode
+
+        Returns:
+            int: The code of the value
+        """
+
+        code = self.codes.get(value)
+
+        if code is None:
+
+            code = len(self.values)
+
+            self.values.append(value)
+            self.codes[value] = code
+            self.by_lower.setdefault(str(value).lower(), set()).add(code)
+
+        return code
+
+    def matching(self, value):
+        """
+        Retrieves all codes whose value equals the given value, ignoring case.
+
+        Parameters:
+            value (str): The value to look up
+
+        Returns:
+            set[int]: The matching codes (empty if the value was never stored)
+        """
+
+        return self.by_lower.get(str(value).lower(), set())
+
+
+class ColumnarRepository(Repository):
+
+    # String fields stored as interned codes
+    CATEGORICAL_FIELDS = (
+        "flightType", "pilotID", "airline",
+        "departureLocation", "arrivalLocation",
+        "aircraftID", "aircraftModel"
+    )
+
+    # Field order used when records are rebuilt as dicts
+    FIELD_ORDER = (
+        "flightID", "flightType", "pilotID", "airline",
+        "departureDate", "departureLocation",
+        "arrivalDate", "arrivalLocation",
+        "aircraftID", "aircraftModel"
+    )
+
+    # Marks a missing passengers value: the smallest signed 64-bit number, so every other count (negative too) fits
+    NO_PASSENGERS = -(1 << 63)
+
+    def __init__(self):
+        """
+        Initializes an empty columnar Repository. It has the same API as Repository,
+        but keeps one compact array per field instead of one dict per flight.
+
+        Returns:
+            None
+        """
+
+        self._reset_columns()
+
+        super().__init__()
+
+    def _reset_columns(self):
+        """
+        Clears every column and the flightID -> row map.
+
+        Returns:
+            None
+        """
+
+        # flightID number (the six digits after "FLT"), -1 marks a deleted row
+        self._fids = array("i")
+
+        self._categories = {field: _Categories() for field in self.CATEGORICAL_FIELDS}
+        self._codes = {field: array("I") for field in self.CATEGORICAL_FIELDS}
+
+        # NO_PASSENGERS and NaN mark a missing passengers or cargoWeight value
+        self._passengers = array("q")
+        self._cargo = array("d")
+
+        # Seconds since EPOCH, plus the departure year (0 for deleted rows)
+        self._departures = array("q")
+        self._arrivals = array("q")
+        self._years = array("H")
+
+        # Sparse per-row values: mission, and any field that does not fit a column
+        self._missions = {}
+        self._extras = {}
+
+        self._rows = {}
+        self._dead = 0
+
+    @property
+    def records(self):
+        """
+        Retrieves a read-only sequence view over the stored records.
+        Records are rebuilt as dicts when the view is iterated or indexed.
+
+        Returns:
+            _RecordView: The stored records
+        """
+
+        return _RecordView(self)
+
+    @records.setter
+    def records(self, recs):
+        """
+        Replaces the stored records, validating each new record.
+
+        Parameters:
+            recs (list[dict]): The new records
+
+        Returns:
+            None
+        """
+
+        self._reset_columns()
+
+        for rec in recs:
+
+            self.insert(rec)
+
+    # ---------------------------------------------------------
+    # ROW HELPERS
+    # ---------------------------------------------------------
+
+    def _row_of(self, fid):
+        """
+        Retrieves the row number of a flightID.
+
+        Parameters:
+            fid (str): The flightID to look up
+
+        Returns:
+            int or None: The row number, or None if the flightID is not stored
+        """
+
+        if not (isinstance(fid, str) and fid.startswith("FLT") and len(fid) == 9 and fid[3:].isdigit()):
+
+            return None
+
+        return self._rows.get(int(fid[3:]))
+
+    def _flightID_taken(self, fid, ignore_rec=None):
+        """
+        Checks whether a flightID is already used by a stored record.
+        Stored records are rebuilt as copies, so ignore_rec is matched by flightID.
+
+        Parameters:
+            fid (str): The flightID to check
+            ignore_rec (dict or None): A record to exclude during the check when updating
+
+        Returns:
+            bool: True if another stored record uses the flightID, otherwise False
+        """
+
+        if self._row_of(fid) is None:
+
+            return False
+
+        return not (ignore_rec is not None and ignore_rec.get("flightID") == fid)
+
+    def _write_row(self, row, rec, dates):
+        """
+        Writes the values of a validated record into one row of every column.
+
+        Parameters:
+            row (int): The row to write (equal to the column length to append a new row)
+            rec (dict): The validated record
+            dates (tuple): The parsed (departure, arrival) dates of the record
+
+        Returns:
+            None
+        """
+
+        values = {
+
+            "fid": int(rec["flightID"][3:]),
+            "departure": int((dates[0] - EPOCH).total_seconds()),
+            "arrival": int((dates[1] - EPOCH).total_seconds()),
+            "year": dates[0].year,
+            "passengers": self.NO_PASSENGERS,
+            "cargo": float("nan")
+
+        }
+
+        extras = {}
+
+        for key, value in rec.items():
+
+            if key in self.FIELD_ORDER:
+
+                continue
+
+            if key == "passengers" and isinstance(value, int) and self.NO_PASSENGERS < value < 1 << 63:
+
+                values["passengers"] = value
+
+            elif key == "cargoWeight" and isinstance(value, float) and value == value:
+
+                values["cargo"] = value
+
+            elif key == "mission":
+
+                self._missions[row] = value
+
+            else:
+
+                extras[key] = value
+
+        if extras:
+
+            self._extras[row] = extras
+
+        columns = [
+
+            (self._fids, values["fid"]),
+            (self._departures, values["departure"]),
+            (self._arrivals, values["arrival"]),
+            (self._years, values["year"]),
+            (self._passengers, values["passengers"]),
+            (self._cargo, values["cargo"])
+
+        ]
+
+        for field in self.CATEGORICAL_FIELDS:
+
+            columns.append((self._codes[field], self._categories[field].encode(rec[field])))
+
+        for column, value in columns:
+
+            if row == len(column):
+
+                column.append(value)
+
+            else:
+
+                column[row] = value
+
+        self._rows[values["fid"]] = row
+
+    def _clear_row(self, row):
+        """
+        Marks a row as deleted. Codes and sentinels are reset so the row never matches a query.
+
+        Parameters:
+            row (int): The row to clear
+
+        Returns:
+            None
+        """
+
+        del self._rows[self._fids[row]]
+
+        self._fids[row] = -1
+        self._years[row] = 0
+        self._passengers[row] = self.NO_PASSENGERS
+        self._cargo[row] = float("nan")
+
+        for field in self.CATEGORICAL_FIELDS:
+
+            self._codes[field][row] = 0
+
+        self._missions.pop(row, None)
+        self._extras.pop(row, None)
+
+    def _materialize(self, row):
+        """
+        Rebuilds the record dict stored in a row.
+
+        Parameters:
+            row (int): The row to rebuild
+
+        Returns:
+            dict: A copy of the stored record
+        """
+
+        rec = {}
+
+        for field in self.FIELD_ORDER:
+
+            if field == "flightID":
+
+                rec[field] = f"FLT{self._fids[row]:06d}"
+
+            elif field == "departureDate":
+
+                rec[field] = (EPOCH + timedelta(seconds=self._departures[row])).strftime(DATE_FORMAT)
+
+            elif field == "arrivalDate":
+
+                rec[field] = (EPOCH + timedelta(seconds=self._arrivals[row])).strftime(DATE_FORMAT)
+
+            else:
+
+                rec[field] = self._categories[field].values[self._codes[field][row]]
+
+        if self._passengers[row] != self.NO_PASSENGERS:
+
+            rec["passengers"] = self._passengers[row]
+
+        if self._cargo[row] == self._cargo[row]:
+
+            rec["cargoWeight"] = self._cargo[row]
+
+        if row in self._missions:
+
+            rec["mission"] = self._missions[row]
+
+        rec.update(self._extras.get(row, {}))
+
+        return rec
+
+    def _live_rows(self):
+        """
+        Iterates over the row numbers of all stored (not deleted) records, in insertion order.
+
+        Returns:
+            iterator[int]: The live row numbers
+        """
+
+        return compress(count(), map((-1).__ne__, self._fids))
+
+    def _live_count(self):
+        """
+        Counts the stored (not deleted) records.
+
+        Returns:
+            int: The number of records
+        """
+
+        return len(self._rows)
+
+    def _compact(self):
+        """
+        Rebuilds every column without its deleted rows.
+
+        Returns:
+            None
+        """
+
+        live = list(self._live_rows())
+
+        old_missions, old_extras = self._missions, self._extras
+
+        self._missions = {new: old_missions[old] for new, old in enumerate(live) if old in old_missions}
+        self._extras = {new: old_extras[old] for new, old in enumerate(live) if old in old_extras}
+
+        columns = [self._fids, self._passengers, self._cargo, self._departures, self._arrivals, self._years]
+        columns.extend(self._codes.values())
+
+        for column in columns:
+
+            column[:] = array(column.typecode, (column[r] for r in live))
+
+        self._rows = {fid: row for row, fid in enumerate(self._fids)}
+        self._dead = 0
+
+    # ---------------------------------------------------------
+    # STORAGE
+    # ---------------------------------------------------------
+
+    def _add_record(self, rec, dates):
+        """
+        Stores an already validated record as a new row.
+
+        Parameters:
+            rec (dict): The record to store
+            dates (tuple): The parsed (departure, arrival) dates of the record
+
+        Returns:
+            None
+        """
+
+        self._write_row(len(self._fids), rec, dates)
+
+    def _replace_record(self, old_rec, new_rec, dates):
+        """
+        Overwrites the row of a stored record with already validated values.
+        The caller's copy of the record is updated too, like the dict backend does.
+
+        Parameters:
+            old_rec (dict): The stored record (or a copy of it)
+            new_rec (dict): The validated new field values
+            dates (tuple): The parsed (departure, arrival) dates of new_rec
+
+        Returns:
+            None
+        """
+
+        row = self._row_of(old_rec["flightID"])
+
+        self._clear_row(row)
+        self._write_row(row, new_rec, dates)
+
+        old_rec.clear()
+        old_rec.update(new_rec)
+
+    def _remove_record(self, rec):
+        """
+        Deletes the row of a stored record. Columns are compacted once most rows are deleted.
+
+        Parameters:
+            rec (dict): The stored record (or a copy of it)
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the record is not stored, like list.remove
+        """
+
+        row = self._row_of(rec["flightID"])
+
+        if row is None:
+
+            raise ValueError("Record is not in the Repository.")
+
+        self._clear_row(row)
+
+        self._dead += 1
+
+        if self._dead > 1024 and self._dead > len(self._rows):
+
+            self._compact()
+
+    # ---------------------------------------------------------
+    # LOOKUPS
+    # ---------------------------------------------------------
+
+    def getByFlightID(self, fid):
+        """
+        Retrieves a record matching the given flightID.
+
+        Parameters:
+            fid (str): The flightID to search for
+
+        Returns:
+            dict or None: A copy of the matching record, or None if not found
+        """
+
+        row = self._row_of(fid)
+
+        if row is None:
+
+            return None
+
+        return self._materialize(row)
+
+    def parsedDates(self, rec):
+        """
+        Retrieves the parsed departure and arrival dates of a record, from the date columns when the record is stored.
+
+        Parameters:
+            rec (dict): The record whose dates are needed
+
+        Returns:
+            tuple[datetime, datetime]: The (departure, arrival) dates
+        """
+
+        row = self._row_of(rec["flightID"])
+
+        if row is None:
+
+            return super().parsedDates(rec)
+
+        return (
+
+            EPOCH + timedelta(seconds=self._departures[row]),
+            EPOCH + timedelta(seconds=self._arrivals[row])
+
+        )
+
+    # ---------------------------------------------------------
+    # VECTORIZED QUERIES
+    # ---------------------------------------------------------
+
+    def _mask(self, criteria):
+        """
+        Builds a lazy per-row match mask for the given field values.
+        Each mask is a chain of C-level map() calls over the columns, so no Python loop runs per row.
+
+        Parameters:
+            criteria (dict): Field/value pairs, where each field is one of INDEXED_FIELDS
+
+        Returns:
+            iterator[bool] or None: The mask, or None if some value can never match
+        """
+
+        masks = []
+
+        for field, value in criteria.items():
+
+            if field == "year":
+
+                value = str(value)
+
+                # Year 0 marks deleted rows
+                if not value.isdigit() or int(value) == 0:
+
+                    return None
+
+                masks.append(map(int(value).__eq__, self._years))
+
+                continue
+
+            codes = self._categories[field].matching(value)
+
+            if not codes:
+
+                return None
+
+            if len(codes) == 1:
+
+                masks.append(map(next(iter(codes)).__eq__, self._codes[field]))
+
+            else:
+
+                masks.append(map(codes.__contains__, self._codes[field]))
+
+        if not masks:
+
+            return map((-1).__ne__, self._fids)
+
+        return reduce(lambda a, b: map(operator.and_, a, b), masks)
+
+    def findWhere(self, **criteria):
+        """
+        Retrieves all records matching every given field value, scanning the code columns.
+
+        Parameters:
+            **criteria: Field/value pairs, where each field is one of INDEXED_FIELDS
+
+        Returns:
+            list[dict]: Copies of the matching records
+        """
+
+        mask = self._mask(criteria)
+
+        if mask is None:
+
+            return []
+
+        return [self._materialize(row) for row in compress(count(), mask)]
+
+    def countWhere(self, **criteria):
+        """
+        Counts all records matching every given field value, scanning the code columns.
+
+        Parameters:
+            **criteria: Field/value pairs, where each field is one of INDEXED_FIELDS
+
+        Returns:
+            int: The number of matching records
+        """
+
+        mask = self._mask(criteria)
+
+        if mask is None:
+
+            return 0
+
+        return sum(mask)
+
+    def modelAverage(self, model, field):
+        """
+        Computes the average of a numeric field for one aircraft model over the value columns.
+
+        Parameters:
+            model (str): The aircraft model name (case-insensitive)
+            field (str): One of AGGREGATED_FIELDS ("passengers" or "cargoWeight")
+
+        Returns:
+            float or None: The average value, or None if no record of that model has the field
+        """
+
+        mask = self._mask({"aircraftModel": model, "flightType": self.AGGREGATED_FIELDS[field]})
+
+        if mask is None:
+
+            return None
+
+        if field == "passengers":
+
+            column = self._passengers
+            present = map(self.NO_PASSENGERS.__ne__, column)
+
+        else:
+
+            # NaN is the only value not equal to itself
+            column = self._cargo
+            present = map(operator.eq, column, column)
+
+        values = list(compress(column, map(operator.and_, mask, present)))
+
+        if not values:
+
+            return None
+
+        return sum(values) / len(values)
+
+    # ---------------------------------------------------------
+    # ROUTE QUERIES
+    # ---------------------------------------------------------
+    # No adjacency map is kept here (it would cost memory per record); the location code columns are scanned.
+
+    def _route_mask(self, origin, destination):
+        """
+        Builds a lazy per-row mask of the flights on one route.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            iterator[bool] or None: The mask, or None if no flight can fly the route
+        """
+
+        origins = self._categories["departureLocation"].matching(origin)
+        destinations = self._categories["arrivalLocation"].matching(destination)
+
+        if not origins or not destinations:
+
+            return None
+
+        return map(
+
+            operator.and_,
+            map(origins.__contains__, self._codes["departureLocation"]),
+            map(destinations.__contains__, self._codes["arrivalLocation"])
+
+        )
+
+    def findRoute(self, origin, destination):
+        """
+        Retrieves all flights from one location to another, scanning the location columns.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            list[dict]: Copies of the matching records
+        """
+
+        mask = self._route_mask(origin, destination)
+
+        if mask is None:
+
+            return []
+
+        return [self._materialize(row) for row in compress(count(), mask)]
+
+    def routeCount(self, origin, destination):
+        """
+        Counts the flights from one location to another, scanning the location columns.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            int: The number of flights on the route
+        """
+
+        mask = self._route_mask(origin, destination)
+
+        return sum(mask) if mask is not None else 0
+
+    def routeBlockTime(self, origin, destination):
+        """
+        Computes the average block time of a route over the date columns.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            float or None: The average block time in minutes, or None if no flight flies the route
+        """
+
+        mask = self._route_mask(origin, destination)
+
+        if mask is None:
+
+            return None
+
+        rows = list(compress(count(), mask))
+
+        if not rows:
+
+            return None
+
+        seconds = sum(map(operator.sub, map(self._arrivals.__getitem__, rows), map(self._departures.__getitem__, rows)))
+
+        return seconds / len(rows) / 60
+
+    def routesFrom(self, origin):
+        """
+        Counts the flights from one location to each destination served from it.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+
+        Returns:
+            dict: destination -> number of flights, busiest first
+        """
+
+        origins = self._categories["departureLocation"].matching(origin)
+
+        if not origins:
+
+            return {}
+
+        codes = compress(self._codes["arrivalLocation"], map(origins.__contains__, self._codes["departureLocation"]))
+
+        counts = self._merge_codes(Counter(codes), self._categories["arrivalLocation"])
+
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def busiestAirports(self, n=10):
+        """
+        Ranks locations by traffic (departures plus arrivals), counting the location code columns.
+
+        Parameters:
+            n (int or None): How many locations to return, None for all
+
+        Returns:
+            list[tuple[str, int, int]]: (location, departures, arrivals), busiest first (ties by name)
+        """
+
+        departures = self._merge_codes(Counter(self._codes["departureLocation"]), self._categories["departureLocation"])
+        arrivals = self._merge_codes(Counter(self._codes["arrivalLocation"]), self._categories["arrivalLocation"])
+
+        # Spell each location the way the first of the two columns saw it
+        labels = {}
+
+        for label in list(departures) + list(arrivals):
+
+            labels.setdefault(label.lower(), label)
+
+        traffic = {}
+
+        for label, flights in departures.items():
+
+            traffic.setdefault(label.lower(), [0, 0])[0] += flights
+
+        for label, flights in arrivals.items():
+
+            traffic.setdefault(label.lower(), [0, 0])[1] += flights
+
+        ranked = sorted(((labels[k], d, a) for k, (d, a) in traffic.items()), key=lambda e: (-(e[1] + e[2]), e[0]))
+
+        return ranked[:n]
+
+    def _merge_codes(self, counts, categories):
+        """
+        Turns per-code counts into per-value counts, merging codes whose values differ only in case
+        and dropping the deleted-row code.
+
+        Parameters:
+            counts (Counter): code -> count
+            categories (_Categories): The string table of the column
+
+        Returns:
+            dict: value (the spelling with the lowest code) -> count
+        """
+
+        merged = {}
+
+        for code in sorted(counts):
+
+            if code == 0:
+
+                continue
+
+            value = str(categories.values[code])
+            label = categories.values[min(categories.matching(value))]
+
+            merged[str(label)] = merged.get(str(label), 0) + counts[code]
+
+        return merged
+
+    def findBetween(self, start, end, **criteria):
+        """
+        Retrieves the records departing in [start, end), scanning the departure column.
+        There is no sorted index here, which keeps the memory per record low; the scan is a C-level map().
+
+        Parameters:
+            start (datetime): The inclusive start of the window
+            end (datetime): The exclusive end of the window
+            **criteria: Further field/value pairs the records must match, as for findWhere
+
+        Returns:
+            list[dict]: Copies of the matching records, in departure order (ties by flightID)
+        """
+
+        mask = self._mask(criteria)
+
+        if mask is None:
+
+            return []
+
+        # Departures are whole seconds, so the window can be rounded up to a range of ints
+        window = range(math.ceil((start - EPOCH).total_seconds()), math.ceil((end - EPOCH).total_seconds()))
+
+        rows = compress(count(), map(operator.and_, mask, map(window.__contains__, self._departures)))
+
+        rows = sorted(rows, key=lambda row: (self._departures[row], self._fids[row]))
+
+        return [self._materialize(row) for row in rows]
+
+    # ---------------------------------------------------------
+    # FLIGHT ARCHIVE
+    # ---------------------------------------------------------
+
+    def saveArchive(self, filename="flybase.arc", source=None):
+        """
+        Writes the columns to a flight archive that MappedRepository can memory-map and query in place.
+        The sections are, in order:
+
+            the flightID, departure, arrival, year, passengers and cargoWeight columns
+            one code column per CATEGORICAL_FIELDS field
+            the flightID index: every flightID number in sorted order, then the row of each
+            the rows that have a mission or extra fields, sorted, with the byte offsets of their JSON
+            in the block after them (one more offset than rows)
+            the JSON block of those values
+            the JSON list of every categorical string table, without the deleted-row code 0
+
+        Deleted rows are compacted away first.
+
+        Parameters:
+            filename (str): The path of the archive file
+            source (str or None): The JSON file the records were loaded from, whose size and mtime are recorded
+
+        Returns:
+            int: The number of records written
+        """
+
+        if self._dead:
+
+            self._compact()
+
+        by_fid = sorted(range(len(self._fids)), key=self._fids.__getitem__)
+
+        tail_rows = array("I", sorted(self._missions.keys() | self._extras.keys()))
+        tail_offsets = array("Q", [0])
+        tail = bytearray()
+
+        for row in tail_rows:
+
+            values = {"mission": self._missions[row]} if row in self._missions else {}
+            values.update(self._extras.get(row, {}))
+
+            tail += json.dumps(values).encode("ascii")
+            tail_offsets.append(len(tail))
+
+        tables = json.dumps([self._categories[field].values[1:] for field in self.CATEGORICAL_FIELDS])
+
+        Archive(filename).write([
+
+            self._fids, self._departures, self._arrivals, self._years, self._passengers, self._cargo,
+            *(self._codes[field] for field in self.CATEGORICAL_FIELDS),
+            array("i", map(self._fids.__getitem__, by_fid)), array("I", by_fid),
+            tail_rows, tail_offsets, tail,
+            tables.encode("ascii")
+
+        ], source=source)
+
+        return len(self._fids)
+
+
+class _RecordView:
+
+    def __init__(self, repo):
+        """
+        Initializes a read-only view over the records of a ColumnarRepository.
+
+        Parameters:
+            repo (ColumnarRepository): The Repository to view
+
+        Returns:
+            None
+        """
+
+        self.repo = repo
+
+    def __len__(self):
+        """
+        Retrieves the number of stored records.
+
+        Returns:
+            int: The number of records
+        """
+
+        return self.repo._live_count()
+
+    def __iter__(self):
+        """
+        Iterates over copies of the stored records, rebuilding one at a time.
+
+        Returns:
+            iterator[dict]: The records in insertion order
+        """
+
+        return map(self.repo._materialize, self.repo._live_rows())
+
+    def __getitem__(self, index):
+        """
+        Retrieves a record (or a list of records for a slice) by position.
+
+        Parameters:
+            index (int or slice): The position(s) to retrieve
+
+        Returns:
+            dict or list[dict]: Copies of the selected records
+        """
+
+        if isinstance(index, slice) and index.step in (None, 1) and (index.start or 0) >= 0 and (index.stop is None or index.stop >= 0):
+
+            # A forward slice (e.g. one page of a table) stops reading row numbers at its end
+            return [self.repo._materialize(r) for r in islice(self.repo._live_rows(), index.start, index.stop)]
+
+        rows = list(self.repo._live_rows())
+
+        if isinstance(index, slice):
+
+            return [self.repo._materialize(r) for r in rows[index]]
+
+        return self.repo._materialize(rows[index])
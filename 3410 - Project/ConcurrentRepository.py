@@ -0,0 +1,431 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+
+    def __init__(self):
+        """
+        Initializes a readers-writer lock for threads. Any number of readers can hold it at once;
+        a writer holds it alone. Waiting writers block new readers, so a steady stream of queries cannot starve writes.
+        A thread that already holds the lock (either way) may take it shared again, so read sections can nest.
+
+        Returns:
+            None
+        """
+
+        self._cond = threading.Condition()
+
+        self._readers = 0
+        self._writer = None
+        self._writers_waiting = 0
+
+        # How many times the current thread holds the lock shared
+        self._local = threading.local()
+
+    @contextmanager
+    def reading(self):
+        """
+        Holds the lock shared for the duration of a "with" block.
+
+        Returns:
+            ContextManager: The lock, held shared
+        """
+
+        held = getattr(self._local, "held", 0)
+
+        # Nested reads (or reads inside this thread's write) must not wait behind queued writers
+        if held or self._writer is threading.current_thread():
+
+            self._local.held = held + 1
+
+            try:
+
+                yield
+
+            finally:
+
+                self._local.held = held
+
+            return
+
+        with self._cond:
+
+            self._cond.wait_for(lambda: self._writer is None and self._writers_waiting == 0)
+
+            self._readers += 1
+
+        self._local.held = 1
+
+        try:
+
+            yield
+
+        finally:
+
+            self._local.held = 0
+
+            with self._cond:
+
+                self._readers -= 1
+
+                if self._readers == 0:
+
+                    self._cond.notify_all()
+
+    @contextmanager
+    def writing(self):
+        """
+        Holds the lock exclusively for the duration of a "with" block.
+
+        Returns:
+            ContextManager: The lock, held exclusively
+
+        Raises:
+            RuntimeError: If the current thread holds the lock shared (a read cannot be upgraded)
+        """
+
+        if getattr(self._local, "held", 0):
+
+            raise RuntimeError("Cannot write while holding the lock for reading.")
+
+        me = threading.current_thread()
+
+        # A nested write of the same thread already has the lock
+        if self._writer is me:
+
+            yield
+
+            return
+
+        with self._cond:
+
+            self._writers_waiting += 1
+
+            try:
+
+                self._cond.wait_for(lambda: self._writer is None and self._readers == 0)
+
+            finally:
+
+                self._writers_waiting -= 1
+
+            self._writer = me
+
+        try:
+
+            yield
+
+        finally:
+
+            with self._cond:
+
+                self._writer = None
+
+                self._cond.notify_all()
+
+
+class ConcurrentRepository:
+
+    # Methods that only read the backend and return plain values (no stored records), run under the shared lock.
+    # Every other backend method not defined here runs under the exclusive lock.
+    READ_METHODS = {
+
+        "countWhere", "modelAverage", "checkRecord",
+        "routeCount", "routeBlockTime", "routesFrom", "busiestAirports",
+        "findConflicts"
+
+    }
+
+    def __init__(self, repo):
+        """
+        Wraps a Repository backend so that it can be shared between threads.
+        Queries run in parallel under a shared lock; inserts, updates, deletes and loads take it exclusively.
+        Stored records are handed out as copies taken under the lock, so a caller never sees a record
+        change (or get cleared mid-update) after the query returned, like the SQLite backend.
+
+        Parameters:
+            repo (Repository): The backend to wrap (Repository, ColumnarRepository, ...)
+
+        Returns:
+            None
+        """
+
+        self.repo = repo
+        self.lock = ReadWriteLock()
+
+    def reading(self):
+        """
+        Holds the shared lock across several queries, so they all see the same state of the data.
+
+        Returns:
+            ContextManager: The lock, held shared
+        """
+
+        return self.lock.reading()
+
+    def __getattr__(self, name):
+        """
+        Forwards any other backend attribute. Methods in READ_METHODS run under the shared lock, other methods
+        under the exclusive lock; plain attributes (e.g. lastLoadReport, journal) are returned as they are.
+
+        Parameters:
+            name (str): The attribute name
+
+        Returns:
+            object: The attribute, or a locking wrapper around the method
+        """
+
+        attr = getattr(self.repo, name)
+
+        if not callable(attr):
+
+            return attr
+
+        lock = self.lock.reading if name in self.READ_METHODS else self.lock.writing
+
+        def locked(*args, **kwargs):
+
+            with lock():
+
+                return attr(*args, **kwargs)
+
+        return locked
+
+    # ---------------------------------------------------------
+    # QUERIES
+    # ---------------------------------------------------------
+
+    @property
+    def records(self):
+        """
+        Retrieves a snapshot of the stored records.
+
+        Returns:
+            list[dict]: Copies of the records, in insertion order
+        """
+
+        with self.lock.reading():
+
+            return [dict(rec) for rec in self.repo.records]
+
+    def getByFlightID(self, fid):
+        """
+        Retrieves a record matching the given flightID.
+
+        Parameters:
+            fid (str): The flightID to search for
+
+        Returns:
+            dict or None: A copy of the matching record, or None if not found
+        """
+
+        with self.lock.reading():
+
+            rec = self.repo.getByFlightID(fid)
+
+            return dict(rec) if rec is not None else None
+
+    def findWhere(self, **criteria):
+        """
+        Retrieves all records matching every given field value.
+
+        Parameters:
+            **criteria: Field/value pairs, see Repository.findWhere
+
+        Returns:
+            list[dict]: Copies of the matching records
+        """
+
+        with self.lock.reading():
+
+            return [dict(rec) for rec in self.repo.findWhere(**criteria)]
+
+    def findRoute(self, origin, destination):
+        """
+        Retrieves all flights from one location to another.
+
+        Parameters:
+            origin (str): The departure location
+            destination (str): The arrival location
+
+        Returns:
+            list[dict]: Copies of the matching records
+        """
+
+        with self.lock.reading():
+
+            return [dict(rec) for rec in self.repo.findRoute(origin, destination)]
+
+    def findBetween(self, start, end, **criteria):
+        """
+        Retrieves the records departing in [start, end).
+
+        Parameters:
+            start (datetime): The inclusive start of the window
+            end (datetime): The exclusive end of the window
+            **criteria: Further field/value pairs, see Repository.findBetween
+
+        Returns:
+            list[dict]: Copies of the matching records, in departure order
+        """
+
+        with self.lock.reading():
+
+            return [dict(rec) for rec in self.repo.findBetween(start, end, **criteria)]
+
+    def findByMonth(self, year, month, **criteria):
+        """
+        Retrieves the records departing in one calendar month.
+
+        Parameters:
+            year (int or str): The year
+            month (int or str): The month, 1 to 12
+            **criteria: Further field/value pairs, see Repository.findByMonth
+
+        Returns:
+            list[dict]: Copies of the matching records, in departure order
+        """
+
+        with self.lock.reading():
+
+            return [dict(rec) for rec in self.repo.findByMonth(year, month, **criteria)]
+
+    def findByDay(self, year, month, day, **criteria):
+        """
+        Retrieves the records departing on one calendar day.
+
+        Parameters:
+            year (int or str): The year
+            month (int or str): The month, 1 to 12
+            day (int or str): The day of the month
+            **criteria: Further field/value pairs, see Repository.findByDay
+
+        Returns:
+            list[dict]: Copies of the matching records, in departure order
+        """
+
+        with self.lock.reading():
+
+            return [dict(rec) for rec in self.repo.findByDay(year, month, day, **criteria)]
+
+    def parsedDates(self, rec):
+        """
+        Retrieves the parsed departure and arrival dates of a record, from the backend's cache
+        when the record (or a copy of it) is stored.
+
+        Parameters:
+            rec (dict): The record whose dates are needed
+
+        Returns:
+            tuple[datetime, datetime]: The (departure, arrival) dates
+        """
+
+        with self.lock.reading():
+
+            stored = self.repo.getByFlightID(rec["flightID"])
+
+            return self.repo.parsedDates(stored if stored == rec else rec)
+
+    # ---------------------------------------------------------
+    # CHANGES
+    # ---------------------------------------------------------
+
+    def insert(self, rec):
+        """
+        Inserts a new flight record. A copy is stored, so the caller's dict is never shared with other threads.
+
+        Parameters:
+            rec (dict): The record to insert (passengers and cargoWeight are normalized in place, as with Repository.insert)
+
+        Returns:
+            bool: True if insertion succeeds, False if validation fails
+        """
+
+        copy = dict(rec)
+
+        with self.lock.writing():
+
+            ok = self.repo.insert(copy)
+
+        rec.update(copy)
+
+        return ok
+
+    def insert_many(self, records, **kwargs):
+        """
+        Inserts many new flight records, holding the exclusive lock for the whole batch.
+
+        Parameters:
+            records (iterable[dict]): The records to insert
+            **kwargs: Passed on to Repository.insert_many
+
+        Returns:
+            dict: The accepted/rejected report of Repository.insert_many
+        """
+
+        with self.lock.writing():
+
+            return self.repo.insert_many((dict(r) if isinstance(r, dict) else r for r in records), **kwargs)
+
+    def update(self, old_rec, new_rec):
+        """
+        Validates and applies a full update to a stored record.
+        old_rec may be a copy; the stored record is found by flightID, and the copy is updated too.
+
+        Parameters:
+            old_rec (dict): The record before modification (or a copy of it)
+            new_rec (dict): The updated record containing new field values
+
+        Returns:
+            bool: True if the update succeeds, False otherwise
+        """
+
+        new_copy = dict(new_rec)
+
+        with self.lock.writing():
+
+            stored = self.repo.getByFlightID(old_rec["flightID"])
+
+            if stored is None:
+
+                print(f"Error: flightID '{old_rec['flightID']}' is not stored.")
+
+                return False
+
+            if not self.repo.update(stored, new_copy):
+
+                return False
+
+        old_rec.clear()
+        old_rec.update(new_copy)
+
+        return True
+
+    def delete(self, rec):
+        """
+        Removes a stored record. rec may be a copy; the stored record is found by flightID.
+
+        Parameters:
+            rec (dict): The record to remove (or a copy of it)
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the record is not stored, like list.remove
+        """
+
+        with self.lock.writing():
+
+            stored = self.repo.getByFlightID(rec["flightID"])
+
+            if stored is None:
+
+                raise ValueError("Record is not in the Repository.")
+
+            self.repo.delete(stored)
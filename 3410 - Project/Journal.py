@@ -0,0 +1,189 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import json
+import os
+
+
+class Journal:
+
+    def __init__(self, snapshot="flybase.json", filename=None, compact_every=1000):
+        """
+        Initializes an append-only write-ahead log that sits next to a JSON snapshot.
+        Every change is appended as one compact JSON line; the snapshot is only rewritten on compaction.
+
+        Parameters:
+            snapshot (str): The path of the JSON snapshot the log applies on top of
+            filename (str or None): The path of the log file, "<snapshot>.log" if None
+            compact_every (int): How many log entries to allow before compacting into the snapshot
+
+        Returns:
+            None
+        """
+
+        self.snapshot = snapshot
+        self.filename = filename if filename is not None else snapshot + ".log"
+        self.compact_every = compact_every
+
+        self.entries = 0
+
+    def record(self, op, rec=None, fid=None):
+        """
+        Appends one change to the log and forces it to disk, so it survives a crash.
+
+        Parameters:
+            op (str): "insert", "update" or "delete"
+            rec (dict or None): The new record (insert and update)
+            fid (str or None): The flightID the change applies to (update and delete)
+
+        Returns:
+            None
+        """
+
+        entry = {"op": op}
+
+        if fid is not None:
+
+            entry["flightID"] = fid
+
+        if rec is not None:
+
+            entry["rec"] = rec
+
+        with open(self.filename, "a") as f:
+
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.entries += 1
+
+    def needsCompaction(self):
+        """
+        Checks whether the log has grown past compact_every entries.
+
+        Returns:
+            bool: True if the log should be compacted, otherwise False
+        """
+
+        return self.entries >= self.compact_every
+
+    def replay(self, repo):
+        """
+        Re-applies every logged change to a Repository, normally right after the snapshot is loaded.
+        Replay is idempotent, so a log that was not truncated after a compaction is harmless.
+        A torn last line (from a crash mid-append) is cut off, so later appends start on a clean line.
+
+        Parameters:
+            repo (Repository): The Repository to apply the changes to
+
+        Returns:
+            int: The number of log entries applied
+        """
+
+        try:
+
+            f = open(self.filename, "rb+")
+
+        except FileNotFoundError:
+
+            return 0
+
+        applied = 0
+        good_end = 0
+
+        # Do not log the changes being replayed
+        journal, repo.journal = repo.journal, None
+
+        try:
+
+            with f:
+
+                for line in f:
+
+                    try:
+
+                        if not line.endswith(b"\n"):
+
+                            raise ValueError("Torn log entry")
+
+                        entry = json.loads(line)
+
+                    except ValueError:
+
+                        f.truncate(good_end)
+
+                        break
+
+                    self._apply(repo, entry)
+
+                    applied += 1
+                    good_end += len(line)
+
+        finally:
+
+            repo.journal = journal
+
+        self.entries = applied
+
+        return applied
+
+    def _apply(self, repo, entry):
+        """
+        Applies one log entry to a Repository, skipping it if the Repository already reflects it.
+
+        Parameters:
+            repo (Repository): The Repository to apply the change to
+            entry (dict): The decoded log entry
+
+        Returns:
+            None
+        """
+
+        op = entry["op"]
+
+        if op == "insert":
+
+            rec = entry["rec"]
+            existing = repo.getByFlightID(rec["flightID"])
+
+            if existing is None:
+
+                repo.insert(rec)
+
+            else:
+
+                repo.update(existing, rec)
+
+        elif op == "update":
+
+            existing = repo.getByFlightID(entry["flightID"])
+
+            if existing is not None:
+
+                repo.update(existing, entry["rec"])
+
+        elif op == "delete":
+
+            existing = repo.getByFlightID(entry["flightID"])
+
+            if existing is not None:
+
+                repo.delete(existing)
+
+    def truncate(self):
+        """
+        Empties the log, once its changes are safely in the snapshot.
+
+        Returns:
+            None
+        """
+
+        with open(self.filename, "w") as f:
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.entries = 0
@@ -0,0 +1,413 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import json
+import os
+import threading
+from array import array
+from collections import OrderedDict
+
+from ColumnarRepository import ColumnarRepository
+
+
+class LazyRepository(ColumnarRepository):
+
+    def __init__(self, cache_size=1000):
+        """
+        Initializes an empty lazily hydrated Repository. Loading a JSON file keeps only the columns
+        the queries and indexes need (see ColumnarRepository) plus the byte range of every record in the file;
+        the full record (with its mission and any extra fields, exactly as stored) is parsed from the file
+        the first time a lookup or a display needs it. At most cache_size parsed records are kept,
+        least recently used first out. Hydration holds its own lock, so concurrent readers
+        (e.g. under ConcurrentRepository's shared lock) can share the cache and the file handle.
+
+        Parameters:
+            cache_size (int): How many hydrated records to keep in memory
+
+        Returns:
+            None
+        """
+
+        self.cache_size = cache_size
+
+        # The JSON file the file-backed rows point into, and an open binary handle on it
+        self._source = None
+        self._source_file = None
+
+        # Held while a reader uses the hydrated records or the handle, since both change on every read
+        self._hydrate_lock = threading.Lock()
+
+        # (record, start, end) of the record loadFromFile is inserting, so _add_record can keep its byte range
+        self._loading = None
+
+        super().__init__()
+
+    def _reset_columns(self):
+        """
+        Clears every column, the byte ranges and the hydrated records.
+
+        Returns:
+            None
+        """
+
+        super()._reset_columns()
+
+        # Byte range of each row's record in the source file; end 0 marks a row that lives only in memory
+        # (inserted or updated since the file was loaded), which is rebuilt from the columns instead
+        self._starts = array("Q")
+        self._ends = array("Q")
+
+        # Row -> parsed record, least recently used first
+        self._hydrated = OrderedDict()
+
+    # ---------------------------------------------------------
+    # LOADING
+    # ---------------------------------------------------------
+
+    def loadFromFile(self, filename="flybase.json", progress=None, progress_every=10000, **kwargs):
+        """
+        Loads flight records from a JSON file lazily. Every record is still validated through insert_many,
+        but only its indexed columns and byte range are kept. The file is always streamed in this process,
+        since the byte ranges come from the decoder, so stream, workers and snapshot are ignored.
+        Only a load into an empty Repository is lazy; records added to a non-empty one are kept in memory.
+
+        Parameters:
+            filename (str): The path to the JSON file to load
+            progress (callable or None): Called as progress(read, inserted) every progress_every records
+            progress_every (int): How many records to read between progress reports
+            **kwargs: Ignored (the options of Repository.loadFromFile)
+
+        Returns:
+            int: The number of successfully inserted records
+        """
+
+        try:
+
+            # latin-1 maps every byte to one character, so character offsets are byte offsets
+            f = open(filename, "r", encoding="latin-1")
+
+        except FileNotFoundError:
+
+            print("No existing database. Starting empty.")
+
+            return 0
+
+        was_empty = len(self.records) == 0
+
+        if was_empty:
+
+            self._open_source(filename)
+
+        raw = open(filename, "rb")
+
+        def located():
+
+            for start, end, obj in self._iter_json_array(f, with_offsets=True):
+
+                # Anything but plain ASCII may have been mis-decoded as latin-1, so it is parsed again as UTF-8
+                if isinstance(obj, dict) and not _plain_ascii(obj):
+
+                    raw.seek(start)
+
+                    obj = json.loads(raw.read(end - start))
+
+                if was_empty:
+
+                    self._loading = (obj, start, end)
+
+                yield obj
+
+        self._restoring += 1
+
+        try:
+
+            with f, raw:
+
+                report = self.insert_many(located(), progress=progress, progress_every=progress_every)
+
+        finally:
+
+            self._loading = None
+
+            self._restoring -= 1
+
+        self._mark_synced(filename if was_empty else None)
+
+        self._finish_load(report)
+
+        return report["accepted"]
+
+    def _open_source(self, filename):
+        """
+        Makes a JSON file the one file-backed rows are read from, opening a handle on it.
+
+        Parameters:
+            filename (str): The JSON file
+
+        Returns:
+            None
+        """
+
+        self._close_source()
+
+        self._source = os.path.abspath(filename)
+        self._source_file = open(filename, "rb")
+
+    def _close_source(self):
+        """
+        Closes the handle on the source file (the rows keep pointing into it).
+
+        Returns:
+            None
+        """
+
+        if self._source_file is not None:
+
+            self._source_file.close()
+
+            self._source_file = None
+
+    # ---------------------------------------------------------
+    # HYDRATION
+    # ---------------------------------------------------------
+
+    def _materialize(self, row):
+        """
+        Retrieves the record stored in a row: parsed from the source file (through the cache of hydrated records)
+        for a file-backed row, rebuilt from the columns for a row that lives in memory.
+
+        Parameters:
+            row (int): The row to rebuild
+
+        Returns:
+            dict: A copy of the stored record
+        """
+
+        if self._ends[row] == 0:
+
+            return super()._materialize(row)
+
+        with self._hydrate_lock:
+
+            rec = self._hydrated.get(row)
+
+            if rec is None:
+
+                rec = self._hydrated[row] = self._hydrate(row)
+
+                if len(self._hydrated) > self.cache_size:
+
+                    self._hydrated.popitem(last=False)
+
+            else:
+
+                self._hydrated.move_to_end(row)
+
+            return dict(rec)
+
+    def _hydrate(self, row):
+        """
+        Parses the record of a file-backed row from its byte range in the source file. The caller holds _hydrate_lock.
+
+        Parameters:
+            row (int): The row
+
+        Returns:
+            dict: The record, with passengers and cargoWeight normalized as insert stored them
+
+        Raises:
+            ValueError: If the file no longer holds that record there (it was changed by another program)
+        """
+
+        if self._source_file is None:
+
+            self._source_file = open(self._source, "rb")
+
+        self._source_file.seek(self._starts[row])
+
+        data = self._source_file.read(self._ends[row] - self._starts[row])
+
+        fid = f"FLT{self._fids[row]:06d}"
+
+        try:
+
+            rec = json.loads(data)
+
+        except ValueError:
+
+            rec = None
+
+        if not isinstance(rec, dict) or rec.get("flightID") != fid:
+
+            raise ValueError(f"{self._source} was changed on disk since it was loaded; {fid} is no longer where it was.")
+
+        self._normalize_types(rec)
+
+        return rec
+
+    # ---------------------------------------------------------
+    # STORAGE
+    # ---------------------------------------------------------
+
+    def _add_record(self, rec, dates):
+        """
+        Stores an already validated record as a new row. While loadFromFile is inserting it, the row keeps
+        its byte range instead of its mission and extra fields.
+
+        Parameters:
+            rec (dict): The record to store
+            dates (tuple): The parsed (departure, arrival) dates of the record
+
+        Returns:
+            None
+        """
+
+        row = len(self._fids)
+
+        super()._add_record(rec, dates)
+
+        if self._loading is not None and self._loading[0] is rec:
+
+            self._starts.append(self._loading[1])
+            self._ends.append(self._loading[2])
+
+            self._missions.pop(row, None)
+            self._extras.pop(row, None)
+
+        else:
+
+            self._starts.append(0)
+            self._ends.append(0)
+
+    def _clear_row(self, row):
+        """
+        Marks a row as deleted (or about to be overwritten in memory), dropping its byte range and hydrated record.
+
+        Parameters:
+            row (int): The row to clear
+
+        Returns:
+            None
+        """
+
+        super()._clear_row(row)
+
+        self._starts[row] = 0
+        self._ends[row] = 0
+
+        self._hydrated.pop(row, None)
+
+    def _compact(self):
+        """
+        Rebuilds every column, including the byte ranges, without its deleted rows.
+
+        Returns:
+            None
+        """
+
+        live = list(self._live_rows())
+
+        super()._compact()
+
+        for column in (self._starts, self._ends):
+
+            column[:] = array(column.typecode, (column[r] for r in live))
+
+        # Cached records are keyed by their old row numbers
+        self._hydrated.clear()
+
+    # ---------------------------------------------------------
+    # SAVING
+    # ---------------------------------------------------------
+
+    def _write_merged(self, filename, elements, changed):
+        """
+        Writes a JSON array file like Repository._write_merged. When it is the source file, the handle on it
+        is closed while the file is replaced (so this works where open files cannot be replaced),
+        and the rows then point into the new file.
+
+        Parameters:
+            filename (str): The JSON array file to write
+            elements (list[list]): [flightID or None, start, end] per existing element in file order
+            changed (dict): flightID -> record for the records to (re)write
+
+        Returns:
+            int: The number of elements in the written file
+        """
+
+        if os.path.abspath(filename) != self._source:
+
+            return super()._write_merged(filename, elements, changed)
+
+        self._close_source()
+
+        try:
+
+            return super()._write_merged(filename, elements, changed)
+
+        finally:
+
+            self._source_file = open(filename, "rb")
+
+    def _write_offsets(self, filename, elements):
+        """
+        Writes the offset sidecar of a JSON array file like Repository._write_offsets. When it is the source file,
+        every stored record in it becomes file-backed at its new byte range, so its mission and extra fields
+        no longer need to stay in memory.
+
+        Parameters:
+            filename (str): The JSON array file the offsets belong to
+            elements (list[list]): [flightID or None, start, end] per element in file order
+
+        Returns:
+            None
+        """
+
+        super()._write_offsets(filename, elements)
+
+        if os.path.abspath(filename) != self._source:
+
+            return
+
+        for fid, start, end in elements:
+
+            row = self._row_of(fid)
+
+            if row is None:
+
+                continue
+
+            self._starts[row] = start
+            self._ends[row] = end
+
+            self._missions.pop(row, None)
+            self._extras.pop(row, None)
+
+
+
+def _plain_ascii(rec):
+    """
+    Checks whether a record decoded as latin-1 is certainly the same as decoded as UTF-8:
+    every key and string value is ASCII and no value is a nested list or object.
+
+    Parameters:
+        rec (dict): The decoded record
+
+    Returns:
+        bool: True if the record needs no second decode
+    """
+
+    for key, value in rec.items():
+
+        if not key.isascii():
+
+            return False
+
+        kind = type(value)
+
+        if (kind is str and not value.isascii()) or kind is dict or kind is list:
+
+            return False
+
+    return True
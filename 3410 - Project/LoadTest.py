@@ -0,0 +1,286 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+# Local load-test client for QueryService, run with e.g. "python LoadTest.py --clients 50 --requests 200"
+# against a service started with "python QueryService.py".
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote
+
+from QueryService import AIRLINE_PASSWORD
+
+
+class LoadClient:
+
+    def __init__(self, host="127.0.0.1", port=8034):
+        """
+        Initializes a keep-alive HTTP connection to a QueryService (opened by connect).
+
+        Parameters:
+            host (str): The service address
+            port (int): The service port
+
+        Returns:
+            None
+        """
+
+        self.host = host
+        self.port = port
+
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        """
+        Opens the connection.
+
+        Returns:
+            None
+        """
+
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        """
+        Sends one request as an Airline user and waits for its response.
+
+        Parameters:
+            method (str): The HTTP method
+            path (str): The request path (already quoted)
+            payload (dict or None): The JSON body, if any
+
+        Returns:
+            tuple[int, object]: The status code and the decoded JSON response
+        """
+
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+
+        self.writer.write(
+
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"X-Airline-Password: {AIRLINE_PASSWORD}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+
+        )
+
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+
+        headers = {}
+
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+
+            name, _, value = line.decode("latin-1").partition(":")
+
+            headers[name.strip().lower()] = value.strip()
+
+        data = await self.reader.readexactly(int(headers["content-length"]))
+
+        return status, json.loads(data)
+
+    async def close(self):
+        """
+        Closes the connection.
+
+        Returns:
+            None
+        """
+
+        self.writer.close()
+
+        await self.writer.wait_closed()
+
+
+async def runClient(client_no, args, sample, latencies, failures):
+    """
+    Runs one simulated analyst: a stream of statistics queries, with a share of inserts, updates and deletes
+    on flights only this client uses.
+
+    Parameters:
+        client_no (int): The client number, which keeps the flightIDs of different clients apart
+        args (argparse.Namespace): The load-test settings
+        sample (dict): Values seen in the dataset (airlines, years, models, types, pilots, a template record)
+        latencies (dict): Filled with {request kind: [seconds, ...]}
+        failures (list): Filled with (request, status, response) for unexpected responses
+
+    Returns:
+        None
+    """
+
+    rnd = random.Random(client_no)
+
+    client = LoadClient(args.host, args.port)
+
+    await client.connect()
+
+    # Flights this client created and has not deleted yet
+    mine = []
+    next_id = 0
+
+    try:
+
+        for _ in range(args.requests):
+
+            if rnd.random() < args.writes:
+
+                if mine and rnd.random() < 0.5:
+
+                    fid = mine.pop(rnd.randrange(len(mine)))
+
+                    if rnd.random() < 0.5:
+
+                        kind, method, path, payload, expected = "delete", "DELETE", f"/flights/{fid}", None, 200
+
+                    else:
+
+                        mine.append(fid)
+
+                        rec = dict(sample["template"], flightID=fid, airline=rnd.choice(sample["airlines"]))
+
+                        kind, method, path, payload, expected = "update", "PUT", f"/flights/{fid}", rec, 200
+
+                else:
+
+                    # flightIDs FLT9xxxxx are left to the load test
+                    fid = f"FLT9{client_no:02d}{next_id:03d}"
+                    next_id += 1
+
+                    mine.append(fid)
+
+                    rec = dict(sample["template"], flightID=fid)
+
+                    kind, method, path, payload, expected = "insert", "POST", "/flights", rec, 201
+
+            else:
+
+                kind, path = rnd.choice([
+
+                    ("pilotStats", f"/stats/pilot/{quote(rnd.choice(sample['pilots']), safe='')}"),
+                    ("airlineTotal", f"/stats/airline/{quote(rnd.choice(sample['airlines']), safe='')}"),
+                    ("airlineYear", f"/stats/airline/{quote(rnd.choice(sample['airlines']), safe='')}/{rnd.choice(sample['years'])}"),
+                    ("flightsByYear", f"/flights/year/{rnd.choice(sample['years'])}?limit=50"),
+                    ("flightsByType", f"/flights/type/{quote(rnd.choice(sample['types']), safe='')}?limit=50"),
+                    ("avgPassengers", f"/stats/model/{quote(rnd.choice(sample['models']), safe='')}/passengers"),
+                    ("avgCargo", f"/stats/model/{quote(rnd.choice(sample['models']), safe='')}/cargo")
+
+                ])
+
+                method, payload, expected = "GET", None, 200
+
+            start = time.perf_counter()
+
+            status, response = await client.request(method, path, payload)
+
+            latencies.setdefault(kind, []).append(time.perf_counter() - start)
+
+            if status != expected:
+
+                failures.append((f"{method} {path}", status, response))
+
+        # Leave the dataset as it was
+        for fid in mine:
+
+            await client.request("DELETE", f"/flights/{fid}")
+
+    finally:
+
+        await client.close()
+
+
+async def loadTest(args):
+    """
+    Runs args.clients simulated analysts at once against a running QueryService and prints the throughput
+    and latency percentiles of each request kind.
+
+    Parameters:
+        args (argparse.Namespace): The load-test settings
+
+    Returns:
+        bool: True if every response had the expected status, otherwise False
+    """
+
+    # Learn some real query values from the service itself
+    probe = LoadClient(args.host, args.port)
+
+    await probe.connect()
+
+    sample = {"airlines": set(), "years": set(), "models": set(), "types": set(), "pilots": set()}
+
+    for ft in ("public", "private", "cargo", "military"):
+
+        status, response = await probe.request("GET", f"/flights/type/{ft}?limit=200")
+
+        for rec in response["flights"]:
+
+            sample["airlines"].add(rec["airline"])
+            sample["years"].add(rec["departureDate"][-4:])
+            sample["models"].add(rec["aircraftModel"])
+            sample["types"].add(rec["flightType"])
+            sample["pilots"].add(rec["pilotID"])
+
+            sample.setdefault("template", rec)
+
+    await probe.close()
+
+    if "template" not in sample:
+
+        print("The service has no flights to query.")
+
+        return False
+
+    sample = {k: sorted(v) if isinstance(v, set) else v for k, v in sample.items()}
+
+    latencies = {}
+    failures = []
+
+    start = time.perf_counter()
+
+    await asyncio.gather(*(runClient(c, args, sample, latencies, failures) for c in range(args.clients)))
+
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(v) for v in latencies.values())
+
+    print(f"=== {args.clients} clients x {args.requests} requests ({args.writes:.0%} writes) ===")
+    print(f"{total} requests in {elapsed:.2f} s  ({total / elapsed:.0f} req/s)\n")
+    print(f"{'request':15} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+
+    for kind, times in sorted(latencies.items()):
+
+        times.sort()
+
+        pick = lambda q: times[min(len(times) - 1, int(q * len(times)))] * 1000
+
+        print(f"{kind:15} {len(times):7} {pick(0.50):9.2f} {pick(0.95):9.2f} {pick(0.99):9.2f} {times[-1] * 1000:9.2f}")
+
+    for request, status, response in failures[:10]:
+
+        print(f"Unexpected {status} for {request}: {response}")
+
+    if len(failures) > 10:
+
+        print(f"... and {len(failures) - 10} more unexpected responses.")
+
+    return not failures
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Load-test a running QueryService.")
+
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8034)
+    parser.add_argument("--clients", type=int, default=20, help="how many analysts query at once (at most 100)")
+    parser.add_argument("--requests", type=int, default=100, help="how many requests each analyst sends (at most 1000)")
+    parser.add_argument("--writes", type=float, default=0.0, help="the share of requests that change records (0 to 1)")
+
+    args = parser.parse_args()
+
+    raise SystemExit(0 if asyncio.run(loadTest(args)) else 1)
@@ -0,0 +1,284 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import json
+from bisect import bisect_left
+
+from Archive import Archive
+from ColumnarRepository import ColumnarRepository, _Categories
+
+
+class MappedRepository(ColumnarRepository):
+
+    def __init__(self, filename=None):
+        """
+        Initializes a read-only Repository over a memory-mapped flight archive (see ColumnarRepository.saveArchive).
+        Every column is a typed view over the mapped file, so the scans of ColumnarRepository (countWhere,
+        modelAverage, the route queries, findBetween, ...) run over the mapped pages without loading them
+        into Python objects, and a record is only decoded when a query returns it.
+        flightIDs are found by binary search in the archive's sorted flightID index.
+
+        Parameters:
+            filename (str or None): An archive to open right away, or None to start empty
+
+        Returns:
+            None
+        """
+
+        self._mapped = None
+        self._sections = []
+
+        super().__init__()
+
+        if filename is not None:
+
+            self.openArchive(filename)
+
+    def _reset_columns(self):
+        """
+        Clears every column, including the flightID index and the mission/extras sections.
+
+        Returns:
+            None
+        """
+
+        super()._reset_columns()
+
+        self._index_fids = []
+        self._index_rows = []
+
+        self._tail_rows = []
+        self._tail_offsets = [0]
+        self._tail = b""
+
+    # ---------------------------------------------------------
+    # OPENING AND CLOSING
+    # ---------------------------------------------------------
+
+    def openArchive(self, filename="flybase.arc", source=None):
+        """
+        Memory-maps a flight archive, replacing whatever was open. Only the small categorical string tables
+        are read up front; the columns stay on disk until a query touches them.
+
+        When source is given and the archive was not made from that JSON file as it is now (or is missing),
+        the archive is first rebuilt from it through a ColumnarRepository.
+
+        Parameters:
+            filename (str): The path of the archive file
+            source (str or None): The JSON file the archive is kept in step with
+
+        Returns:
+            int: The number of records in the archive
+
+        Raises:
+            FileNotFoundError: If the archive (or source) does not exist
+            ValueError: If the file is not a valid archive
+        """
+
+        archive = Archive(filename)
+
+        if source is not None and not archive.matches(source):
+
+            columns = ColumnarRepository()
+            columns.loadFromFile(source, stream=True)
+            columns.saveArchive(filename, source=source)
+
+        mapped, sections = archive.open()
+
+        try:
+
+            tables = json.loads(bytes(sections[-1]))
+
+        except ValueError as e:
+
+            sections.clear()
+            mapped.close()
+
+            raise ValueError(f"{filename} has a corrupt string table: {e}")
+
+        self.close()
+
+        self._mapped = mapped
+        self._sections = sections
+
+        n = len(self.CATEGORICAL_FIELDS)
+
+        (self._fids, self._departures, self._arrivals, self._years, self._passengers, self._cargo) = sections[:6]
+
+        self._codes = dict(zip(self.CATEGORICAL_FIELDS, sections[6:6 + n]))
+
+        (self._index_fids, self._index_rows, self._tail_rows, self._tail_offsets, self._tail) = sections[6 + n:11 + n]
+
+        # Codes are handed out in order, so re-encoding each table gives every value its stored code back
+        for field, values in zip(self.CATEGORICAL_FIELDS, tables):
+
+            categories = self._categories[field] = _Categories()
+
+            for value in values:
+
+                categories.encode(value)
+
+        return len(self._fids)
+
+    def close(self):
+        """
+        Drops every view over the mapped archive and unmaps it, leaving the Repository empty.
+
+        Returns:
+            None
+        """
+
+        self._reset_columns()
+
+        self._sections = []
+
+        if self._mapped is not None:
+
+            self._mapped.close()
+
+            self._mapped = None
+
+    def saveArchive(self, filename="flybase.arc", source=None):
+        """
+        Copies the open archive to another archive file.
+
+        Parameters:
+            filename (str): The path of the new archive file
+            source (str or None): The JSON file to record as its source
+
+        Returns:
+            int: The number of records written
+        """
+
+        Archive(filename).write(self._sections, source=source)
+
+        return len(self._fids)
+
+    # ---------------------------------------------------------
+    # ROW HELPERS
+    # ---------------------------------------------------------
+
+    def _row_of(self, fid):
+        """
+        Retrieves the row number of a flightID by binary search in the archive's flightID index.
+
+        Parameters:
+            fid (str): The flightID to look up
+
+        Returns:
+            int or None: The row number, or None if the flightID is not stored
+        """
+
+        if not (isinstance(fid, str) and fid.startswith("FLT") and len(fid) == 9 and fid[3:].isdigit()):
+
+            return None
+
+        number = int(fid[3:])
+
+        i = bisect_left(self._index_fids, number)
+
+        if i == len(self._index_fids) or self._index_fids[i] != number:
+
+            return None
+
+        return self._index_rows[i]
+
+    def _live_count(self):
+        """
+        Counts the stored records (an archive has no deleted rows).
+
+        Returns:
+            int: The number of records
+        """
+
+        return len(self._fids)
+
+    def _materialize(self, row):
+        """
+        Rebuilds the record dict stored in a row, decoding its mission and extra fields (if any) from the archive.
+
+        Parameters:
+            row (int): The row to rebuild
+
+        Returns:
+            dict: A copy of the stored record
+        """
+
+        rec = super()._materialize(row)
+
+        i = bisect_left(self._tail_rows, row)
+
+        if i < len(self._tail_rows) and self._tail_rows[i] == row:
+
+            rec.update(json.loads(bytes(self._tail[self._tail_offsets[i]:self._tail_offsets[i + 1]])))
+
+        return rec
+
+    # ---------------------------------------------------------
+    # READ-ONLY
+    # ---------------------------------------------------------
+
+    def insert(self, rec):
+        """
+        Rejects an insert: an archive is read-only.
+
+        Parameters:
+            rec (dict): The record to insert
+
+        Returns:
+            bool: Always False
+        """
+
+        print("Error: the flight archive is read-only.")
+
+        return False
+
+    def insert_many(self, records, **kwargs):
+        """
+        Rejects a bulk insert (and so loadFromFile and loadSnapshot): an archive is read-only.
+
+        Parameters:
+            records (iterable[dict]): The records to insert
+            **kwargs: Ignored
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: Always
+        """
+
+        raise ValueError("The flight archive is read-only.")
+
+    def update(self, old_rec, new_rec):
+        """
+        Rejects an update: an archive is read-only.
+
+        Parameters:
+            old_rec (dict): The original record
+            new_rec (dict): The updated record
+
+        Returns:
+            bool: Always False
+        """
+
+        print("Error: the flight archive is read-only.")
+
+        return False
+
+    def delete(self, rec):
+        """
+        Rejects a delete: an archive is read-only.
+
+        Parameters:
+            rec (dict): The record to remove
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: Always
+        """
+
+        raise ValueError("The flight archive is read-only.")
@@ -0,0 +1,337 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import os
+from datetime import timedelta
+
+from Partitions import Partitions
+
+
+class PartitionedRepository:
+
+    # Methods that do not need any stored record, so they never load a partition
+    UNLOADED_METHODS = {"parsedDates", "loadPartitions", "savePartitions", "refreshSnapshot"}
+
+    def __init__(self, repo, folder="flybase.parts", workers=1):
+        """
+        Wraps a Repository backend whose records live in a partition folder (see Partitions), loading partitions
+        only when they are needed. Queries that name a year and/or airline (findWhere, countWhere, and the
+        departure-window queries, so e.g. Server.airlineYear and Server.flightsByYear) load only the matching
+        partitions, and so do insert, update and delete (the partition of the record's year and airline);
+        anything else (a flightID lookup, a route query, ...) loads them all first, since it may involve any flight.
+        Saving rewrites only the partitions that changed, without loading the others.
+        Like loadPartitions, a change is only checked (flightID uniqueness, conflicts) against the partitions loaded so far.
+
+        Loading happens inside queries, so wrap this in a ConcurrentRepository, not the other way around,
+        if it is shared between threads.
+
+        Parameters:
+            repo (Repository): The backend to wrap (Repository, ColumnarRepository, ...)
+            folder (str): The partition folder
+            workers (int): How many processes read partitions when several are loaded at once
+
+        Returns:
+            None
+        """
+
+        self.repo = repo
+        self.folder = folder
+        self.workers = workers
+
+        # Set once every partition is loaded, so later calls skip listing the folder
+        self._complete = False
+
+    def _need(self, year=None, airline=None):
+        """
+        Loads the partitions of a year and/or airline that are not loaded yet.
+
+        Parameters:
+            year (int or str or None): The departure year, None for every year
+            airline (str or None): The airline, None for every airline
+
+        Returns:
+            None
+        """
+
+        if self._complete or not Partitions(self.folder).exists():
+
+            return
+
+        self.repo.loadPartitions(self.folder, year=year, airline=airline, workers=self.workers)
+
+        if year is None and airline is None:
+
+            self._complete = True
+
+    def __getattr__(self, name):
+        """
+        Forwards any other backend attribute. Methods load every partition before they run
+        (except UNLOADED_METHODS); plain attributes (e.g. lastLoadReport, AGGREGATED_FIELDS) are returned as they are.
+
+        Parameters:
+            name (str): The attribute name
+
+        Returns:
+            object: The attribute, or a wrapper that loads all partitions before calling the method
+        """
+
+        attr = getattr(self.repo, name)
+
+        if not callable(attr) or name in self.UNLOADED_METHODS:
+
+            return attr
+
+        def loaded(*args, **kwargs):
+
+            self._need()
+
+            return attr(*args, **kwargs)
+
+        return loaded
+
+    @property
+    def records(self):
+        """
+        Retrieves the stored records, after loading every partition.
+
+        Returns:
+            The backend's records
+        """
+
+        self._need()
+
+        return self.repo.records
+
+    # ---------------------------------------------------------
+    # PRUNED QUERIES
+    # ---------------------------------------------------------
+
+    def findWhere(self, **criteria):
+        """
+        Retrieves all records matching every given field value, loading only the partitions they can be in.
+
+        Parameters:
+            **criteria: Field/value pairs, see Repository.findWhere
+
+        Returns:
+            list[dict]: The matching records
+        """
+
+        self._need(criteria.get("year"), criteria.get("airline"))
+
+        return self.repo.findWhere(**criteria)
+
+    def countWhere(self, **criteria):
+        """
+        Counts all records matching every given field value, loading only the partitions they can be in.
+
+        Parameters:
+            **criteria: Field/value pairs, see Repository.countWhere
+
+        Returns:
+            int: The number of matching records
+        """
+
+        self._need(criteria.get("year"), criteria.get("airline"))
+
+        return self.repo.countWhere(**criteria)
+
+    def findBetween(self, start, end, **criteria):
+        """
+        Retrieves the records departing in [start, end), loading only the partitions of the years in the window.
+
+        Parameters:
+            start (datetime): The inclusive start of the window
+            end (datetime): The exclusive end of the window
+            **criteria: Further field/value pairs, see Repository.findBetween
+
+        Returns:
+            list[dict]: The matching records, in departure order
+        """
+
+        if end > start:
+
+            for year in range(start.year, (end - timedelta(microseconds=1)).year + 1):
+
+                if criteria.get("year") is None or str(criteria["year"]) == str(year):
+
+                    self._need(year, criteria.get("airline"))
+
+        return self.repo.findBetween(start, end, **criteria)
+
+    def findByMonth(self, year, month, **criteria):
+        """
+        Retrieves the records departing in one calendar month, loading only the partitions of that year.
+
+        Parameters:
+            year (int or str): The year
+            month (int or str): The month, 1 to 12
+            **criteria: Further field/value pairs, see Repository.findByMonth
+
+        Returns:
+            list[dict]: The matching records, in departure order
+        """
+
+        self._need(year, criteria.get("airline"))
+
+        return self.repo.findByMonth(year, month, **criteria)
+
+    def findByDay(self, year, month, day, **criteria):
+        """
+        Retrieves the records departing on one calendar day, loading only the partitions of that year.
+
+        Parameters:
+            year (int or str): The year
+            month (int or str): The month, 1 to 12
+            day (int or str): The day of the month
+            **criteria: Further field/value pairs, see Repository.findByDay
+
+        Returns:
+            list[dict]: The matching records, in departure order
+        """
+
+        self._need(year, criteria.get("airline"))
+
+        return self.repo.findByDay(year, month, day, **criteria)
+
+    # ---------------------------------------------------------
+    # PRUNED CHANGES
+    # ---------------------------------------------------------
+
+    def _need_record(self, rec):
+        """
+        Loads the partition a record belongs in, if it is not loaded yet.
+        Nothing is loaded for a record with no valid departure date or airline, since the backend rejects it anyway.
+
+        Parameters:
+            rec (dict): The record
+
+        Returns:
+            None
+        """
+
+        try:
+
+            year = self.repo.parsedDates(rec)[0].year
+
+        except (KeyError, TypeError, ValueError):
+
+            return
+
+        airline = rec.get("airline")
+
+        if isinstance(airline, str):
+
+            self._need(year, airline)
+
+    def insert(self, rec):
+        """
+        Inserts a new flight record, loading only the partition of its year and airline first.
+
+        Parameters:
+            rec (dict): The record to insert, see Repository.insert
+
+        Returns:
+            bool: True if the record was inserted
+        """
+
+        self._need_record(rec)
+
+        return self.repo.insert(rec)
+
+    def update(self, old_rec, new_rec):
+        """
+        Replaces a stored flight record, loading only the partition the new version belongs in first
+        (the old version's partition is loaded already, since it was found there).
+
+        Parameters:
+            old_rec (dict): The stored record
+            new_rec (dict): The replacement, see Repository.update
+
+        Returns:
+            bool: True if the record was updated
+        """
+
+        self._need_record(new_rec)
+
+        return self.repo.update(old_rec, new_rec)
+
+    def delete(self, rec):
+        """
+        Deletes a stored flight record. Its partition is loaded already, since it was found there.
+
+        Parameters:
+            rec (dict): The stored record
+
+        Returns:
+            None
+        """
+
+        return self.repo.delete(rec)
+
+    # ---------------------------------------------------------
+    # PERSISTENCE
+    # ---------------------------------------------------------
+    # The JSON file API of Repository, mapped onto the partition folder so the Client can use either.
+
+    def loadFromFile(self, filename="flybase.json", progress=None, **kwargs):
+        """
+        Loads every partition. If the partition folder does not exist yet, it is first created from the JSON file.
+
+        Parameters:
+            filename (str): The JSON file to split into partitions when there are none yet
+            progress (callable or None): Passed on to loadFromFile when the JSON file is split
+            **kwargs: Passed on to loadFromFile when the JSON file is split (e.g. stream=True)
+
+        Returns:
+            int: The number of records loaded
+        """
+
+        if not Partitions(self.folder).exists() and os.path.exists(filename):
+
+            count = self.repo.loadFromFile(filename, progress=progress, **kwargs)
+
+            self.repo.savePartitions(self.folder)
+
+            self._complete = True
+
+            return count
+
+        before = len(self.repo.records)
+
+        self._need()
+
+        return len(self.repo.records) - before
+
+    def saveToFile(self, filename=None):
+        """
+        Saves the changed partitions, without loading the partitions that are not loaded.
+        If the backend is not in sync with the folder (e.g. it held records before it was wrapped), every
+        partition is rewritten from the stored records, so all of them are loaded first.
+
+        Parameters:
+            filename (str or None): Ignored, the partition folder is written
+
+        Returns:
+            None
+        """
+
+        if self.repo._synced_file != os.path.abspath(self.folder):
+
+            self._need()
+
+        self.repo.savePartitions(self.folder)
+
+    def appendToFile(self, filename=None):
+        """
+        Saves the changed partitions (the same as saveToFile, which already writes only what changed).
+
+        Parameters:
+            filename (str or None): Ignored, the partition folder is written
+
+        Returns:
+            None
+        """
+
+        self.saveToFile(filename)
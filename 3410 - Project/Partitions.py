@@ -0,0 +1,157 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import json
+import os
+from urllib.parse import quote, unquote
+
+
+class Partitions:
+
+    def __init__(self, folder="flybase.parts"):
+        """
+        Initializes a partitioned flight database: one JSON array file per departure year and airline,
+        laid out as "<folder>/<year>/<airline>.json". The airline is lowercased (airlines match case-insensitively,
+        like the Repository index) and percent-encoded, so any name is a safe file name.
+        Each file has the same format as flybase.json, so it can also be loaded on its own with loadFromFile.
+
+        Parameters:
+            folder (str): The folder holding the partitions
+
+        Returns:
+            None
+        """
+
+        self.folder = folder
+
+    def exists(self):
+        """
+        Checks whether the partition folder exists.
+
+        Returns:
+            bool: True if it exists
+        """
+
+        return os.path.isdir(self.folder)
+
+    def path(self, key):
+        """
+        Retrieves the file of one partition.
+
+        Parameters:
+            key (tuple[str, str]): The (year, lowercased airline) of the partition
+
+        Returns:
+            str: The path of the partition file
+        """
+
+        year, airline = key
+
+        return os.path.join(self.folder, year, quote(airline, safe="") + ".json")
+
+    def keys(self):
+        """
+        Lists the partitions stored in the folder.
+
+        Returns:
+            list[tuple[str, str]]: The (year, lowercased airline) of every partition, sorted
+        """
+
+        if not self.exists():
+
+            return []
+
+        keys = []
+
+        for year in os.scandir(self.folder):
+
+            if not (year.is_dir() and year.name.isdigit()):
+
+                continue
+
+            for entry in os.scandir(year.path):
+
+                if entry.is_file() and entry.name.endswith(".json"):
+
+                    keys.append((year.name, unquote(entry.name[:-len(".json")])))
+
+        return sorted(keys)
+
+    def matching(self, year=None, airline=None):
+        """
+        Lists the stored partitions that can hold flights of a year and/or airline.
+
+        Parameters:
+            year (int or str or None): The departure year, None for every year
+            airline (str or None): The airline (case-insensitive), None for every airline
+
+        Returns:
+            list[tuple[str, str]]: The matching partition keys, sorted
+        """
+
+        return [
+
+            key for key in self.keys()
+
+            if (year is None or key[0] == str(year)) and (airline is None or key[1] == str(airline).lower())
+
+        ]
+
+    def read(self, key):
+        """
+        Reads the records of one partition.
+
+        Parameters:
+            key (tuple[str, str]): The partition to read
+
+        Returns:
+            list[dict]: The records in the partition file (empty if it does not exist)
+        """
+
+        try:
+
+            with open(self.path(key), "r") as f:
+
+                return json.load(f)
+
+        except FileNotFoundError:
+
+            return []
+
+    def write(self, key, records):
+        """
+        Atomically rewrites one partition, through a temporary file renamed over it.
+        A partition with no records left is removed.
+
+        Parameters:
+            key (tuple[str, str]): The partition to write
+            records (list[dict]): Its records
+
+        Returns:
+            None
+        """
+
+        path = self.path(key)
+
+        if not records:
+
+            if os.path.exists(path):
+
+                os.remove(path)
+
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp = path + ".tmp"
+
+        with open(tmp, "w") as f:
+
+            json.dump(records, f, indent=4)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, path)
+
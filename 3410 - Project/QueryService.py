@@ -0,0 +1,926 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+# Long-running HTTP/JSON service over one shared Repository, run with e.g. "python QueryService.py --port 8034"
+#
+#   GET    /stats/total                      {"total": n}
+#   GET    /stats/pilot/<pilotID>            Server.pilotSummary ({"pilotID", "flights", "firstFlight", ...})
+#   GET    /stats/airline/<airline>          {"airline": ..., "total": n}
+#   GET    /stats/airline/<airline>/<year>   {"airline": ..., "year": ..., "total": n}
+#   GET    /stats/model/<model>/passengers   {"model": ..., "average": x or null}
+#   GET    /stats/model/<model>/cargo        {"model": ..., "average": x or null}
+#   GET    /stats/group?by=airline,year&measures=count,avg:passengers[&<field>=<value>...]
+#                                            Server.groupBy as {"by": [...], "measures": [...], "rows": [[...], ...]}
+#   GET    /stats/route/<origin>/<destination> {"origin": ..., "destination": ..., "total": n, "avgBlockMinutes": x or null}
+#   GET    /stats/routes/<origin>            {"origin": ..., "destinations": {destination: n, ...}}
+#   GET    /stats/airports                   {"airports": [{"airport", "departures", "arrivals"}, ...]}   (?limit=, default 10)
+#   GET    /stats/conflicts                  {"count": n, "conflicts": [{"field", "value", "flightID", "otherFlightID"}, ...]}
+#                                            (?offset=&limit= to page)
+#   GET    /flights/year/<year>              {"count": n, "flights": [...]}   (?offset=&limit= to page)
+#   GET    /flights/month/<year>/<month>     {"count": n, "flights": [...]}   (?offset=&limit= to page)
+#   GET    /flights/day/<year>/<month>/<day> {"count": n, "flights": [...]}   (?offset=&limit= to page)
+#   GET    /flights/between?start=<ISO datetime>&end=<ISO datetime>
+#                                            {"count": n, "flights": [...]}   (?offset=&limit= to page)
+#   GET    /flights/type/<flightType>        {"count": n, "flights": [...]}   (?offset=&limit= to page)
+#   GET    /flights/<flightID>               the record
+#   POST   /flights                          insert the record in the body
+#   PUT    /flights/<flightID>               replace the record with the body
+#   DELETE /flights/<flightID>               delete the record
+#
+# Requests with "X-Airline-Password" set to the Airline password see sensitive fields and may change records,
+# like an Airline user of the Client. With --archive the records are served read-only from a memory-mapped
+# flight archive (see MappedRepository), and every change is refused with 405.
+
+import argparse
+import asyncio
+import contextlib
+import json
+import re
+from datetime import datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from Journal import Journal
+from MappedRepository import MappedRepository
+from Repository import Repository
+from Server import Server
+
+AIRLINE_PASSWORD = "admin123"
+
+REASONS = {
+
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error"
+
+}
+
+
+class QueryService:
+
+    # Largest request body accepted (one flight record is far smaller)
+    MAX_BODY = 1 << 20
+
+    def __init__(self, repo=None, journal=None, filename="flybase.json", archive=None):
+        """
+        Initializes the service around one shared Repository and Server.
+        Reads run concurrently on worker threads; writes wait for running reads and run one at a time.
+
+        Parameters:
+            repo (Repository or None): The Repository backend to serve, a new Repository if None
+            journal (Journal or None): The write-ahead log to use for journaled mode, or None to rewrite filename on every change
+            filename (str): The JSON file loaded at startup and saved after changes
+            archive (str or None): A flight archive to serve read-only instead (repo must be a MappedRepository),
+                                   rebuilt from filename first if it is out of date
+
+        Returns:
+            None
+        """
+
+        self.repo = repo if repo is not None else Repository()
+        self.server = Server(self.repo)
+        self.journal = journal
+        self.filename = filename
+        self.archive = archive
+
+        self._lock = _AsyncRWLock()
+
+        # (method, path pattern, handler, kind), where kind is "read" or "write"
+        self.routes = [
+
+            ("GET", r"/stats/total", self.getTotal, "read"),
+            ("GET", r"/stats/group", self.getGroupBy, "read"),
+            ("GET", r"/stats/pilot/([^/]+)", self.getPilotStats, "read"),
+            ("GET", r"/stats/airline/([^/]+)", self.getAirlineTotal, "read"),
+            ("GET", r"/stats/airline/([^/]+)/([^/]+)", self.getAirlineYear, "read"),
+            ("GET", r"/stats/model/([^/]+)/passengers", self.getAvgPassengers, "read"),
+            ("GET", r"/stats/model/([^/]+)/cargo", self.getAvgCargo, "read"),
+            ("GET", r"/stats/route/([^/]+)/([^/]+)", self.getRoute, "read"),
+            ("GET", r"/stats/routes/([^/]+)", self.getRoutesFrom, "read"),
+            ("GET", r"/stats/airports", self.getBusiestAirports, "read"),
+            ("GET", r"/stats/conflicts", self.getConflicts, "read"),
+            ("GET", r"/flights/year/([^/]+)", self.getFlightsByYear, "read"),
+            ("GET", r"/flights/month/([^/]+)/([^/]+)", self.getFlightsByMonth, "read"),
+            ("GET", r"/flights/day/([^/]+)/([^/]+)/([^/]+)", self.getFlightsByDay, "read"),
+            ("GET", r"/flights/between", self.getFlightsBetween, "read"),
+            ("GET", r"/flights/type/([^/]+)", self.getFlightsByType, "read"),
+            ("GET", r"/flights/([^/]+)", self.getFlight, "read"),
+            ("POST", r"/flights", self.postFlight, "write"),
+            ("PUT", r"/flights/([^/]+)", self.putFlight, "write"),
+            ("DELETE", r"/flights/([^/]+)", self.deleteFlight, "write")
+
+        ]
+
+        self.routes = [(m, re.compile(p + r"/?"), h, k) for m, p, h, k in self.routes]
+
+    def load(self):
+        """
+        Loads the dataset the service will share: the mapped archive in archive mode, the snapshot plus log
+        in journaled mode, otherwise the JSON file.
+
+        Returns:
+            int: The number of records loaded
+        """
+
+        if self.archive is not None:
+
+            return self.repo.openArchive(self.archive, source=self.filename)
+
+        if self.journal is not None:
+
+            return self.repo.openJournal(self.journal, snapshot=True)
+
+        return self.repo.loadFromFile(self.filename, stream=True, snapshot=True)
+
+    # ---------------------------------------------------------
+    # HTTP
+    # ---------------------------------------------------------
+
+    async def serve(self, host="127.0.0.1", port=8034):
+        """
+        Accepts connections until cancelled.
+
+        Parameters:
+            host (str): The address to listen on
+            port (int): The port to listen on
+
+        Returns:
+            None
+        """
+
+        server = await asyncio.start_server(self._handle_connection, host, port)
+
+        async with server:
+
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Serves the requests of one connection, keeping it open between requests (HTTP/1.1 keep-alive).
+
+        Parameters:
+            reader (asyncio.StreamReader): The connection's input
+            writer (asyncio.StreamWriter): The connection's output
+
+        Returns:
+            None
+        """
+
+        try:
+
+            while True:
+
+                request = await self._read_request(reader)
+
+                if request is None:
+
+                    break
+
+                method, target, headers, body, keep_alive = request
+
+                if body is None:
+
+                    status, payload = 413, _encode({"error": "Request body is too large."})
+
+                else:
+
+                    try:
+
+                        status, payload = await self._dispatch(method, target, headers, body)
+
+                    except Exception as e:
+
+                        status, payload = 500, _encode({"error": f"{type(e).__name__}: {e}"})
+
+                writer.write(
+
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+
+                )
+
+                await writer.drain()
+
+                if not keep_alive:
+
+                    break
+
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+
+            pass
+
+        finally:
+
+            writer.close()
+
+            with contextlib.suppress(ConnectionError):
+
+                await writer.wait_closed()
+
+    async def _read_request(self, reader):
+        """
+        Reads one HTTP request.
+
+        Parameters:
+            reader (asyncio.StreamReader): The connection's input
+
+        Returns:
+            tuple or None: (method, target, headers, body, keep_alive), or None when the client closed the connection.
+                           body is None if it was larger than MAX_BODY.
+
+        Raises:
+            ValueError: If the request is malformed
+        """
+
+        line = await reader.readline()
+
+        if not line:
+
+            return None
+
+        method, target, version = line.decode("latin-1").split()
+
+        headers = {}
+
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+
+            name, _, value = line.decode("latin-1").partition(":")
+
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+
+        if length > self.MAX_BODY:
+
+            body = None
+
+        else:
+
+            body = await reader.readexactly(length)
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+        return method, target, headers, body, keep_alive and body is not None
+
+    async def _dispatch(self, method, target, headers, body):
+        """
+        Routes one request to its handler, holding the shared lock for reads or the exclusive lock for writes.
+
+        Parameters:
+            method (str): The HTTP method
+            target (str): The request path and query string
+            headers (dict): The request headers, with lower-case names
+            body (bytes): The request body
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        airline = headers.get("x-airline-password") == AIRLINE_PASSWORD
+
+        allowed = False
+
+        for route_method, pattern, handler, kind in self.routes:
+
+            match = pattern.fullmatch(url.path)
+
+            if match is None:
+
+                continue
+
+            if route_method != method:
+
+                allowed = True
+
+                continue
+
+            args = [unquote(g) for g in match.groups()]
+
+            if kind == "write":
+
+                if not airline:
+
+                    return 403, _encode({"error": "Only Airline users may change records."})
+
+                if self.archive is not None:
+
+                    return 405, _encode({"error": "The flight archive is read-only."})
+
+                try:
+
+                    rec = json.loads(body) if method != "DELETE" else None
+
+                except ValueError:
+
+                    return 400, _encode({"error": "Request body is not valid JSON."})
+
+                async with self._lock.writing():
+
+                    return await asyncio.to_thread(handler, *args, rec)
+
+            async with self._lock.reading():
+
+                return await asyncio.to_thread(handler, *args, query, airline)
+
+        if allowed:
+
+            return 405, _encode({"error": f"{method} is not supported on {url.path}."})
+
+        return 404, _encode({"error": f"No such resource: {url.path}"})
+
+    # ---------------------------------------------------------
+    # READ HANDLERS
+    # ---------------------------------------------------------
+
+    def getTotal(self, query, airline):
+        """
+        Counts every stored flight.
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return 200, _encode({"total": self.server.totalFlights()})
+
+    def getGroupBy(self, query, airline):
+        """
+        Computes a breakdown table with Server.groupBy.
+
+        Parameters:
+            query (dict): The query string: by and measures (comma-separated), and any filters
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        criteria = dict(query)
+
+        by = [f for f in criteria.pop("by", "").split(",") if f]
+        measures = [m for m in criteria.pop("measures", "count").split(",") if m]
+
+        if any(field not in self.repo.INDEXED_FIELDS for field in criteria):
+
+            return 400, _encode({"error": f"Filters must be among {', '.join(self.repo.INDEXED_FIELDS)}."})
+
+        try:
+
+            table = self.server.groupBy(by, measures, **criteria)
+
+        except ValueError as e:
+
+            return 400, _encode({"error": str(e)})
+
+        rows = [list(key) + list(values.values()) for key, values in table.items()]
+
+        return 200, _encode({"by": by, "measures": measures, "rows": rows})
+
+    def getPilotStats(self, pilotID, query, airline):
+        """
+        Computes the statistics of one pilot.
+
+        Parameters:
+            pilotID (str): The pilot ID to report on
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        summary = self.server.pilotSummary(pilotID)
+
+        if summary is None:
+
+            return 404, _encode({"error": f"No flights found for pilot {pilotID}."})
+
+        return 200, _encode(summary)
+
+    def getAirlineTotal(self, name, query, airline):
+        """
+        Counts the flights of one airline.
+
+        Parameters:
+            name (str): The airline name
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return 200, _encode({"airline": name, "total": self.server.airlineTotal(name)})
+
+    def getAirlineYear(self, name, year, query, airline):
+        """
+        Counts the flights of one airline in one year.
+
+        Parameters:
+            name (str): The airline name
+            year (str): The year, in YYYY format
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return 200, _encode({"airline": name, "year": year, "total": self.server.airlineYear(name, year)})
+
+    def getAvgPassengers(self, model, query, airline):
+        """
+        Computes the average passenger count of one aircraft model.
+
+        Parameters:
+            model (str): The aircraft model name
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return 200, _encode({"model": model, "average": self.server.avgPassengers(model)})
+
+    def getAvgCargo(self, model, query, airline):
+        """
+        Computes the average cargo weight of one aircraft model.
+
+        Parameters:
+            model (str): The aircraft model name
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return 200, _encode({"model": model, "average": self.server.avgCargo(model)})
+
+    def getRoute(self, origin, destination, query, airline):
+        """
+        Counts the flights on a route and computes their average block time.
+
+        Parameters:
+            origin (str): The departure location
+            destination (str): The arrival location
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return 200, _encode({
+
+            "origin": origin,
+            "destination": destination,
+            "total": self.server.routeTotal(origin, destination),
+            "avgBlockMinutes": self.server.avgBlockTime(origin, destination)
+
+        })
+
+    def getRoutesFrom(self, origin, query, airline):
+        """
+        Counts the flights from a location to each destination.
+
+        Parameters:
+            origin (str): The departure location
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return 200, _encode({"origin": origin, "destinations": self.server.routesFrom(origin)})
+
+    def getBusiestAirports(self, query, airline):
+        """
+        Ranks locations by traffic.
+
+        Parameters:
+            query (dict): The query string, which may hold limit
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        try:
+
+            limit = int(query.get("limit", 10))
+
+        except ValueError:
+
+            return 400, _encode({"error": "limit must be an integer."})
+
+        airports = [
+
+            {"airport": airport, "departures": departures, "arrivals": arrivals}
+            for airport, departures, arrivals in self.server.busiestAirports(max(limit, 0))
+
+        ]
+
+        return 200, _encode({"airports": airports})
+
+    def getConflicts(self, query, airline):
+        """
+        Lists the pairs of flights that book the same aircraft or pilot at overlapping times.
+
+        Parameters:
+            query (dict): The query string, which may hold offset and limit
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        conflicts = self.server.conflictReport()
+
+        try:
+
+            offset = max(int(query.get("offset", 0)), 0)
+            limit = max(int(query.get("limit", len(conflicts))), 0)
+
+        except ValueError:
+
+            return 400, _encode({"error": "offset and limit must be integers."})
+
+        return 200, _encode({"count": len(conflicts), "conflicts": conflicts[offset:offset + limit]})
+
+    def getFlightsByYear(self, year, query, airline):
+        """
+        Lists the flights of one year.
+
+        Parameters:
+            year (str): The year, in YYYY format
+            query (dict): The query string, which may hold offset and limit
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return self._page(self.server.flightsByYear(year), query, airline)
+
+    def getFlightsByMonth(self, year, month, query, airline):
+        """
+        Lists the flights of one month, in departure order.
+
+        Parameters:
+            year (str): The year, in YYYY format
+            month (str): The month, 1 to 12
+            query (dict): The query string, which may hold offset and limit
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return self._page(self.server.flightsByMonth(year, month), query, airline)
+
+    def getFlightsByDay(self, year, month, day, query, airline):
+        """
+        Lists the flights of one day, in departure order.
+
+        Parameters:
+            year (str): The year, in YYYY format
+            month (str): The month, 1 to 12
+            day (str): The day of the month
+            query (dict): The query string, which may hold offset and limit
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return self._page(self.server.flightsByDay(year, month, day), query, airline)
+
+    def getFlightsBetween(self, query, airline):
+        """
+        Lists the flights departing in [start, end), in departure order.
+
+        Parameters:
+            query (dict): The query string: start and end as ISO datetimes, and optionally offset and limit
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        try:
+
+            start = datetime.fromisoformat(query["start"])
+            end = datetime.fromisoformat(query["end"])
+
+        except (KeyError, ValueError):
+
+            return 400, _encode({"error": "start and end must be ISO datetimes (e.g. 2025-03-01T08:00)."})
+
+        return self._page(self.server.flightsBetween(start, end), query, airline)
+
+    def getFlightsByType(self, ft, query, airline):
+        """
+        Lists the flights of one flight type.
+
+        Parameters:
+            ft (str): The flight type
+            query (dict): The query string, which may hold offset and limit
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        return self._page(self.server.flightsByType(ft), query, airline)
+
+    def getFlight(self, fid, query, airline):
+        """
+        Retrieves one flight by flightID.
+
+        Parameters:
+            fid (str): The flightID
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        rec = self.repo.getByFlightID(fid)
+
+        if rec is None:
+
+            return 404, _encode({"error": f"Flight {fid} not found."})
+
+        return 200, _encode(self._visible(rec, airline))
+
+    def _page(self, flights, query, airline):
+        """
+        Encodes one page of a list of flights.
+
+        Parameters:
+            flights (list[dict]): Every matching flight
+            query (dict): The query string, which may hold offset and limit
+            airline (bool): Whether the requester may see sensitive fields
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        try:
+
+            offset = int(query.get("offset", 0))
+            limit = int(query["limit"]) if "limit" in query else len(flights)
+
+        except ValueError:
+
+            return 400, _encode({"error": "offset and limit must be integers."})
+
+        page = flights[max(offset, 0):max(offset, 0) + max(limit, 0)]
+
+        return 200, _encode({"count": len(flights), "flights": [self._visible(r, airline) for r in page]})
+
+    def _visible(self, rec, airline):
+        """
+        Retrieves the part of a record the requester may see, as Server.formatRecord does for the Client.
+
+        Parameters:
+            rec (dict): The record
+            airline (bool): Whether the requester is an Airline user
+
+        Returns:
+            dict: The record, without sensitive fields for General users
+        """
+
+        if airline:
+
+            return rec
+
+        return {k: v for k, v in rec.items() if k not in Server.SENSITIVE_KEYS}
+
+    # ---------------------------------------------------------
+    # WRITE HANDLERS
+    # ---------------------------------------------------------
+
+    def postFlight(self, rec):
+        """
+        Inserts a new flight.
+
+        Parameters:
+            rec (dict): The record to insert
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        # insert_many validates once and reports the error instead of printing it
+        report = self.repo.insert_many([rec])
+
+        if report["rejected"]:
+
+            error = report["rejected"][0]
+
+            return 400, _encode({"field": error["field"], "error": error["error"]})
+
+        self._persist(append=True)
+
+        return 201, _encode(self.repo.getByFlightID(rec["flightID"]))
+
+    def putFlight(self, fid, rec):
+        """
+        Replaces an existing flight.
+
+        Parameters:
+            fid (str): The flightID of the flight to replace
+            rec (dict): The new record (it may change the flightID)
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        old_rec = self.repo.getByFlightID(fid)
+
+        if old_rec is None:
+
+            return 404, _encode({"error": f"Flight {fid} not found."})
+
+        error = self.repo.checkRecord(rec, ignore_rec=old_rec)
+
+        if error is not None:
+
+            return 400, _encode({"field": error[0], "error": error[1]})
+
+        self.repo.update(old_rec, rec)
+
+        # Rewritten like Client.updateRecord: merging would keep the old flight when the flightID changed
+        self._persist()
+
+        return 200, _encode(rec)
+
+    def deleteFlight(self, fid, rec):
+        """
+        Deletes a flight.
+
+        Parameters:
+            fid (str): The flightID of the flight to delete
+            rec: The request body (unused)
+
+        Returns:
+            tuple[int, bytes]: The status code and the encoded JSON response
+        """
+
+        old_rec = self.repo.getByFlightID(fid)
+
+        if old_rec is None:
+
+            return 404, _encode({"error": f"Flight {fid} not found."})
+
+        self.repo.delete(old_rec)
+
+        self._persist()
+
+        return 200, _encode({"deleted": fid})
+
+    def _persist(self, append=False):
+        """
+        Saves a change the way Client.persistChanges does: nothing in journaled mode (the change is already logged),
+        otherwise merged into or rewritten over the JSON file.
+
+        Parameters:
+            append (bool): Whether to merge into the existing file instead of overwriting it
+
+        Returns:
+            None
+        """
+
+        if self.journal is not None:
+
+            if self.journal.needsCompaction():
+
+                self.repo.compactJournal()
+
+        elif append:
+
+            self.repo.appendToFile(self.filename)
+
+        else:
+
+            self.repo.saveToFile(self.filename)
+
+
+class _AsyncRWLock:
+
+    def __init__(self):
+        """
+        Initializes a readers-writer lock for coroutines. Any number of readers can hold it at once;
+        a writer holds it alone. Waiting writers block new readers, so a steady stream of reads cannot starve writes.
+
+        Returns:
+            None
+        """
+
+        self._cond = asyncio.Condition()
+
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextlib.asynccontextmanager
+    async def reading(self):
+        """
+        Holds the lock shared for the duration of an "async with" block.
+
+        Returns:
+            AsyncContextManager: The lock, held shared
+        """
+
+        async with self._cond:
+
+            await self._cond.wait_for(lambda: not self._writing and self._writers_waiting == 0)
+
+            self._readers += 1
+
+        try:
+
+            yield
+
+        finally:
+
+            async with self._cond:
+
+                self._readers -= 1
+
+                if self._readers == 0:
+
+                    self._cond.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def writing(self):
+        """
+        Holds the lock exclusively for the duration of an "async with" block.
+
+        Returns:
+            AsyncContextManager: The lock, held exclusively
+        """
+
+        async with self._cond:
+
+            self._writers_waiting += 1
+
+            try:
+
+                await self._cond.wait_for(lambda: not self._writing and self._readers == 0)
+
+            finally:
+
+                self._writers_waiting -= 1
+
+            self._writing = True
+
+        try:
+
+            yield
+
+        finally:
+
+            async with self._cond:
+
+                self._writing = False
+
+                self._cond.notify_all()
+
+
+def _encode(payload):
+    """
+    Encodes a response payload as JSON.
+
+    Parameters:
+        payload: Any JSON-serializable value
+
+    Returns:
+        bytes: The UTF-8 encoded JSON
+    """
+
+    return json.dumps(payload).encode("utf-8")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Serve flight statistics and records over HTTP.")
+
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8034)
+    parser.add_argument("--file", default="flybase.json", help="the JSON database to load and save")
+    parser.add_argument("--journal", action="store_true", help="log changes to <file>.log instead of rewriting the file")
+    parser.add_argument("--check-conflicts", action="store_true", help="reject flights that double-book an aircraft or pilot")
+    parser.add_argument("--archive", help="serve this memory-mapped flight archive read-only, rebuilt from --file when stale")
+
+    args = parser.parse_args()
+
+    repo = MappedRepository() if args.archive else Repository()
+    repo.setConflictCheck(args.check_conflicts and not args.archive)
+
+    service = QueryService(
+
+        repo, journal=Journal(args.file) if args.journal and not args.archive else None,
+        filename=args.file, archive=args.archive
+
+    )
+
+    print(f"Loaded {service.load()} records.")
+    print(f"Serving on http://{args.host}:{args.port}")
+
+    with contextlib.suppress(KeyboardInterrupt):
+
+        asyncio.run(service.serve(args.host, args.port))
+
+    # Brings <file>.snap up to date with the changes saved while serving, for a fast next start
+    service.repo.refreshSnapshot()
@@ -2,26 +2,188 @@
 # Alice Balser - B00954620
 # Connor McDonald - B00938421
 
+import contextlib
+import heapq
 import json
+import os
 import re
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import chain, islice, repeat
+
+from Partitions import Partitions
+from Snapshot import Snapshot
+from SortedIndex import SortedIndex
+
+
+# Backends that store dates as integers use whole seconds since this (naive) epoch
+EPOCH = datetime(1970, 1, 1)
+
+# The layout of every flight date, e.g. "14:35 21/07/2023"
+DATE_FORMAT = "%H:%M %d/%m/%Y"
+
+# The zero-padded form of DATE_FORMAT that nearly every date uses (ASCII digits, like strptime's fixed-width fields)
+DATE_PATTERN = re.compile(r"([0-9]{2}):([0-9]{2}) ([0-9]{2})/([0-9]{2})/([0-9]{4})")
+
+
+def parseDate(value):
+    """
+    Parses a flight date string in the HH:MM DD/MM/YYYY format, giving the same result or error as
+    datetime.strptime(value, DATE_FORMAT) about four times faster.
+    Zero-padded strings are split by DATE_PATTERN and checked by datetime() itself (hour 24, minute 60, 31/02,
+    29/02 outside leap years, ...). Anything else, and any string datetime() rejects, goes to strptime,
+    so unpadded dates still parse and errors keep strptime's exact type and message.
+
+    Parameters:
+        value (str): The date string to parse
+
+    Returns:
+        datetime: The parsed date
+
+    Raises:
+        ValueError: If the string does not match the format or is not a real date
+        TypeError: If value is not a string
+    """
+
+    m = DATE_PATTERN.fullmatch(value) if type(value) is str else None
+
+    if m is not None:
+
+        hour, minute, day, month, year = m.groups()
+
+        try:
+
+            return datetime(int(year), int(month), int(day), int(hour), int(minute))
+
+        except ValueError:
+
+            pass
+
+    return datetime.strptime(value, DATE_FORMAT)
 
 
 class Repository:
 
+    # Fields with a case-normalized secondary index ("year" is the departure year)
+    INDEXED_FIELDS = ("airline", "pilotID", "flightType", "aircraftModel", "year")
+
+    # Numeric fields with running per-aircraftModel totals, and the flightType that carries each
+    AGGREGATED_FIELDS = {"passengers": "public", "cargoWeight": "cargo"}
+
+    FLIGHT_TYPES = ("public", "private", "cargo", "military")
+
+    REQUIRED_FIELDS = (
+        "flightType", "pilotID", "airline",
+        "departureDate", "departureLocation",
+        "arrivalDate", "arrivalLocation",
+        "aircraftID", "flightID", "aircraftModel"
+    )
+
+    # The conditional fields each flightType must carry (and no others)
+    CONDITIONAL_FIELDS = {
+        "public": {"passengers"},
+        "cargo": {"cargoWeight"},
+        "military": {"mission"},
+        "private": set()
+    }
+
+    # Fields that may not be booked on two overlapping flights, when the conflict check is on
+    CONFLICT_FIELDS = ("aircraftID", "pilotID")
+
+    # Precompiled field formats
+    PILOT_ID_PATTERN = re.compile(r"^[A-Za-z]{2}\d{4}$")
+    AIRCRAFT_ID_PATTERN = re.compile(r"^[A-Za-z0-9]{6}$")
+
     def __init__(self):
         """
-        Initializes the Repository with an empty in-memory list of records.
+        Initializes the Repository with an empty in-memory list of records
+        and empty flightID and secondary indexes, parsed date cache and running totals.
 
         Returns:
             None
         """
 
-        self.records = []
+        # Stored records in insertion order, keyed by the id() of each record dict, so one is removed
+        # in O(1) without shifting the rest; self.records is a list-like view over them
+        self._slots = {}
+        self.records = _RecordList(self._slots)
+
+        # Primary-key index, flightID -> record
+        self._by_flightID = {}
+
+        # Secondary indexes, field -> normalized value -> {flightID: record}
+        self._indexes = {field: {} for field in self.INDEXED_FIELDS}
+
+        # Parsed dates, flightID -> (departure datetime, arrival datetime)
+        self._dates = {}
+
+        # Departure-time index, sorted (departure datetime, flightID) keys
+        self._by_departure = SortedIndex()
+
+        # Route adjacency, normalized origin -> normalized destination -> {flightID: record},
+        # with the total block time of each route in seconds
+        self._routes = {}
+        self._route_seconds = {}
+
+        # Per-airport traffic, normalized location -> [first spelling seen, departures, arrivals]
+        self._airports = {}
+
+        # Running totals, normalized aircraftModel -> field -> [sum, count]
+        self._model_totals = {}
+
+        # Write-ahead log that every change is appended to, if journaled mode is on
+        self.journal = None
+
+        # Schedule interval indexes, field -> normalized value -> [SortedIndex of (departure, arrival, flightID),
+        # longest flight], kept only while the conflict check is on (see setConflictCheck)
+        self._intervals = None
+
+        # Depth of the loads and journal replays in progress: records already stored are kept even if they conflict
+        self._restoring = 0
+
+        # flightIDs inserted or updated since the Repository was last in sync with _synced_file
+        self._dirty = set()
+        self._synced_file = None
+
+        # Whether loading _synced_file gives exactly the stored records (not after an append left old entries in it)
+        self._synced_exact = False
+
+        # JSON file whose "<file>.snap" binary snapshot refreshSnapshot keeps up to date (see loadFromFile)
+        self._snapshot_source = None
+
+        # (year, airline) partitions changed since then, and, when _synced_file is a partition folder,
+        # the partitions of it loaded so far (see loadPartitions)
+        self._dirty_partitions = set()
+        self._loaded_partitions = set()
+
+        # Accepted/rejected report of the most recent loadFromFile
+        self.lastLoadReport = None
 
     # ---------------------------------------------------------
     # VALIDATION MODULES
     # ---------------------------------------------------------
+    # Each _check_* returns None if the record passes, or a (field, message) error.
+    # Each _validate_* prints that message and returns a bool, for single-record use.
+
+    def _check_mandatory_fields(self, rec):
+        """
+        Checks that all required fields exist and are non-empty in a record.
+
+        Parameters:
+            rec (dict): The record to check
+
+        Returns:
+            tuple or None: A (field, message) error, or None if all mandatory fields are valid
+        """
+
+        for field in self.REQUIRED_FIELDS:
+
+            if field not in rec or str(rec[field]).strip() == "":
+
+                return (field, f"Error: Missing required field '{field}'")
+
+        return None
 
     def _validate_mandatory_fields(self, rec):
         """
@@ -34,24 +196,27 @@ class Repository:
             bool: True if all mandatory fields are valid, otherwise False
         """
 
-        required = [
+        return self._report(self._check_mandatory_fields(rec))
 
-            "flightType", "pilotID", "airline",
-            "departureDate", "departureLocation",
-            "arrivalDate", "arrivalLocation",
-            "aircraftID", "flightID", "aircraftModel"
+    def _check_flightType(self, rec):
+        """
+        Checks that the flightType field is one of the allowed categories.
 
-        ]
+        Parameters:
+            rec (dict): The record containing the flightType field
 
-        for field in required:
+        Returns:
+            tuple or None: A (field, message) error, or None if valid
+        """
 
-            if field not in rec or str(rec[field]).strip() == "":
+        ft = rec.get("flightType", "")
 
-                print(f"Error: Missing required field '{field}'")
+        # A value that is not a string is rejected like a misspelled one, not left to crash .lower()
+        if not isinstance(ft, str) or ft.lower() not in self.FLIGHT_TYPES:
 
-                return False
+            return ("flightType", f"Error ({rec.get('flightID')}): invalid flightType '{ft}'")
 
-        return True
+        return None
 
     def _validate_flightType(self, rec):
         """
@@ -64,17 +229,26 @@ class Repository:
             bool: True if valid, False otherwise
         """
 
-        valid_types = ["public", "private", "cargo", "military"]
+        return self._report(self._check_flightType(rec))
+
+    def _check_pilotID(self, rec):
+        """
+        Checks the pilotID format (two letters followed by four digits).
+
+        Parameters:
+            rec (dict): The record containing the pilotID field
 
-        ft = rec.get("flightType", "").lower()
+        Returns:
+            tuple or None: A (field, message) error, or None if valid
+        """
 
-        if ft not in valid_types:
+        pid = rec.get("pilotID", "")
 
-            print(f"Error ({rec.get('flightID')}): invalid flightType '{ft}'")
+        if not (isinstance(pid, str) and self.PILOT_ID_PATTERN.match(pid)):
 
-            return False
+            return ("pilotID", f"Error ({rec.get('flightID')}): invalid pilotID '{pid}'")
 
-        return True
+        return None
 
     def _validate_pilotID(self, rec):
         """
@@ -87,15 +261,26 @@ class Repository:
             bool: True if valid, False otherwise
         """
 
-        pid = rec.get("pilotID", "")
+        return self._report(self._check_pilotID(rec))
 
-        if not re.match(r"^[A-Za-z]{2}\d{4}$", pid):
+    def _check_flightID_format(self, rec):
+        """
+        Checks the flightID format ("FLT" followed by six digits), without the uniqueness check.
 
-            print(f"Error ({rec.get('flightID')}): invalid pilotID '{pid}'")
+        Parameters:
+            rec (dict): The record containing the flightID
 
-            return False
+        Returns:
+            tuple or None: A (field, message) error, or None if valid
+        """
 
-        return True
+        fid = rec.get("flightID", "")
+
+        if not (isinstance(fid, str) and fid.startswith("FLT") and len(fid) == 9 and fid[3:].isdigit()):
+
+            return ("flightID", f"Invalid flightID format '{fid}'")
+
+        return None
 
     def _validate_flightID(self, rec, ignore_rec=None):
         """
@@ -109,340 +294,2311 @@ class Repository:
             bool: True if valid, False otherwise
         """
 
-        fid = rec.get("flightID", "")
+        if not self._report(self._check_flightID_format(rec)):
 
-        if not (fid.startswith("FLT") and len(fid) == 9 and fid[3:].isdigit()):
+            return False
 
-            print(f"Invalid flightID format '{fid}'")
+        fid = rec["flightID"]
 
-            return False
+        if self._flightID_taken(fid, ignore_rec):
 
-        for r in self.records:
+            print(f"Error: flightID '{fid}' already exists.")
 
-            if r is ignore_rec:
+            return False
 
-                continue
+        return True
+
+    def _flightID_taken(self, fid, ignore_rec=None):
+        """
+        Checks whether a flightID is already used by a stored record.
 
-            if r["flightID"] == fid:
+        Parameters:
+            fid (str): The flightID to check
+            ignore_rec (dict or None): A record to exclude during the check when updating
 
-                print(f"Error: flightID '{fid}' already exists.")
+        Returns:
+            bool: True if another stored record uses the flightID, otherwise False
+        """
 
-                return False
+        existing = self._by_flightID.get(fid)
 
-        return True
+        return existing is not None and existing is not ignore_rec
 
-    def _validate_aircraftID(self, rec):
+    def _check_aircraftID(self, rec):
         """
-        Validates the aircraftID format (six alphanumeric characters).
+        Checks the aircraftID format (six alphanumeric characters).
 
         Parameters:
             rec (dict): The record containing the aircraftID field
 
         Returns:
-            bool: True if valid, False otherwise
+            tuple or None: A (field, message) error, or None if valid
         """
 
         aid = rec.get("aircraftID", "")
 
-        if not re.match(r"^[A-Za-z0-9]{6}$", aid):
+        if not (isinstance(aid, str) and self.AIRCRAFT_ID_PATTERN.match(aid)):
 
-            print(f"Error ({rec.get('flightID')}): invalid aircraftID '{aid}'")
+            return ("aircraftID", f"Error ({rec.get('flightID')}): invalid aircraftID '{aid}'")
 
-            return False
+        return None
 
-        return True
+    def _validate_aircraftID(self, rec):
+        """
+        Validates the aircraftID format (six alphanumeric characters).
 
-    def _validate_datetime(self, rec):
+        Parameters:
+            rec (dict): The record containing the aircraftID field
+
+        Returns:
+            bool: True if valid, False otherwise
         """
-        Validates that the departure and arrival date fields match the expected datetime format.
+
+        return self._report(self._check_aircraftID(rec))
+
+    def _check_datetime(self, rec, cache=None):
+        """
+        Checks that the departure and arrival date fields match the expected datetime format.
 
         Parameters:
-            rec (dict): The record containing date fields to validate
+            rec (dict): The record containing date fields to check
+            cache (dict or None): Bulk mode: already parsed date strings (string -> datetime) to reuse and add to
 
         Returns:
-            bool: True if all dates are valid, False otherwise
+            tuple: (dates, error) where dates is the parsed (departure, arrival) pair if valid
+                   and error is a (field, message) error otherwise
         """
 
+        parsed = []
+
         for field in ["departureDate", "arrivalDate"]:
 
+            value = rec.get(field)
+
+            # Only strings are cached: anything else is invalid, and may not even be hashable
+            cached = cache is not None and type(value) is str
+
+            if cached and value in cache:
+
+                parsed.append(cache[value])
+
+                continue
+
             try:
 
-                datetime.strptime(rec[field], "%H:%M %d/%m/%Y")
+                parsed.append(self._parse_date(value))
 
             except:
 
-                print(f"Error ({rec.get('flightID')}): invalid date in '{field}'")
+                return (None, (field, f"Error ({rec.get('flightID')}): invalid date in '{field}'"))
 
-                return False
+            if cached:
 
-        return True
+                cache[value] = parsed[-1]
 
-    def _validate_conditional_fields(self, rec):
+        return (tuple(parsed), None)
+
+    def _validate_datetime(self, rec):
         """
-        Ensures the correct conditional fields exist based on the flightType (e.g., passengers for public, cargoWeight for cargo).
-        
+        Validates that the departure and arrival date fields match the expected datetime format.
+        The parsed values are returned so they can be cached instead of parsed again.
+
         Parameters:
-            rec (dict): The record to validate
-        
+            rec (dict): The record containing date fields to validate
+
         Returns:
-            bool: True if conditional fields are correct, False otherwise
+            tuple[datetime, datetime] or bool: The parsed (departure, arrival) dates if valid, otherwise False
         """
 
-        ft = rec["flightType"].lower()
+        dates, error = self._check_datetime(rec)
+
+        return dates if self._report(error) else False
+
+    def _parse_date(self, value):
+        """
+        Parses a flight date string in the HH:MM DD/MM/YYYY format.
+
+        Parameters:
+            value (str): The date string to parse
+
+        Returns:
+            datetime: The parsed date
 
-        has_pass = "passengers" in rec
-        has_cargo = "cargoWeight" in rec
-        has_mission = "mission" in rec
+        Raises:
+            ValueError: If the string does not match the format
+        """
 
-        if ft == "public":
+        return parseDate(value)
 
-            return has_pass and not has_cargo and not has_mission
+    def _check_conditional_fields(self, rec):
+        """
+        Checks that the correct conditional fields exist based on the flightType (e.g., passengers for public, cargoWeight for cargo).
 
-        if ft == "cargo":
+        Parameters:
+            rec (dict): The record to check
 
-            return has_cargo and not has_pass and not has_mission
+        Returns:
+            tuple or None: A (field, message) error, or None if conditional fields are correct
+        """
 
-        if ft == "military":
+        ft = rec["flightType"].lower()
 
-            return has_mission and not has_pass and not has_cargo
+        present = {field for field in ("passengers", "cargoWeight", "mission") if field in rec}
 
-        if ft == "private":
+        expected = self.CONDITIONAL_FIELDS.get(ft, present)
 
-            return not has_pass and not has_cargo and not has_mission
+        if present != expected:
 
-        return True
+            return ("flightType", f"Error ({rec.get('flightID')}): fields {sorted(present)} do not match flightType '{ft}'")
 
-    # ---------------------------------------------------------
-    # CRUD
-    # ---------------------------------------------------------
+        return None
 
-    def insert(self, rec):
+    def _validate_conditional_fields(self, rec):
         """
-        Inserts a new flight record into the Repository after full validation.
+        Ensures the correct conditional fields exist based on the flightType (e.g., passengers for public, cargoWeight for cargo).
         
         Parameters:
-            rec (dict): The record to insert
+            rec (dict): The record to validate
         
         Returns:
-            bool: True if insertion succeeds, False if validation fails
+            bool: True if conditional fields are correct, False otherwise
         """
 
-        # Normalize passenger and cargoWeight so they will not cause errors while calculating statistics
-        self._normalize_types(rec)
+        # This rule has never printed its failures
+        return self._check_conditional_fields(rec) is None
 
-        if not (
+    def _check_conflicts(self, rec, dates, ignore_fid=None):
+        """
+        Checks that the record's aircraft and pilot are not already booked on an overlapping flight.
+        Only runs while the conflict check is on (see setConflictCheck), and not while stored records
+        are being loaded or replayed.
+        Flights overlap when each departs before the other arrives; back-to-back flights do not.
 
-            self._validate_flightID(rec)
+        Parameters:
+            rec (dict): The record to check
+            dates (tuple): The parsed (departure, arrival) dates of the record
+            ignore_fid (str or None): The flightID of a stored record to exclude (the one being updated)
 
-            and self._validate_flightType(rec)
+        Returns:
+            tuple or None: A (field, message) error, or None if there is no conflict
+        """
 
-            and self._validate_pilotID(rec)
+        if self._intervals is None or self._restoring:
 
-            and self._validate_mandatory_fields(rec)
+            return None
 
-            and self._validate_aircraftID(rec)
+        departure, arrival = dates
 
-            and self._validate_datetime(rec)
+        for field in self.CONFLICT_FIELDS:
 
-            and self._validate_conditional_fields(rec)
+            entry = self._intervals[field].get(self._normalize_key(field, rec[field]))
 
+            if entry is None:
 
-        ):
+                continue
 
-            return False
+            index, longest = entry
 
-        self.records.append(rec)
+            # No stored flight is longer than longest, so any overlap must depart after departure - longest
+            for start, end, other in index.irange((departure - longest,), (arrival,)):
 
-        return True
+                if end > departure and other != ignore_fid:
 
-    def update(self, old_rec, new_rec):
+                    return (field, f"Error ({rec.get('flightID')}): {field} '{rec[field]}' is already booked on {other} at that time")
+
+        return None
+
+    def _validate_conflicts(self, rec, dates, ignore_fid=None):
         """
-        Validates and applies a full update to an existing flight record.
+        Validates that the record's aircraft and pilot are not already booked on an overlapping flight,
+        if the conflict check is on.
 
         Parameters:
-            old_rec (dict): The original record before modification
-            new_rec (dict): The updated record containing new field values
+            rec (dict): The record to validate
+            dates (tuple): The parsed (departure, arrival) dates of the record
+            ignore_fid (str or None): The flightID of a stored record to exclude (the one being updated)
 
         Returns:
-            bool: True if the update succeeds, False otherwise
+            bool: True if there is no conflict, False otherwise
         """
 
-        # Normalize passenger and cargoWeight so they will not cause errors while calculating statistics
-        self._normalize_types(new_rec)
-
-        if not (
-
-            self._validate_mandatory_fields(new_rec)
-
-            and self._validate_flightType(new_rec)
+        return self._report(self._check_conflicts(rec, dates, ignore_fid))
 
-            and self._validate_pilotID(new_rec)
-
-            and self._validate_flightID(new_rec, ignore_rec=old_rec)
+    def _check_format(self, rec, date_cache=None):
+        """
+        Runs every per-record check that does not depend on the stored data (everything but flightID uniqueness),
+        normalizing passengers and cargoWeight first. Nothing is printed.
 
-            and self._validate_aircraftID(new_rec)
+        Parameters:
+            rec (dict): The record to check
+            date_cache (dict or None): Already parsed date strings to reuse, see _check_datetime
 
-            and self._validate_datetime(new_rec)
+        Returns:
+            tuple: (dates, error) where dates is the parsed (departure, arrival) pair if the record passes
+                   and error is the first (field, message) error otherwise
+        """
 
-            and self._validate_conditional_fields(new_rec)
+        try:
 
-        ):
+            self._normalize_types(rec)
 
-            return False
+        except ValueError as e:
 
-        old_rec.clear()
-        old_rec.update(new_rec)
+            return (None, ("passengers" if "passengers" in str(e) else "cargoWeight", str(e)))
 
-        return True
+        error = (
 
-    def _normalize_types(self, rec):
-        """
-        Converts passengers and cargoWeight fields to the correct types.
-        (if the mentioned fields are in the record).
+            self._check_flightID_format(rec)
 
-        Parameters:
-            rec (dict): The record whose fields will be normalized
+            or self._check_flightType(rec)
 
-        Returns:
-            None
-        """
-    
-        # Passengers should be of type int
-        if "passengers" in rec and rec["passengers"] is not None:
+            or self._check_pilotID(rec)
 
-            try:
+            or self._check_mandatory_fields(rec)
 
-                rec["passengers"] = int(rec["passengers"])
+            or self._check_aircraftID(rec)
 
-            except (ValueError, TypeError):
+        )
 
-                raise ValueError("Invalid passengers value (must be an integer).")
+        if error:
 
-        # Cargo weight should be of type float
-        if "cargoWeight" in rec and rec["cargoWeight"] is not None:
+            return (None, error)
 
-            try:
+        dates, error = self._check_datetime(rec, date_cache)
 
-                rec["cargoWeight"] = float(rec["cargoWeight"])
+        if error:
 
-            except (ValueError, TypeError):
+            return (None, error)
 
-                raise ValueError("Invalid cargoWeight value (must be a number).")
+        error = self._check_conditional_fields(rec)
 
+        return (None, error) if error else (dates, None)
 
-    def delete(self, rec):
+    def checkRecord(self, rec, ignore_rec=None):
         """
-        Removes a record from the Repository.
+        Runs every check insert (or update, with ignore_rec) would run, without storing or printing anything,
+        so callers such as a network service can report the error instead of printing it.
 
         Parameters:
-            rec (dict): The record to remove
+            rec (dict): The record to check (passengers and cargoWeight are normalized in place)
+            ignore_rec (dict or None): The stored record being updated, excluded from the uniqueness check
 
         Returns:
-            None
+            tuple or None: The first (field, message) error, or None if the record is valid
         """
 
-        self.records.remove(rec)
+        if not isinstance(rec, dict):
 
-    def getByFlightID(self, fid):
+            return ("record", "Error: record is not an object")
+
+        dates, error = self._check_format(rec)
+
+        if error is None and self._flightID_taken(rec["flightID"], ignore_rec):
+
+            error = ("flightID", f"Error: flightID '{rec['flightID']}' already exists.")
+
+        if error is None:
+
+            error = self._check_conflicts(rec, dates, ignore_rec["flightID"] if ignore_rec is not None else None)
+
+        return error
+
+    def _report(self, error):
         """
-        Retrieves a record matching the given flightID.
+        Prints a validation error, if there is one.
 
         Parameters:
-            fid (str): The flightID to search for
+            error (tuple or None): A (field, message) error from a _check_* method
 
         Returns:
-            dict or None: The matching record, or None if not found
+            bool: True if there was no error, otherwise False
         """
 
-        for rec in self.records:
-
-            if rec.get("flightID") == fid:
+        if error is None:
 
-                return rec
-
-        return None
+            return True
 
+        print(error[1])
+
+        return False
+
+    # ---------------------------------------------------------
+    # CRUD
+    # ---------------------------------------------------------
+
+    def insert(self, rec):
+        """
+        Inserts a new flight record into the Repository after full validation.
+        
+        Parameters:
+            rec (dict): The record to insert
+        
+        Returns:
+            bool: True if insertion succeeds, False if validation fails
+        """
+
+        # Normalize passenger and cargoWeight so they will not cause errors while calculating statistics
+        self._normalize_types(rec)
+
+        if not (
+
+            self._validate_flightID(rec)
+
+            and self._validate_flightType(rec)
+
+            and self._validate_pilotID(rec)
+
+            and self._validate_mandatory_fields(rec)
+
+            and self._validate_aircraftID(rec)
+
+            and (dates := self._validate_datetime(rec))
+
+            and self._validate_conditional_fields(rec)
+
+            and self._validate_conflicts(rec, dates)
+
+
+        ):
+
+            return False
+
+        self._accept(rec, dates)
+
+        return True
+
+    def insert_many(self, records, progress=None, progress_every=10000, workers=1, chunk_size=5000):
+        """
+        Inserts many new flight records in one pass. Every record gets the same checks as insert,
+        but failures are collected as structured errors instead of being printed.
+        flightIDs must be unique across both the stored records and the batch; when a flightID
+        repeats in the batch, the first valid record with it wins, as with repeated insert calls.
+
+        With workers > 1 the per-record format checks run in a process pool, chunk_size records
+        per task. The flightID uniqueness check and the inserts still run here, in input order,
+        so the result is exactly the same as with workers=1.
+
+        Parameters:
+            records (iterable[dict]): The records to insert (may be a generator)
+            progress (callable or None): Called as progress(read, accepted) every progress_every records
+            progress_every (int): How many records to read between progress reports
+            workers (int): How many processes check records (1 checks them in this process)
+            chunk_size (int): How many records each worker task checks
+
+        Returns:
+            dict: {"accepted": int, "rejected": list[dict]}, where each rejection is
+                  {"index": position in the batch, "flightID": ..., "field": ..., "error": message}
+        """
+
+        if workers > 1:
+
+            checked = self._check_parallel(records, workers, chunk_size)
+
+        else:
+
+            checked = self._check_serial(records)
+
+        return self._insert_checked(checked, progress, progress_every)
+
+    def _insert_checked(self, checked, progress=None, progress_every=10000):
+        """
+        Inserts records that already went through the per-record format checks, in order:
+        the flightID uniqueness and conflict checks run here, against everything stored so far.
+
+        Parameters:
+            checked (iterable[tuple]): (record, dates, error) per record, from _check_serial or _check_chunk
+            progress (callable or None): Called as progress(read, accepted) every progress_every records
+            progress_every (int): How many records to read between progress reports
+
+        Returns:
+            dict: The accepted/rejected report, see insert_many
+        """
+
+        report = {"accepted": 0, "rejected": []}
+
+        # The departure index sorts the batch's keys in once, before any reader can see it
+        self._by_departure.defer()
+
+        try:
+
+            for index, (rec, dates, error) in enumerate(checked):
+
+                # The stored data already holds every earlier accepted record of the batch
+                if error is None and self._flightID_taken(rec["flightID"]):
+
+                    error = ("flightID", f"Error: flightID '{rec['flightID']}' already exists.")
+
+                if error is None:
+
+                    error = self._check_conflicts(rec, dates)
+
+                if error is None:
+
+                    self._accept(rec, dates)
+
+                    report["accepted"] += 1
+
+                else:
+
+                    report["rejected"].append({
+
+                        "index": index,
+                        "flightID": rec.get("flightID") if isinstance(rec, dict) else None,
+                        "field": error[0],
+                        "error": error[1]
+
+                    })
+
+                if progress is not None and (index + 1) % progress_every == 0:
+
+                    progress(index + 1, report["accepted"])
+
+        finally:
+
+            self._by_departure.flush()
+
+        return report
+
+    def _check_serial(self, records):
+        """
+        Runs the per-record format checks of insert_many in this process.
+
+        Parameters:
+            records (iterable[dict]): The records to check
+
+        Returns:
+            iterator[tuple]: (record, dates, error) per record, in input order
+        """
+
+        # Flights share departure and arrival times, so each distinct date string is parsed once per batch
+        date_cache = {}
+
+        for rec in records:
+
+            if len(date_cache) > 100000:
+
+                date_cache.clear()
+
+            if not isinstance(rec, dict):
+
+                yield (rec, None, ("record", "Error: record is not an object"))
+
+                continue
+
+            yield (rec,) + self._check_format(rec, date_cache)
+
+    def _check_parallel(self, records, workers, chunk_size):
+        """
+        Runs the per-record format checks of insert_many in a process pool.
+        At most two chunks per worker are in flight, so memory stays bounded for streamed input.
+
+        Parameters:
+            records (iterable[dict]): The records to check
+            workers (int): How many worker processes to start
+            chunk_size (int): How many records each task checks
+
+        Returns:
+            iterator[tuple]: (record, dates, error) per record, in input order.
+                             Records come back normalized by the worker, like insert normalizes them.
+        """
+
+        it = iter(records)
+        pending = deque()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+
+            while True:
+
+                while len(pending) < 2 * workers:
+
+                    chunk = list(islice(it, chunk_size))
+
+                    if not chunk:
+
+                        break
+
+                    pending.append(pool.submit(_check_chunk, chunk))
+
+                if not pending:
+
+                    return
+
+                yield from pending.popleft().result()
+
+    def _accept(self, rec, dates):
+        """
+        Stores a new record that passed validation, marks it unsaved and logs it in journaled mode.
+
+        Parameters:
+            rec (dict): The validated record
+            dates (tuple): The parsed (departure, arrival) dates of the record
+
+        Returns:
+            None
+        """
+
+        self._add_record(rec, dates)
+
+        if self._intervals is not None:
+
+            self._track_intervals(rec, dates, 1)
+
+        self._dirty.add(rec["flightID"])
+        self._dirty_partitions.add(self._partition_key(rec, dates))
+
+        self._journal("insert", rec=rec)
+
+    def update(self, old_rec, new_rec):
+        """
+        Validates and applies a full update to an existing flight record.
+
+        Parameters:
+            old_rec (dict): The original record before modification
+            new_rec (dict): The updated record containing new field values
+
+        Returns:
+            bool: True if the update succeeds, False otherwise
+        """
+
+        # Normalize passenger and cargoWeight so they will not cause errors while calculating statistics
+        self._normalize_types(new_rec)
+
+        if not (
+
+            self._validate_mandatory_fields(new_rec)
+
+            and self._validate_flightType(new_rec)
+
+            and self._validate_pilotID(new_rec)
+
+            and self._validate_flightID(new_rec, ignore_rec=old_rec)
+
+            and self._validate_aircraftID(new_rec)
+
+            and (dates := self._validate_datetime(new_rec))
+
+            and self._validate_conditional_fields(new_rec)
+
+            and self._validate_conflicts(new_rec, dates, ignore_fid=old_rec["flightID"])
+
+        ):
+
+            return False
+
+        old_fid = old_rec["flightID"]
+        old_dates = self.parsedDates(old_rec)
+
+        # The flight may move to another year or airline, which changes both partitions
+        self._dirty_partitions.add(self._partition_key(old_rec, old_dates))
+
+        if self._intervals is not None:
+
+            self._track_intervals(dict(old_rec), old_dates, -1)
+
+        self._replace_record(old_rec, new_rec, dates)
+
+        if self._intervals is not None:
+
+            self._track_intervals(new_rec, dates, 1)
+
+        self._dirty.add(new_rec["flightID"])
+        self._dirty_partitions.add(self._partition_key(new_rec, dates))
+
+        self._journal("update", rec=new_rec, fid=old_fid)
+
+        return True
+
+    def _normalize_types(self, rec):
+        """
+        Converts passengers and cargoWeight fields to the correct types.
+        (if the mentioned fields are in the record).
+
+        Parameters:
+            rec (dict): The record whose fields will be normalized
+
+        Returns:
+            None
+        """
+    
+        # Passengers should be of type int
+        if "passengers" in rec and rec["passengers"] is not None:
+
+            try:
+
+                rec["passengers"] = int(rec["passengers"])
+
+            except (ValueError, TypeError):
+
+                raise ValueError("Invalid passengers value (must be an integer).")
+
+        # Cargo weight should be of type float
+        if "cargoWeight" in rec and rec["cargoWeight"] is not None:
+
+            try:
+
+                rec["cargoWeight"] = float(rec["cargoWeight"])
+
+            except (ValueError, TypeError):
+
+                raise ValueError("Invalid cargoWeight value (must be a number).")
+
+
+    def delete(self, rec):
+        """
+        Removes a record from the Repository.
+
+        Parameters:
+            rec (dict): The record to remove
+
+        Returns:
+            None
+        """
+
+        dates = self.parsedDates(rec)
+
+        self._remove_record(rec)
+
+        if self._intervals is not None:
+
+            self._track_intervals(rec, dates, -1)
+
+        self._dirty_partitions.add(self._partition_key(rec, dates))
+
+        self._journal("delete", fid=rec["flightID"])
+
+    def getByFlightID(self, fid):
+        """
+        Retrieves a record matching the given flightID.
+
+        Parameters:
+            fid (str): The flightID to search for
+
+        Returns:
+            dict or None: The matching record, or None if not found
+        """
+
+        return self._by_flightID.get(fid)
+
+    # ---------------------------------------------------------
+    # STORAGE
+    # ---------------------------------------------------------
+
+    def _add_record(self, rec, dates):
+        """
+        Stores an already validated record and adds it to the indexes.
+
+        Parameters:
+            rec (dict): The record to store
+            dates (tuple): The parsed (departure, arrival) dates of the record
+
+        Returns:
+            None
+        """
+
+        self._slots[id(rec)] = rec
+
+        self._index_record(rec, dates)
+
+    def _replace_record(self, old_rec, new_rec, dates):
+        """
+        Overwrites a stored record in place with already validated values and re-indexes it.
+
+        Parameters:
+            old_rec (dict): The stored record
+            new_rec (dict): The validated new field values
+            dates (tuple): The parsed (departure, arrival) dates of new_rec
+
+        Returns:
+            None
+        """
+
+        # Drop the old keys from the index before the record changes in place
+        self._unindex_record(old_rec)
+
+        old_rec.clear()
+        old_rec.update(new_rec)
+
+        self._index_record(old_rec, dates)
+
+    def _remove_record(self, rec):
+        """
+        Removes a stored record and drops it from the indexes.
+
+        Parameters:
+            rec (dict): The stored record, or a copy of it
+
+        Returns:
+            None
+        """
+
+        del self._slots[id(self._by_flightID[rec["flightID"]])]
+
+        self._unindex_record(rec)
+
+    # ---------------------------------------------------------
+    # INDEXES
+    # ---------------------------------------------------------
+
+    def _index_record(self, rec, dates=None):
+        """
+        Adds a stored record to the Repository indexes.
+
+        Parameters:
+            rec (dict): The record that was just stored
+            dates (tuple or None): The already parsed (departure, arrival) dates, parsed here if None
+
+        Returns:
+            None
+        """
+
+        fid = rec["flightID"]
+
+        if dates is None:
+
+            dates = (self._parse_date(rec["departureDate"]), self._parse_date(rec["arrivalDate"]))
+
+        self._by_flightID[fid] = rec
+        self._dates[fid] = dates
+
+        self._by_departure.add((dates[0], fid))
+
+        for field in self.INDEXED_FIELDS:
+
+            key = self._index_key(field, rec)
+
+            self._indexes[field].setdefault(key, {})[fid] = rec
+
+        self._update_totals(rec, 1)
+        self._update_routes(rec, dates, 1)
+
+    def _unindex_record(self, rec):
+        """
+        Removes a stored record from the Repository indexes.
+
+        Parameters:
+            rec (dict): The record that is being removed or changed
+
+        Returns:
+            None
+        """
+
+        fid = rec["flightID"]
+
+        if self._by_flightID.pop(fid, None) is not None:
+
+            self._update_totals(rec, -1)
+            self._update_routes(rec, self._dates[fid], -1)
+
+        for field in self.INDEXED_FIELDS:
+
+            key = self._index_key(field, rec)
+
+            bucket = self._indexes[field].get(key)
+
+            if bucket is None:
+
+                continue
+
+            bucket.pop(fid, None)
+
+            # Drop empty buckets so the index does not keep dead keys around
+            if not bucket:
+
+                del self._indexes[field][key]
+
+        dates = self._dates.pop(fid, None)
+
+        if dates is not None:
+
+            self._by_departure.remove((dates[0], fid))
+
+    def _update_totals(self, rec, sign):
+        """
+        Adds a record's passengers or cargoWeight to (or removes it from) the running per-model totals.
+
+        Parameters:
+            rec (dict): The record being indexed or unindexed
+            sign (int): 1 to add the record, -1 to remove it
+
+        Returns:
+            None
+        """
+
+        ft = str(rec["flightType"]).lower()
+
+        for field, flight_type in self.AGGREGATED_FIELDS.items():
+
+            if ft != flight_type or rec.get(field) is None:
+
+                continue
+
+            model = self._index_key("aircraftModel", rec)
+
+            totals = self._model_totals.setdefault(model, {})
+            entry = totals.setdefault(field, [0, 0])
+
+            entry[0] += sign * rec[field]
+            entry[1] += sign
+
+            if entry[1] == 0:
+
+                del totals[field]
+
+                if not totals:
+
+                    del self._model_totals[model]
+
+    def _update_routes(self, rec, dates, sign):
+        """
+        Adds a record to (or removes it from) the route adjacency, the route block-time totals and the airport counts.
+
+        Parameters:
+            rec (dict): The record being indexed or unindexed
+            dates (tuple): The parsed (departure, arrival) dates of the record
+            sign (int): 1 to add the record, -1 to remove it
+
+        Returns:
+            None
+        """
+
+        fid = rec["flightID"]
+
+        origin = self._normalize_key("departureLocation", rec["departureLocation"])
+        destination = self._normalize_key("arrivalLocation", rec["arrivalLocation"])
+
+        route = (origin, destination)
+        seconds = int((dates[1] - dates[0]).total_seconds())
+
+        if sign > 0:
+
+            self._routes.setdefault(origin, {}).setdefault(destination, {})[fid] = rec
+            self._route_seconds[route] = self._route_seconds.get(route, 0) + seconds
+
+        else:
+
+            targets = self._routes[origin]
+            bucket = targets[destination]
+
+            del bucket[fid]
+
+            self._route_seconds[route] -= seconds
+
+            # Drop empty routes and origins, like the secondary indexes drop empty buckets
+            if not bucket:
+
+                del targets[destination]
+                del self._route_seconds[route]
+
+                if not targets:
+
+                    del self._routes[origin]
+
+        for key, label, slot in ((origin, rec["departureLocation"], 1), (destination, rec["arrivalLocation"], 2)):
+
+            entry = self._airports.setdefault(key, [str(label), 0, 0])
+
+            entry[slot] += sign
+
+            if entry[1] == 0 and entry[2] == 0:
+
+                del self._airports[key]
+
+    def _index_key(self, field, rec):
+        """
+        Computes the normalized secondary index key of a record for one field.
+
+        Parameters:
+            field (str): One of INDEXED_FIELDS
+            rec (dict): The record to compute the key for
+
+        Returns:
+            str: The normalized key
+        """
+
+        if field == "year":
+
+            return self._normalize_key(field, self._dates[rec["flightID"]][0].year)
+
+        return self._normalize_key(field, rec[field])
+
+    def _normalize_key(self, field, value):
+        """
+        Normalizes a value the same way the secondary index for the field stores it.
+
+        Parameters:
+            field (str): One of INDEXED_FIELDS
+            value: The raw value (e.g. from a record or a user query)
+
+        Returns:
+            str: The normalized key
+        """
+
+        if field == "year":
+
+            return str(value)
+
+        return str(value).lower()
+
+    def parsedDates(self, rec):
+        """
+        Retrieves the parsed departure and arrival dates of a record, from the cache when the record is stored.
+
+        Parameters:
+            rec (dict): The record whose dates are needed
+
+        Returns:
+            tuple[datetime, datetime]: The (departure, arrival) dates
+        """
+
+        dates = self._dates.get(rec["flightID"])
+
+        if dates is None or self._by_flightID.get(rec["flightID"]) is not rec:
+
+            return (self._parse_date(rec["departureDate"]), self._parse_date(rec["arrivalDate"]))
+
+        return dates
+
+    # ---------------------------------------------------------
+    # INDEXED QUERIES
+    # ---------------------------------------------------------
+
+    def findWhere(self, **criteria):
+        """
+        Retrieves all records matching every given field value, using the secondary indexes.
+        Matching is case-insensitive, except for "year" which must be in YYYY format.
+
+        Parameters:
+            **criteria: Field/value pairs, where each field is one of INDEXED_FIELDS
+                        (e.g. findWhere(airline="Air Canada", year="2025"))
+
+        Returns:
+            list[dict]: The matching records
+        """
+
+        if not criteria:
+
+            return list(self.records)
+
+        buckets = []
+
+        for field, value in criteria.items():
+
+            bucket = self._indexes[field].get(self._normalize_key(field, value))
+
+            if not bucket:
+
+                return []
+
+            buckets.append(bucket)
+
+        # Walk the smallest bucket and probe the others, so the cost follows the number of matches
+        buckets.sort(key=len)
+
+        smallest, others = buckets[0], buckets[1:]
+
+        return [
+
+            rec for fid, rec in smallest.items()
+
+            if all(fid in b for b in others)
+
+        ]
+
+    def countWhere(self, **criteria):
+        """
+        Counts all records matching every given field value, using the secondary indexes.
+
+        Parameters:
+            **criteria: Field/value pairs, where each field is one of INDEXED_FIELDS
+
+        Returns:
+            int: The number of matching records
+        """
+
+        if len(criteria) == 1:
+
+            (field, value), = criteria.items()
+
+            return len(self._indexes[field].get(self._normalize_key(field, value), ()))
+
+        return len(self.findWhere(**criteria))
+
+    def modelAverage(self, model, field):
+        """
+        Retrieves the average of a numeric field for one aircraft model from the running totals.
+
+        Parameters:
+            model (str): The aircraft model name (case-insensitive)
+            field (str): One of AGGREGATED_FIELDS ("passengers" or "cargoWeight")
+
+        Returns:
+            float or None: The average value, or None if no record of that model has the field
+        """
+
+        entry = self._model_totals.get(self._normalize_key("aircraftModel", model), {}).get(field)
+
+        if not entry:
+
+            return None
+
+        return entry[0] / entry[1]
+
+    # ---------------------------------------------------------
+    # ROUTE QUERIES
+    # ---------------------------------------------------------
+
+    def _route_bucket(self, origin, destination):
+        """
+        Retrieves the flights of one route from the adjacency map.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            dict: flightID -> record (empty if no flight flies the route)
+        """
+
+        targets = self._routes.get(self._normalize_key("departureLocation", origin), {})
+
+        return targets.get(self._normalize_key("arrivalLocation", destination), {})
+
+    def findRoute(self, origin, destination):
+        """
+        Retrieves all flights from one location to another, using the route adjacency map.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            list[dict]: The matching records
+        """
+
+        return list(self._route_bucket(origin, destination).values())
+
+    def routeCount(self, origin, destination):
+        """
+        Counts the flights from one location to another.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            int: The number of flights on the route
+        """
+
+        return len(self._route_bucket(origin, destination))
+
+    def routeBlockTime(self, origin, destination):
+        """
+        Retrieves the average block time (arrival minus departure) of a route from the running totals.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            float or None: The average block time in minutes, or None if no flight flies the route
+        """
+
+        flights = self.routeCount(origin, destination)
+
+        if not flights:
+
+            return None
+
+        route = (self._normalize_key("departureLocation", origin), self._normalize_key("arrivalLocation", destination))
+
+        return self._route_seconds[route] / flights / 60
+
+    def routesFrom(self, origin):
+        """
+        Counts the flights from one location to each destination served from it.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+
+        Returns:
+            dict: destination -> number of flights, busiest first
+        """
+
+        targets = self._routes.get(self._normalize_key("departureLocation", origin), {})
+
+        counts = {self._airports[d][0]: len(bucket) for d, bucket in targets.items()}
+
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def busiestAirports(self, n=10):
+        """
+        Ranks locations by traffic (departures plus arrivals) from the running per-airport counts.
+
+        Parameters:
+            n (int or None): How many locations to return, None for all
+
+        Returns:
+            list[tuple[str, int, int]]: (location, departures, arrivals), busiest first (ties by name)
+        """
+
+        ranked = sorted(self._airports.values(), key=lambda e: (-(e[1] + e[2]), e[0]))
+
+        return [tuple(entry) for entry in ranked[:n]]
+
+    # ---------------------------------------------------------
+    # SCHEDULE CONFLICTS
+    # ---------------------------------------------------------
+
+    def setConflictCheck(self, enabled=True):
+        """
+        Turns the schedule conflict rule on or off. While it is on, insert, insert_many and update reject
+        a flight whose aircraftID or pilotID is already booked on an overlapping flight.
+        Turning it on builds the interval indexes from the stored records; conflicts already stored are kept
+        (findConflicts reports them), and so are those in a file, snapshot, partition or journal loaded later.
+
+        Parameters:
+            enabled (bool): Whether to check for conflicts
+
+        Returns:
+            None
+        """
+
+        self._intervals = None
+
+        if not enabled:
+
+            return
+
+        self._intervals = {field: {} for field in self.CONFLICT_FIELDS}
+
+        for rec in self.records:
+
+            self._track_intervals(rec, self.parsedDates(rec), 1)
+
+    def _track_intervals(self, rec, dates, sign):
+        """
+        Adds a record's flight to (or removes it from) the aircraft and pilot interval indexes.
+
+        Parameters:
+            rec (dict): The record being stored or removed
+            dates (tuple): The parsed (departure, arrival) dates of the record
+            sign (int): 1 to add the flight, -1 to remove it
+
+        Returns:
+            None
+        """
+
+        key = (dates[0], dates[1], rec["flightID"])
+
+        for field in self.CONFLICT_FIELDS:
+
+            value = self._normalize_key(field, rec[field])
+
+            entry = self._intervals[field].get(value)
+
+            if sign > 0:
+
+                if entry is None:
+
+                    entry = self._intervals[field][value] = [SortedIndex(), timedelta(0)]
+
+                entry[0].add(key)
+
+                # The longest flight only ever grows, which keeps the search window safe after removals
+                entry[1] = max(entry[1], dates[1] - dates[0])
+
+            else:
+
+                entry[0].remove(key)
+
+                if not len(entry[0]):
+
+                    del self._intervals[field][value]
+
+    def findConflicts(self, fields=None):
+        """
+        Finds every pair of stored flights that book the same aircraft or pilot at overlapping times.
+        Each field is one sort-and-sweep pass per aircraft or pilot, O(n log n + conflicts),
+        so it does not need the conflict check to be on.
+
+        Parameters:
+            fields (sequence[str] or None): Which of CONFLICT_FIELDS to check, all if None
+
+        Returns:
+            list[dict]: {"field", "value", "flightID", "otherFlightID"} per conflicting pair, where flightID
+                        departs first; ordered by field and value, then by the departure of otherFlightID
+        """
+
+        conflicts = []
+
+        for field in fields or self.CONFLICT_FIELDS:
+
+            # normalized value -> [first spelling seen, [(departure, arrival, flightID), ...]]
+            groups = {}
+
+            for rec in self.records:
+
+                departure, arrival = self.parsedDates(rec)
+
+                group = groups.setdefault(self._normalize_key(field, rec[field]), [str(rec[field]), []])
+
+                group[1].append((departure, arrival, rec["flightID"]))
+
+            for value, (label, flights) in sorted(groups.items()):
+
+                flights.sort()
+
+                # Flights still in the air at the current departure, as a heap of (arrival, flightID)
+                active = []
+
+                for departure, arrival, fid in flights:
+
+                    while active and active[0][0] <= departure:
+
+                        heapq.heappop(active)
+
+                    for _, other in sorted(active, key=lambda a: a[1]):
+
+                        conflicts.append({"field": field, "value": label, "flightID": other, "otherFlightID": fid})
+
+                    heapq.heappush(active, (arrival, fid))
+
+        return conflicts
+
+    # ---------------------------------------------------------
+    # TIME-RANGE QUERIES
+    # ---------------------------------------------------------
+
+    def findBetween(self, start, end, **criteria):
+        """
+        Retrieves the records departing in [start, end), using the sorted departure index in O(log n + k).
+
+        Parameters:
+            start (datetime): The inclusive start of the window
+            end (datetime): The exclusive end of the window
+            **criteria: Further field/value pairs the records must match, as for findWhere
+
+        Returns:
+            list[dict]: The matching records, in departure order (ties by flightID)
+        """
+
+        buckets = []
+
+        for field, value in criteria.items():
+
+            bucket = self._indexes[field].get(self._normalize_key(field, value))
+
+            if not bucket:
+
+                return []
+
+            buckets.append(bucket)
+
+        return [
+
+            self._by_flightID[fid] for departure, fid in self._by_departure.irange((start,), (end,))
+
+            if all(fid in b for b in buckets)
+
+        ]
+
+    def findByMonth(self, year, month, **criteria):
+        """
+        Retrieves the records departing in one calendar month.
+
+        Parameters:
+            year (int or str): The year, in YYYY format
+            month (int or str): The month, 1 to 12
+            **criteria: Further field/value pairs, as for findWhere
+
+        Returns:
+            list[dict]: The matching records in departure order, or [] if the month is not valid
+        """
+
+        try:
+
+            start = datetime(int(year), int(month), 1)
+            end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+        except (ValueError, OverflowError):
+
+            return []
+
+        return self.findBetween(start, end, **criteria)
+
+    def findByDay(self, year, month, day, **criteria):
+        """
+        Retrieves the records departing on one calendar day.
+
+        Parameters:
+            year (int or str): The year, in YYYY format
+            month (int or str): The month, 1 to 12
+            day (int or str): The day of the month
+            **criteria: Further field/value pairs, as for findWhere
+
+        Returns:
+            list[dict]: The matching records in departure order, or [] if the date is not valid
+        """
+
+        try:
+
+            start = datetime(int(year), int(month), int(day))
+            end = start + timedelta(days=1)
+
+        except (ValueError, OverflowError):
+
+            return []
+
+        return self.findBetween(start, end, **criteria)
 
 
     # ---------------------------------------------------------
     # JSON I/O
     # ---------------------------------------------------------
 
-    def loadFromFile(self, filename="flybase.json"):
+    def loadFromFile(self, filename="flybase.json", stream=False, progress=None, progress_every=10000, workers=1, snapshot=False):
+        """
+        Loads flight records from a JSON file and inserts valid entries into the Repository through insert_many.
+        In stream mode the top-level array is decoded one record at a time,
+        so the whole file is never held in memory at once.
+        The full accepted/rejected report is kept in self.lastLoadReport.
+
+        With snapshot=True an empty Repository loads from the "<file>.snap" binary snapshot instead, without
+        re-validating, as long as the snapshot was made from the file as it is now and with the same conflict check
+        setting. Otherwise (or if the snapshot turns out to be corrupt) the JSON is loaded as usual and the snapshot
+        is (re)written from the accepted records. After later saves, refreshSnapshot brings it up to date again
+        (the Client calls it on an explicit save and on exit), so the next start can use it.
+
+        Parameters:
+            filename (str): The path to the JSON file to load
+            stream (bool): Whether to decode the file incrementally instead of with json.load
+            progress (callable or None): Called as progress(read, inserted) every progress_every records
+            progress_every (int): How many records to read between progress reports
+            workers (int): How many processes validate records (see insert_many)
+            snapshot (bool): Whether to start from, and keep up to date, the binary snapshot of the file
+
+        Returns:
+            int: The number of successfully inserted records
+        """
+
+        try:
+
+            f = open(filename, "r")
+
+        except FileNotFoundError:
+
+            print("No existing database. Starting empty.")
+
+            return 0
+
+        # Loading into an empty Repository leaves it in sync with the file
+        was_empty = len(self.records) == 0
+
+        snap = Snapshot(filename + ".snap") if snapshot and was_empty else None
+
+        with f:
+
+            if snap is not None and snap.matches(filename, self._intervals is not None):
+
+                try:
+
+                    count = self.loadSnapshot(snap.filename, progress=progress, progress_every=progress_every)
+
+                except ValueError as e:
+
+                    # Snapshot checks its whole file before returning a record, so nothing was loaded
+                    print(f"Ignoring {snap.filename}: {e}")
+
+                else:
+
+                    self._mark_synced(filename, exact=True)
+
+                    self._snapshot_source = os.path.abspath(filename)
+
+                    return count
+
+            data = self._iter_json_array(f) if stream else json.load(f)
+
+            self._restoring += 1
+
+            try:
+
+                report = self.insert_many(data, progress=progress, progress_every=progress_every, workers=workers)
+
+            finally:
+
+                self._restoring -= 1
+
+        self._mark_synced(filename if was_empty else None, exact=was_empty)
+
+        if snap is not None:
+
+            self._snapshot_source = os.path.abspath(filename)
+
+            self.saveSnapshot(snap.filename, source=filename)
+
+        self._finish_load(report)
+
+        return report["accepted"]
+
+    def _finish_load(self, report):
+        """
+        Keeps the report of a load in self.lastLoadReport and prints the first few rejected records.
+
+        Parameters:
+            report (dict): The accepted/rejected report of insert_many
+
+        Returns:
+            None
+        """
+
+        self.lastLoadReport = report
+
+        rejected = report["rejected"]
+
+        for err in rejected[:10]:
+
+            print(err["error"])
+
+        if len(rejected) > 10:
+
+            print(f"... and {len(rejected) - 10} more invalid records.")
+
+    # ---------------------------------------------------------
+    # BINARY SNAPSHOT
+    # ---------------------------------------------------------
+
+    def saveSnapshot(self, filename="flybase.snap", source=None):
+        """
+        Writes all current flight records to a compact binary snapshot (see Snapshot), recording whether
+        the conflict check is on. JSON stays the interchange format; the snapshot only makes the next start faster.
+
+        Parameters:
+            filename (str): The path of the snapshot file
+            source (str or None): The JSON file the records match, so loadFromFile can tell when the snapshot is stale
+
+        Returns:
+            int: The number of records written
+        """
+
+        return Snapshot(filename).write(self.records, source=source, conflict_check=self._intervals is not None)
+
+    def refreshSnapshot(self):
+        """
+        Rewrites the binary snapshot kept for the JSON file loaded with snapshot=True (see loadFromFile),
+        if the file was saved since the snapshot was written. This is a full rewrite, so it is left to
+        an explicit save or the end of a session rather than done after every change.
+        Nothing is written while there are unsaved changes, or when the file holds entries that are not
+        stored records (e.g. old entries an append kept); the next start then rebuilds the snapshot from the JSON.
+
+        Returns:
+            bool: True if the snapshot was rewritten
+        """
+
+        source = self._snapshot_source
+
+        if source is None or self._synced_file != source or not self._synced_exact:
+
+            return False
+
+        # Inserts and updates are in _dirty, and every change (deletes too) marks its partition
+        if self._dirty or self._dirty_partitions:
+
+            return False
+
+        snap = Snapshot(source + ".snap")
+
+        if snap.matches(source, self._intervals is not None):
+
+            return False
+
+        self.saveSnapshot(snap.filename, source=source)
+
+        return True
+
+    def loadSnapshot(self, filename="flybase.snap", trusted=True, progress=None, progress_every=10000):
+        """
+        Loads flight records from a binary snapshot written by saveSnapshot.
+        A trusted snapshot loaded into an empty Repository is stored without re-validation: its records already
+        passed every check when it was written, so only the dates are parsed for the indexes. Otherwise the records go through insert_many like a JSON load.
+        The accepted/rejected report is kept in self.lastLoadReport.
+
+        Parameters:
+            filename (str): The path of the snapshot file
+            trusted (bool): Whether the snapshot was written by this program and can skip validation
+            progress (callable or None): Called as progress(read, inserted) every progress_every records
+            progress_every (int): How many records to read between progress reports
+
+        Returns:
+            int: The number of records loaded
+
+        Raises:
+            FileNotFoundError: If the snapshot does not exist
+            ValueError: If the file is not a snapshot of this version, or is truncated or fails its checksum
+        """
+
+        records = Snapshot(filename).read()
+
+        if not trusted or len(self.records) > 0:
+
+            self._restoring += 1
+
+            try:
+
+                report = self.insert_many(records, progress=progress, progress_every=progress_every)
+
+            finally:
+
+                self._restoring -= 1
+
+        else:
+
+            report = {"accepted": 0, "rejected": []}
+
+            # Trusted dates are valid, so a zero-padded one is just its day plus its time of day,
+            # and both of those repeat far more often than whole date strings do
+            days = {}
+            times = {}
+
+            def parse(value):
+
+                if DATE_PATTERN.fullmatch(value) is None:
+
+                    return self._parse_date(value)
+
+                day = days.get(value[6:])
+
+                if day is None:
+
+                    day = days[value[6:]] = self._parse_date("00:00 " + value[6:])
+
+                time_of_day = times.get(value[:5])
+
+                if time_of_day is None:
+
+                    time_of_day = times[value[:5]] = self._parse_date(value[:5] + " 01/01/2000") - datetime(2000, 1, 1)
+
+                return day + time_of_day
+
+            self._by_departure.defer()
+
+            try:
+
+                for rec in records:
+
+                    dates = (parse(rec["departureDate"]), parse(rec["arrivalDate"]))
+
+                    self._add_record(rec, dates)
+
+                    if self._intervals is not None:
+
+                        self._track_intervals(rec, dates, 1)
+
+                    report["accepted"] += 1
+
+                    if progress is not None and report["accepted"] % progress_every == 0:
+
+                        progress(report["accepted"], report["accepted"])
+
+            finally:
+
+                self._by_departure.flush()
+
+        self._mark_synced(None)
+
+        self.lastLoadReport = report
+
+        return report["accepted"]
+
+    def _iter_json_array(self, f, chunk_size=65536, with_offsets=False):
+        """
+        Incrementally decodes the elements of a top-level JSON array from a text file.
+        Only one chunk plus the element being decoded is buffered at a time.
+
+        Parameters:
+            f (file): The open text file, positioned at the start of the array
+            chunk_size (int): How many characters to read at a time
+            with_offsets (bool): Whether to yield (start, end, element) with the element's character offsets
+
+        Returns:
+            iterator: The decoded array elements, in file order
+
+        Raises:
+            json.JSONDecodeError: If the file is not a well-formed JSON array
+        """
+
+        decoder = json.JSONDecoder()
+        whitespace = " \t\n\r\ufeff"
+
+        buf = ""
+        pos = 0
+        eof = False
+        expect = "["
+
+        # File offset of buf[0]
+        base = 0
+
+        while True:
+
+            # Skip whitespace, reading more data whenever the buffer runs out
+            while True:
+
+                while pos < len(buf) and buf[pos] in whitespace:
+
+                    pos += 1
+
+                if pos < len(buf) or eof:
+
+                    break
+
+                base += pos
+                buf, pos = buf[pos:] + f.read(chunk_size), 0
+                eof = pos == len(buf)
+
+            if pos == len(buf):
+
+                raise json.JSONDecodeError("Unexpected end of file", buf, pos)
+
+            char = buf[pos]
+
+            if expect == "[":
+
+                if char != "[":
+
+                    raise json.JSONDecodeError("Expected '['", buf, pos)
+
+                pos += 1
+                expect = "first"
+
+                continue
+
+            if expect in ("first", "next") and char == "]":
+
+                return
+
+            if expect == "next":
+
+                if char != ",":
+
+                    raise json.JSONDecodeError("Expected ',' or ']'", buf, pos)
+
+                pos += 1
+                expect = "value"
+
+                continue
+
+            # Decode one element, reading more data until it is complete.
+            # A cut-off number still decodes (e.g. "4." from "4.5"), so an element only
+            # counts as complete once a delimiter follows it or the file has ended.
+            try:
+
+                obj, end = decoder.raw_decode(buf, pos)
+
+                complete = eof or (end < len(buf) and buf[end] in whitespace + ",]")
+
+            except json.JSONDecodeError:
+
+                if eof:
+
+                    raise
+
+                complete = False
+
+            if not complete:
+
+                more = f.read(chunk_size)
+
+                base += pos
+                buf, pos = buf[pos:] + more, 0
+                eof = more == ""
+
+                continue
+
+            yield (base + pos, base + end, obj) if with_offsets else obj
+
+            pos = end
+            expect = "next"
+
+    def saveToFile(self, filename="flybase.json"):
+        """
+        Saves all current flight records to a JSON file, overwriting existing data.
+
+        Parameters:
+            filename (str): The path to the JSON file to write
+
+        Returns:
+            None
+        """
+
+        self._write_merged(filename, [], {rec["flightID"]: rec for rec in self.records})
+
+        self._mark_synced(filename, exact=True)
+
+    def appendToFile(self, filename="flybase.json"):
+        """
+        Appends or updates flight records in an existing JSON file without deleting earlier entries.
+        Only records new or changed since the file was last loaded or written are serialized;
+        untouched records are copied over as raw bytes, located through the "<file>.idx" offset index.
+
+        Parameters:
+            filename (str): The path to the JSON file to update
+
+        Returns:
+            None
+
+        Raises:
+            json.JSONDecodeError: If the existing file is not a valid JSON array (it is left untouched)
+        """
+
+        if self._synced_file == os.path.abspath(filename):
+
+            changed = {}
+
+            for fid in self._dirty:
+
+                rec = self.getByFlightID(fid)
+
+                if rec is not None:
+
+                    changed[fid] = rec
+
+        else:
+
+            changed = {rec["flightID"]: rec for rec in self.records}
+
+        if not changed and os.path.exists(filename):
+
+            return
+
+        elements = self._element_offsets(filename)
+
+        written = self._write_merged(filename, elements, changed)
+
+        # The file holds every record afterwards, one element per flightID; it holds nothing else if no
+        # other element is left over (e.g. the old entry of a deleted flight, or of a flight whose flightID changed)
+        self._mark_synced(filename, exact=written == len(self.records))
+
+    def _mark_synced(self, filename, exact=False):
         """
-        Loads flight records from a JSON file and inserts valid entries into the Repository.
+        Records that the Repository now matches a file, so later appends only write what changes after this.
 
         Parameters:
-            filename (str): The path to the JSON file to load
+            filename (str or None): The file the Repository matches, or None if it matches no file
+            exact (bool): Whether loading the file gives exactly the stored records
 
         Returns:
-            int: The number of successfully inserted records
+            None
         """
 
-        try:
+        self._synced_file = os.path.abspath(filename) if filename is not None else None
+        self._synced_exact = exact and filename is not None
+
+        self._dirty.clear()
+        self._dirty_partitions.clear()
+        self._loaded_partitions.clear()
+
+    def _element_offsets(self, filename):
+        """
+        Retrieves the byte range of every element of a JSON array file from its "<file>.idx" sidecar.
+        The sidecar is rebuilt with one streaming pass if it is missing or does not match the file.
+
+        Parameters:
+            filename (str): The JSON array file
+
+        Returns:
+            list[list]: [flightID or None, start, end] per element in file order (empty if the file does not exist)
+        """
 
-            with open(filename, "r") as f:
+        try:
 
-                data = json.load(f)
+            st = os.stat(filename)
 
         except FileNotFoundError:
 
+            return []
+
+        try:
+
+            with open(filename + ".idx", "r") as f:
+
+                side = json.load(f)
+
+            if side["size"] == st.st_size and side["mtime_ns"] == st.st_mtime_ns:
+
+                return side["elements"]
+
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+
+            pass
+
+        # latin-1 maps every byte to one character, so character offsets are byte offsets
+        with open(filename, "r", encoding="latin-1") as f:
+
+            elements = [
+
+                [obj.get("flightID") if isinstance(obj, dict) else None, start, end]
+
+                for start, end, obj in self._iter_json_array(f, with_offsets=True)
+
+            ]
+
+        self._write_offsets(filename, elements)
+
+        return elements
+
+    def _write_offsets(self, filename, elements):
+        """
+        Writes the "<file>.idx" sidecar describing where each element of a JSON array file lives.
+
+        Parameters:
+            filename (str): The JSON array file the offsets belong to
+            elements (list[list]): [flightID or None, start, end] per element in file order
+
+        Returns:
+            None
+        """
+
+        st = os.stat(filename)
+
+        tmp = filename + ".idx.tmp"
+
+        with open(tmp, "w") as f:
+
+            json.dump({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "elements": elements}, f)
+
+        os.replace(tmp, filename + ".idx")
+
+    def _write_merged(self, filename, elements, changed):
+        """
+        Atomically writes a JSON array file in which each changed record replaces the existing element
+        with its flightID, in place, and records not in the file yet are appended, formatted like json.dump(indent=4).
+        Other elements are copied as raw bytes, and only the first element of a flightID is kept.
+        The result goes to a temporary file that is renamed over the original, so a crash
+        mid-write cannot truncate the database. The offset sidecar is updated afterwards.
+
+        Parameters:
+            filename (str): The JSON array file to write
+            elements (list[list]): [flightID or None, start, end] per existing element in file order
+            changed (dict): flightID -> record for the records to (re)write
+
+        Returns:
+            int: The number of elements in the written file
+        """
+
+        # Each piece is either a run of existing elements that are contiguous in the file
+        # (a list of elements) or a record to serialize (a dict)
+        pieces = []
+        seen = set()
+
+        for i, element in enumerate(elements):
+
+            fid = element[0] if isinstance(element[0], str) else None
+
+            if fid is not None:
+
+                if fid in seen:
+
+                    continue
+
+                seen.add(fid)
+
+                if fid in changed:
+
+                    pieces.append(changed[fid])
+
+                    continue
+
+            if i and pieces and isinstance(pieces[-1], list) and pieces[-1][-1] is elements[i - 1]:
+
+                pieces[-1].append(element)
+
+            else:
+
+                pieces.append([element])
+
+        pieces.extend(rec for fid, rec in changed.items() if fid not in seen)
+
+        tmp = filename + ".tmp"
+        new_elements = []
+
+        with open(tmp, "wb") as out:
+
+            out.write(b"[")
+
+            pos = 1
+
+            with open(filename, "rb") if elements else contextlib.nullcontext() as old:
+
+                for piece in pieces:
+
+                    sep = b"\n    " if pos == 1 else b",\n    "
+
+                    out.write(sep)
+
+                    pos += len(sep)
+
+                    if isinstance(piece, list):
+
+                        start, end = piece[0][1], piece[-1][2]
+
+                        self._copy_bytes(old, out, start, end)
+
+                        # Element offsets inside the run all shift by the same amount
+                        new_elements.extend([fid, s + pos - start, e + pos - start] for fid, s, e in piece)
+
+                        pos += end - start
+
+                    else:
+
+                        data = json.dumps([piece], indent=4)[6:-2].encode()
+
+                        out.write(data)
+
+                        new_elements.append([piece["flightID"], pos, pos + len(data)])
+
+                        pos += len(data)
+
+            out.write(b"]" if pos == 1 else b"\n]")
+
+            out.flush()
+            os.fsync(out.fileno())
+
+        os.replace(tmp, filename)
+
+        self._write_offsets(filename, new_elements)
+
+        return len(new_elements)
+
+    def _copy_bytes(self, src, dst, start, end, chunk_size=1 << 20):
+        """
+        Copies a byte range from one binary file to another in bounded-size chunks.
+
+        Parameters:
+            src (file): The binary file to read from
+            dst (file): The binary file to write to
+            start (int): The first byte to copy
+            end (int): One past the last byte to copy
+            chunk_size (int): How many bytes to copy at a time
+
+        Returns:
+            None
+
+        Raises:
+            OSError: If the source file ends before the range does
+        """
+
+        src.seek(start)
+
+        remaining = end - start
+
+        while remaining > 0:
+
+            chunk = src.read(min(remaining, chunk_size))
+
+            if not chunk:
+
+                raise OSError("File changed while it was being merged.")
+
+            dst.write(chunk)
+
+            remaining -= len(chunk)
+
+    # ---------------------------------------------------------
+    # PARTITIONED STORAGE
+    # ---------------------------------------------------------
+
+    def _partition_key(self, rec, dates):
+        """
+        Computes the partition a record belongs in.
+
+        Parameters:
+            rec (dict): The record
+            dates (tuple): Its parsed (departure, arrival) dates
+
+        Returns:
+            tuple[str, str]: The departure year and the lowercased airline, as the year and airline indexes store them
+        """
+
+        return (self._normalize_key("year", dates[0].year), self._normalize_key("airline", rec["airline"]))
+
+    def loadPartitions(self, folder="flybase.parts", year=None, airline=None, workers=1):
+        """
+        Loads flight records from a partition folder (see Partitions), only from the partitions of one year
+        and/or airline if given. Partitions of the folder that are already loaded are skipped, so a Repository
+        can start with a few partitions and pull in more later. Records are validated like loadFromFile does,
+        so new flightIDs are only checked against the partitions loaded so far.
+
+        With workers > 1 the partitions are read and format-checked in a process pool, one partition per task,
+        while the inserts still run here in partition order.
+        The full accepted/rejected report is kept in self.lastLoadReport.
+
+        Parameters:
+            folder (str): The partition folder
+            year (int or str or None): Load only this departure year, None for every year
+            airline (str or None): Load only this airline (case-insensitive), None for every airline
+            workers (int): How many processes read partitions (1 reads them in this process)
+
+        Returns:
+            int: The number of successfully inserted records
+        """
+
+        parts = Partitions(folder)
+
+        if not parts.exists():
+
             print("No existing database. Starting empty.")
 
             return 0
 
-        count = 0
+        synced = self._synced_file == os.path.abspath(folder)
+        was_empty = len(self.records) == 0
 
-        for rec in data:
+        keys = [key for key in parts.matching(year, airline) if not (synced and key in self._loaded_partitions)]
 
-            if self.insert(rec):
+        # Records loaded from the folder are not changes to it
+        dirty, dirty_partitions = set(self._dirty), set(self._dirty_partitions)
 
-                count += 1
+        self._restoring += 1
 
-        return count
+        try:
 
-    def saveToFile(self, filename="flybase.json"):
+            if workers > 1 and len(keys) > 1:
+
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+
+                    report = self._insert_checked(chain.from_iterable(pool.map(_read_partition, repeat(folder), keys)))
+
+            else:
+
+                report = self.insert_many(chain.from_iterable(map(parts.read, keys)))
+
+        finally:
+
+            self._restoring -= 1
+
+        if synced:
+
+            self._dirty, self._dirty_partitions = dirty, dirty_partitions
+
+            self._loaded_partitions.update(keys)
+
+        elif was_empty:
+
+            self._mark_synced(folder)
+
+            self._loaded_partitions.update(keys)
+
+        self._finish_load(report)
+
+        return report["accepted"]
+
+    def savePartitions(self, folder="flybase.parts"):
         """
-        Saves all current flight records to a JSON file, overwriting existing data.
+        Writes the records to a partition folder, one file per departure year and airline.
+        If the Repository is in sync with that folder (it was loaded from or last saved to it), only the partitions
+        changed since then are rewritten, each from its own records; otherwise every partition is written
+        and partitions with no records left are removed.
 
         Parameters:
-            filename (str): The path to the JSON file to write
+            folder (str): The partition folder
+
+        Returns:
+            int: The number of partitions written or removed
+        """
+
+        parts = Partitions(folder)
+
+        if self._synced_file == os.path.abspath(folder):
+
+            changed = set(self._dirty_partitions)
+
+            # A partition changed before it was loaded still has records only on disk; bring them in first
+            for year, airline in changed - self._loaded_partitions:
+
+                self.loadPartitions(folder, year=year, airline=airline)
+
+            groups = {key: self.findWhere(year=key[0], airline=key[1]) for key in changed}
+
+            loaded = self._loaded_partitions | changed
+
+        else:
+
+            groups = {key: [] for key in parts.keys()}
+
+            for rec in self.records:
+
+                groups.setdefault(self._partition_key(rec, self.parsedDates(rec)), []).append(rec)
+
+            loaded = {key for key, recs in groups.items() if recs}
+
+        for key, recs in groups.items():
+
+            parts.write(key, recs)
+
+        self._mark_synced(folder)
+
+        self._loaded_partitions = loaded
+
+        return len(groups)
+
+    # ---------------------------------------------------------
+    # JOURNALED MODE
+    # ---------------------------------------------------------
+
+    def openJournal(self, journal, snapshot=False):
+        """
+        Switches the Repository to journaled mode: loads the journal's snapshot, replays the log
+        on top of it, and from then on appends every insert, update and delete to the log.
+
+        Parameters:
+            journal (Journal): The write-ahead log to use
+            snapshot (bool): Whether to load the JSON snapshot through its binary snapshot (see loadFromFile)
+
+        Returns:
+            int: The number of records in the Repository after replay
+        """
+
+        self.loadFromFile(journal.snapshot, stream=True, snapshot=snapshot)
+
+        self._restoring += 1
+
+        try:
+
+            journal.replay(self)
+
+        finally:
+
+            self._restoring -= 1
+
+        self.journal = journal
+
+        return len(self.records)
+
+    def compactJournal(self):
+        """
+        Writes the current records into the journal's snapshot and empties the log.
 
         Returns:
             None
         """
 
-        with open(filename, "w") as f:
+        self.saveToFile(self.journal.snapshot)
 
-            json.dump(self.records, f, indent=4)
+        self.journal.truncate()
 
-    def appendToFile(self, filename="flybase.json"):
+    def _journal(self, op, rec=None, fid=None):
         """
-        Appends or updates flight records in an existing JSON file without deleting earlier entries.
+        Appends a change to the write-ahead log (if journaled mode is on), compacting when the log is full.
 
         Parameters:
-            filename (str): The path to the JSON file to update
+            op (str): "insert", "update" or "delete"
+            rec (dict or None): The new record (insert and update)
+            fid (str or None): The flightID the change applies to (update and delete)
 
         Returns:
             None
         """
 
-        try:
+        if self.journal is None:
+
+            return
+
+        self.journal.record(op, rec=rec, fid=fid)
+
+        if self.journal.needsCompaction():
+
+            self.compactJournal()
+
+
+class _RecordList:
+
+    def __init__(self, slots):
+        """
+        Initializes a read-only, list-like view over the records of a Repository, in insertion order.
+
+        Parameters:
+            slots (dict): The Repository's id(record) -> record dict
+
+        Returns:
+            None
+        """
+
+        self._slots = slots
+
+    def __len__(self):
+        """
+        Retrieves the number of stored records.
+
+        Returns:
+            int: The number of records
+        """
+
+        return len(self._slots)
+
+    def __iter__(self):
+        """
+        Iterates over the stored records.
+
+        Returns:
+            iterator[dict]: The records in insertion order
+        """
+
+        return iter(self._slots.values())
+
+    def __getitem__(self, index):
+        """
+        Retrieves a record (or a list of records for a slice) by position.
+
+        Parameters:
+            index (int or slice): The position(s) to retrieve
+
+        Returns:
+            dict or list[dict]: The selected records
+        """
+
+        if isinstance(index, slice) and index.step in (None, 1) and (index.start or 0) >= 0 and (index.stop is None or index.stop >= 0):
+
+            # A forward slice (e.g. one page of a table) stops at its end
+            return list(islice(self._slots.values(), index.start, index.stop))
+
+        return list(self._slots.values())[index]
+
+    def __repr__(self):
+        """
+        Retrieves a printable form of the records, like a list's.
+
+        Returns:
+            str: The records as a list
+        """
+
+        return repr(list(self._slots.values()))
+
 
-            with open(filename, "r") as f:
+def _check_chunk(records):
+    """
+    Process-pool task for Repository.insert_many: runs the per-record format checks on a chunk.
+    Module-level so it can be pickled by the worker processes.
 
-                existing = json.load(f)
+    Parameters:
+        records (list[dict]): The records to check
 
-        except:
+    Returns:
+        list[tuple]: (record, dates, error) per record, in input order
+    """
 
-            existing = []
+    return list(Repository()._check_serial(records))
 
-        combined = {rec["flightID"]: rec for rec in existing}
 
-        for r in self.records:
+def _read_partition(folder, key):
+    """
+    Process-pool task for Repository.loadPartitions: reads one partition and runs the per-record format checks on it.
 
-            combined[r["flightID"]] = r
+    Parameters:
+        folder (str): The partition folder
+        key (tuple[str, str]): The partition to read
 
-        with open(filename, "w") as f:
+    Returns:
+        list[tuple]: (record, dates, error) per record, in file order
+    """
 
-            json.dump(list(combined.values()), f, indent=4)
+    return _check_chunk(Partitions(folder).read(key))
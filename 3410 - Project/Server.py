@@ -2,11 +2,24 @@
 # Alice Balser - B00954620
 # Connor McDonald - B00938421
 
-from datetime import datetime
-
 
 class Server:
 
+    # Fields only Airline users may see
+    SENSITIVE_KEYS = {"passengers", "mission", "cargoWeight"}
+
+    # Fields groupBy can group on. "year" and "month" come from the departure date, "route" is "DEP-ARR".
+    GROUP_FIELDS = (
+
+        "airline", "year", "month", "flightType", "aircraftModel", "route",
+        "pilotID", "aircraftID", "departureLocation", "arrivalLocation"
+
+    )
+
+    # Numeric values groupBy can aggregate ("duration" is the block time in minutes), and how
+    MEASURE_FIELDS = ("passengers", "cargoWeight", "duration")
+    MEASURE_FUNCTIONS = ("sum", "avg", "min", "max")
+
     def __init__(self, repo):
         """
         Initializes the Server with a reference to the Repository class.
@@ -32,14 +45,12 @@ class Server:
             str: A formatted multi-line string representing the record
         """
 
-        sensitive_keys = {"passengers", "mission", "cargoWeight"}
-
         lines = []
 
         for k, v in rec.items():
 
             # Hide sensitive information for general users
-            if not isAirlineUser and k in sensitive_keys:
+            if not isAirlineUser and k in self.SENSITIVE_KEYS:
                 continue
 
             lines.append(f"{k}: {v}")
@@ -68,41 +79,133 @@ class Server:
 
             return
 
-        # Find flights for that pilot
-        flights = [r for r in self.repo.records if r["pilotID"].lower() == pilotID.lower()]
+        summary = self.pilotSummary(pilotID)
 
-        if not flights:
+        if summary is None:
 
             print("\nNo flights found for that pilot.\n")
 
             return
 
-        # Sort by date
-        def parse_date(d):
-
-            return datetime.strptime(d, "%H:%M %d/%m/%Y")
-
-        flights_sorted = sorted(flights, key=lambda r: parse_date(r["departureDate"]))
-
-        first = flights_sorted[0]["departureDate"]
-        last  = flights_sorted[-1]["departureDate"]
-
-        career_days = (parse_date(last) - parse_date(first)).days
-        airlines = sorted({r["airline"] for r in flights})
-
         # Nicely formatted output
         print(f"\nPilot: {pilotID}")
         print("--------------------------------------")
-        print(f"Total Flights: {len(flights)}")
-        print(f"Career Length: {career_days} days")
-        print(f"First Flight: {first}")
-        print(f"Last Flight:  {last}")
+        print(f"Total Flights: {summary['flights']}")
+        print(f"Career Length: {summary['careerDays']} days")
+        print(f"First Flight: {summary['firstFlight']}")
+        print(f"Last Flight:  {summary['lastFlight']}")
         print("\nAirlines flown for:")
          
-        for al in airlines:
+        for al in summary["airlines"]:
 
             print(f"- {al}")
 
+    def pilotSummary(self, pilotID):
+        """
+        Computes the statistics of a given pilot as a structured result.
+
+        Parameters:
+            pilotID (str): The pilot ID to search for (case-insensitive)
+
+        Returns:
+            dict or None: {"pilotID", "flights", "firstFlight", "lastFlight", "careerDays", "airlines"},
+                          or None if the pilot has no flights
+        """
+
+        summary = None
+
+        for rec in self.repo.findWhere(pilotID=pilotID):
+
+            summary = self._add_to_summary(summary, pilotID, rec)
+
+        return self._finish_summary(summary)
+
+    def allPilotSummaries(self):
+        """
+        Computes the statistics of every pilot in a single pass over the records.
+
+        Returns:
+            dict: pilotID -> the pilotSummary result, keyed by the first spelling of each pilotID seen
+                  (pilotIDs that differ only in case are the same pilot, as in pilotSummary)
+        """
+
+        summaries = {}
+
+        for rec in self.repo.records:
+
+            key = str(rec["pilotID"]).lower()
+
+            summaries[key] = self._add_to_summary(summaries.get(key), rec["pilotID"], rec)
+
+        return {s["pilotID"]: self._finish_summary(s) for s in summaries.values()}
+
+    def _add_to_summary(self, summary, pilotID, rec):
+        """
+        Adds one flight to a pilot's running statistics.
+
+        Parameters:
+            summary (dict or None): The running statistics, or None for the pilot's first flight
+            pilotID (str): The pilot ID to report
+            rec (dict): The flight
+
+        Returns:
+            dict: The updated running statistics
+        """
+
+        departure = self.repo.parsedDates(rec)[0]
+
+        if summary is None:
+
+            return {
+
+                "pilotID": pilotID,
+                "flights": 1,
+                "first": (departure, rec["departureDate"]),
+                "last": (departure, rec["departureDate"]),
+                "airlines": {rec["airline"]}
+
+            }
+
+        summary["flights"] += 1
+        summary["airlines"].add(rec["airline"])
+
+        # Ties keep the earliest-stored first flight and the latest-stored last flight, like a stable sort
+        if departure < summary["first"][0]:
+
+            summary["first"] = (departure, rec["departureDate"])
+
+        if departure >= summary["last"][0]:
+
+            summary["last"] = (departure, rec["departureDate"])
+
+        return summary
+
+    def _finish_summary(self, summary):
+        """
+        Turns a pilot's running statistics into the pilotSummary result.
+
+        Parameters:
+            summary (dict or None): The running statistics
+
+        Returns:
+            dict or None: The pilotSummary result, or None if there were no flights
+        """
+
+        if summary is None:
+
+            return None
+
+        return {
+
+            "pilotID": summary["pilotID"],
+            "flights": summary["flights"],
+            "firstFlight": summary["first"][1],
+            "lastFlight": summary["last"][1],
+            "careerDays": (summary["last"][0] - summary["first"][0]).days,
+            "airlines": sorted(summary["airlines"])
+
+        }
+
 
 
     # ---------------------------------------------------------
@@ -120,11 +223,7 @@ class Server:
             int: The number of matching flights
         """
 
-         airline = airline.lower()
-
-         flights = [r for r in self.repo.records if r["airline"].lower() == airline]
-
-         return len(flights)
+         return self._aggregate("count", airline=airline)
 
     def airlineYear(self, airline, year):
         """
@@ -138,19 +237,7 @@ class Server:
             int: The number of flights for that airline in the given year
         """
 
-        airline = airline.lower()
-
-        flights = [
-
-            r for r in self.repo.records
-
-            if r["airline"].lower() == airline
-
-            and r["departureDate"][-4:] == year
-        
-        ]
-
-        return len(flights)
+        return self._aggregate("count", airline=airline, year=year)
 
     # ---------------------------------------------------------
     # GENERAL STATS
@@ -177,13 +264,7 @@ class Server:
             list[dict]: A list of matching flight records
         """
 
-        return [
-
-            r for r in self.repo.records
-
-            if r["departureDate"][-4:] == year
-
-        ]
+        return self.repo.findWhere(year=year)
 
     def flightsByType(self, ft):
         """
@@ -196,13 +277,136 @@ class Server:
             list[dict]: A list of matching records
         """
 
-        return [
+        return self.repo.findWhere(flightType=ft)
+
+    def flightsBetween(self, start, end):
+        """
+        Retrieves all flights departing within a time window.
+
+        Parameters:
+            start (datetime): The inclusive start of the window
+            end (datetime): The exclusive end of the window
+
+        Returns:
+            list[dict]: The matching flight records, in departure order
+        """
+
+        return self.repo.findBetween(start, end)
+
+    def flightsByMonth(self, year, month):
+        """
+        Retrieves all flights departing within a given month.
+
+        Parameters:
+            year (str): The year, in YYYY format
+            month (str): The month, 1 to 12
+
+        Returns:
+            list[dict]: The matching flight records, in departure order
+        """
+
+        return self.repo.findByMonth(year, month)
+
+    def flightsByDay(self, year, month, day):
+        """
+        Retrieves all flights departing on a given day.
+
+        Parameters:
+            year (str): The year, in YYYY format
+            month (str): The month, 1 to 12
+            day (str): The day of the month
+
+        Returns:
+            list[dict]: The matching flight records, in departure order
+        """
+
+        return self.repo.findByDay(year, month, day)
+
+    # ---------------------------------------------------------
+    # ROUTE STATS
+    # ---------------------------------------------------------
+
+    def routeFlights(self, origin, destination):
+        """
+        Retrieves all flights on a route.
+
+        Parameters:
+            origin (str): The departure location
+            destination (str): The arrival location
+
+        Returns:
+            list[dict]: The matching flight records
+        """
+
+        return self.repo.findRoute(origin, destination)
+
+    def routeTotal(self, origin, destination):
+        """
+        Counts the flights on a route.
+
+        Parameters:
+            origin (str): The departure location
+            destination (str): The arrival location
+
+        Returns:
+            int: The number of flights on the route
+        """
+
+        return self.repo.routeCount(origin, destination)
+
+    def avgBlockTime(self, origin, destination):
+        """
+        Computes the average block time (arrival minus departure) of a route.
+
+        Parameters:
+            origin (str): The departure location
+            destination (str): The arrival location
+
+        Returns:
+            float or None: The average block time in minutes, or None if no flight flies the route
+        """
+
+        return self.repo.routeBlockTime(origin, destination)
+
+    def routesFrom(self, origin):
+        """
+        Counts the flights from a location to each destination served from it.
+
+        Parameters:
+            origin (str): The departure location
+
+        Returns:
+            dict: destination -> number of flights, busiest first
+        """
+
+        return self.repo.routesFrom(origin)
+
+    def busiestAirports(self, n=10):
+        """
+        Ranks locations by traffic (departures plus arrivals).
+
+        Parameters:
+            n (int or None): How many locations to return, None for all
+
+        Returns:
+            list[tuple[str, int, int]]: (location, departures, arrivals), busiest first
+        """
+
+        return self.repo.busiestAirports(n)
+
+    # ---------------------------------------------------------
+    # SCHEDULE CONFLICTS
+    # ---------------------------------------------------------
 
-            r for r in self.repo.records
+    def conflictReport(self):
+        """
+        Lists every pair of flights that books the same aircraft or pilot at overlapping times.
 
-            if r["flightType"].lower() == ft.lower()
+        Returns:
+            list[dict]: {"field", "value", "flightID", "otherFlightID"} per conflicting pair
+        """
 
-        ]
+        return self.repo.findConflicts()
 
     # ---------------------------------------------------------
     # MODEL STATS
@@ -219,53 +423,247 @@ class Server:
             float or None: The average passenger count, or None if no valid data exists
         """
 
-        model = model.lower()
+        return self._aggregate("avg:passengers", aircraftModel=model, flightType="public")
+
+    def avgCargo(self, model):
+        """
+        Computes the average cargo weight for cargo flights of a given aircraft model.
+
+        Parameters:
+            model (str): The aircraft model name to analyze
+
+        Returns:
+            float or None: The average cargo weight in tonnes, or None if no valid data exists
+        """
+
+        return self._aggregate("avg:cargoWeight", aircraftModel=model, flightType="cargo")
+
+    # ---------------------------------------------------------
+    # GROUP-BY AGGREGATION
+    # ---------------------------------------------------------
+
+    def groupBy(self, by=(), measures=("count",), **criteria):
+        """
+        Computes a breakdown table in one pass over the matching records,
+        e.g. groupBy(["airline", "year"], ["count", "avg:passengers"], flightType="public").
+        Text keys are grouped case-insensitively and labelled with the first spelling seen.
+
+        Parameters:
+            by (sequence[str]): The GROUP_FIELDS to group on, () for a single total
+            measures (sequence[str]): "count", or "<function>:<field>" with a function of MEASURE_FUNCTIONS
+                                      and a field of MEASURE_FIELDS (e.g. "avg:passengers", "max:duration")
+            **criteria: Filters applied before grouping, as for Repository.findWhere
+
+        Returns:
+            dict: group key tuple (one value per field of by) -> {measure: value}, ordered by key.
+                  Groups with no records are left out; an average, minimum or maximum over no values is None.
+
+        Raises:
+            ValueError: If a group field or measure is not supported
+        """
+
+        by = tuple(by)
+        measures = tuple(measures)
+
+        for field in by:
+
+            if field not in self.GROUP_FIELDS:
+
+                raise ValueError(f"Cannot group by '{field}'.")
+
+        fields = []
+
+        for measure in measures:
+
+            if measure == "count":
+
+                continue
+
+            function, _, field = measure.partition(":")
+
+            if function not in self.MEASURE_FUNCTIONS or field not in self.MEASURE_FIELDS:
+
+                raise ValueError(f"Unknown measure '{measure}'.")
+
+            if field not in fields:
+
+                fields.append(field)
+
+        total = self._pushed_down(by, measures, criteria)
+
+        if total is not None:
+
+            return total
+
+        rows = self.repo.findWhere(**criteria) if criteria else self.repo.records
+
+        needs_dates = "duration" in fields or "year" in by or "month" in by
+
+        # normalized key -> [label, count, {field: [n, sum, min, max]}]
+        groups = {}
 
-        flights = [
+        for rec in rows:
 
-            r for r in self.repo.records
+            dates = self.repo.parsedDates(rec) if needs_dates else None
 
-            if r["aircraftModel"].lower() == model
+            label = tuple(self._group_value(field, rec, dates) for field in by)
+            key = tuple(v.lower() if isinstance(v, str) else v for v in label)
 
-            and r["flightType"].lower() == "public"
+            group = groups.get(key)
 
-            and "passengers" in r
+            if group is None:
 
-        ]
+                group = groups[key] = [label, 0, {field: [0, 0, None, None] for field in fields}]
 
-        if not flights:
+            group[1] += 1
+
+            for field, acc in group[2].items():
+
+                if field == "duration":
+
+                    value = (dates[1] - dates[0]).total_seconds() / 60
+
+                else:
+
+                    value = rec.get(field)
+
+                    if value is None:
+
+                        continue
+
+                acc[0] += 1
+                acc[1] += value
+
+                if acc[2] is None or value < acc[2]:
+
+                    acc[2] = value
+
+                if acc[3] is None or value > acc[3]:
+
+                    acc[3] = value
+
+        return {
+
+            label: {measure: self._measure_value(measure, count, accs) for measure in measures}
+
+            for key, (label, count, accs) in sorted(groups.items())
+
+        }
+
+    def _pushed_down(self, by, measures, criteria):
+        """
+        Answers a groupBy total straight from the Repository's indexes or running totals, when it can.
+
+        Parameters:
+            by (tuple): The group fields
+            measures (tuple): The measures
+            criteria (dict): The filters
+
+        Returns:
+            dict or None: The groupBy result, or None if the query needs the full pass
+        """
+
+        if by or len(measures) != 1:
 
             return None
 
-        return sum(r["passengers"] for r in flights) / len(flights)
+        measure = measures[0]
 
-    def avgCargo(self, model):
+        if measure == "count":
+
+            count = self.repo.countWhere(**criteria)
+
+            return {(): {"count": count}} if count else {}
+
+        # Running per-model totals cover the one flight type that carries each field
+        function, _, field = measure.partition(":")
+
+        if (
+
+            function == "avg"
+
+            and field in self.repo.AGGREGATED_FIELDS
+
+            and set(criteria) == {"aircraftModel", "flightType"}
+
+            and str(criteria["flightType"]).lower() == self.repo.AGGREGATED_FIELDS[field]
+
+        ):
+
+            average = self.repo.modelAverage(criteria["aircraftModel"], field)
+
+            return {(): {measure: average}} if average is not None else {}
+
+        return None
+
+    def _group_value(self, field, rec, dates):
         """
-        Computes the average cargo weight for cargo flights of a given aircraft model.
+        Retrieves the value a record is grouped under for one group field.
 
         Parameters:
-            model (str): The aircraft model name to analyze
+            field (str): One of GROUP_FIELDS
+            rec (dict): The record
+            dates (tuple or None): The parsed (departure, arrival) dates of the record
 
         Returns:
-            float or None: The average cargo weight in tonnes, or None if no valid data exists
+            str or int: The group value
         """
 
-        model = model.lower()
+        if field == "year":
 
-        flights = [
+            return dates[0].year
 
-            r for r in self.repo.records
+        if field == "month":
 
-            if r["aircraftModel"].lower() == model
+            return dates[0].month
 
-            and r["flightType"].lower() == "cargo"
+        if field == "route":
 
-            and "cargoWeight" in r
+            return f"{rec['departureLocation']}-{rec['arrivalLocation']}"
 
-        ]
+        return rec[field]
 
-        if not flights:
+    def _measure_value(self, measure, count, accs):
+        """
+        Computes one measure of a group from its accumulators.
 
-            return None
+        Parameters:
+            measure (str): The measure
+            count (int): The number of records in the group
+            accs (dict): field -> [n, sum, min, max] over the records that have the field
+
+        Returns:
+            int or float or None: The measure value
+        """
+
+        if measure == "count":
+
+            return count
+
+        function, _, field = measure.partition(":")
+
+        n, total, low, high = accs[field]
+
+        if function == "sum":
+
+            return total
+
+        if function == "avg":
+
+            return total / n if n else None
+
+        return low if function == "min" else high
+
+    def _aggregate(self, measure, **criteria):
+        """
+        Computes a single total with groupBy.
+
+        Parameters:
+            measure (str): The measure, as for groupBy
+            **criteria: The filters, as for groupBy
+
+        Returns:
+            int or float or None: The total (0 for an empty count, None for an empty average)
+        """
 
-        return sum(r["cargoWeight"] for r in flights) / len(flights)
+        return self.groupBy((), (measure,), **criteria).get((), {}).get(measure, 0 if measure == "count" else None)
@@ -0,0 +1,496 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from operator import itemgetter
+
+
+class Snapshot:
+
+    # File signature and format version, checked before anything else is read
+    MAGIC = b"FLYSNAP\x00"
+    VERSION = 3
+
+    # How one field value is packed: a string number, a signed 64-bit int, a double, a bool,
+    # nothing at all (None), or the number of a JSON string for anything else (lists, huge ints, ...)
+    STR, INT, FLOAT, BOOL, NONE, JSON = range(6)
+
+    CODES = {STR: "I", INT: "q", FLOAT: "d", BOOL: "?", NONE: "", JSON: "I"}
+
+    # magic, version, size and mtime_ns of the JSON file the snapshot was made from (0, 0 if none),
+    # whether the conflict check was on when its records were accepted, and the CRC32 of everything after the header
+    HEADER = struct.Struct("<8sHQQ?I")
+
+    COUNT = struct.Struct("<I")
+    LENGTH = struct.Struct("<Q")
+    FIELD = struct.Struct("<IB")
+
+    # Length of the whole record, then its shape number
+    RECORD = struct.Struct("<IH")
+
+    def __init__(self, filename="flybase.snap"):
+        """
+        Initializes a binary snapshot file of flight records. The layout is:
+
+            header     magic, version, size and mtime_ns of the source JSON file, conflict check setting, CRC32
+            strings    count, the length of every string, then all strings as one UTF-8 block
+            shapes     count, then per shape its field count and (key string, value tag) per field
+            records    count and total size, then per record its length, its shape and its packed values
+
+        Every string (keys, airlines, models, locations, dates, ...) is stored once in the string table
+        and referred to by number, and each distinct field layout ("shape") is described once,
+        so a record is one fixed-size struct that is unpacked with a single call.
+
+        Parameters:
+            filename (str): The path of the snapshot file
+
+        Returns:
+            None
+        """
+
+        self.filename = filename
+
+    def source(self):
+        """
+        Retrieves the size and modification time of the JSON file the snapshot was made from,
+        and whether the conflict check was on.
+
+        Returns:
+            tuple[int, int, bool] or None: (size, mtime_ns, conflict_check), or None if the snapshot is missing or unreadable
+        """
+
+        try:
+
+            with open(self.filename, "rb") as f:
+
+                magic, version, size, mtime_ns, conflict_check, _ = self.HEADER.unpack(f.read(self.HEADER.size))
+
+        except (FileNotFoundError, struct.error):
+
+            return None
+
+        if magic != self.MAGIC or version != self.VERSION:
+
+            return None
+
+        return (size, mtime_ns, conflict_check)
+
+    def matches(self, source, conflict_check=False):
+        """
+        Checks whether the snapshot was made from the current contents of a JSON file, with the same conflict check setting.
+
+        Parameters:
+            source (str): The path of the JSON file
+            conflict_check (bool): Whether the conflict check is on now
+
+        Returns:
+            bool: True if the snapshot records that file's current size and modification time, and that setting
+        """
+
+        try:
+
+            st = os.stat(source)
+
+        except FileNotFoundError:
+
+            return False
+
+        return self.source() == (st.st_size, st.st_mtime_ns, bool(conflict_check))
+
+    def write(self, records, source=None, conflict_check=False):
+        """
+        Atomically writes records to the snapshot file, through a temporary file renamed over it.
+
+        Parameters:
+            records (iterable[dict]): The records to write
+            source (str or None): The JSON file the records were loaded from, whose size and mtime are recorded
+            conflict_check (bool): Whether the conflict check was on when the records were accepted
+
+        Returns:
+            int: The number of records written
+        """
+
+        strings = {}
+        shapes = {}
+        packers = []
+
+        body = bytearray()
+        count = 0
+
+        def number(s):
+
+            n = strings.get(s)
+
+            if n is None:
+
+                n = strings[s] = len(strings)
+
+            return n
+
+        for rec in records:
+
+            tags = []
+            packed = []
+            numbers = []
+
+            for key, value in rec.items():
+
+                kind = type(value)
+
+                if kind is str:
+
+                    tag = self.STR
+                    packed.append(number(value))
+
+                elif kind is bool:
+
+                    tag = self.BOOL
+                    numbers.append(value)
+
+                elif kind is int and -(1 << 63) <= value < (1 << 63):
+
+                    tag = self.INT
+                    numbers.append(value)
+
+                elif kind is float:
+
+                    tag = self.FLOAT
+                    numbers.append(value)
+
+                elif value is None:
+
+                    tag = self.NONE
+
+                else:
+
+                    tag = self.JSON
+                    packed.append(number(json.dumps(value)))
+
+                tags.append((number(key), tag))
+
+            signature = tuple(tags)
+
+            shape = shapes.get(signature)
+
+            if shape is None:
+
+                shape = shapes[signature] = len(shapes)
+
+                # String numbers first, then the numeric values, in field order within each group
+                packers.append(struct.Struct("<" + "".join(
+
+                    self.CODES[t] for _, t in signature if t in (self.STR, self.JSON)
+
+                ) + "".join(
+
+                    self.CODES[t] for _, t in signature if t not in (self.STR, self.JSON)
+
+                )))
+
+            data = packers[shape].pack(*packed, *numbers)
+
+            body += self.RECORD.pack(self.RECORD.size + len(data), shape)
+            body += data
+
+            count += 1
+
+        st = os.stat(source) if source is not None else None
+
+        lengths = array("I", map(len, strings))
+
+        # surrogatepass keeps lone surrogates, which JSON strings may contain
+        text = "".join(strings).encode("utf-8", "surrogatepass")
+
+        if sys.byteorder == "big":
+
+            lengths.byteswap()
+
+        tables = bytearray()
+
+        tables += self.COUNT.pack(len(strings))
+        tables += lengths.tobytes()
+        tables += self.LENGTH.pack(len(text))
+        tables += text
+
+        tables += self.COUNT.pack(len(shapes))
+
+        for signature in shapes:
+
+            tables += struct.pack("<H", len(signature))
+
+            for key, tag in signature:
+
+                tables += self.FIELD.pack(key, tag)
+
+        tables += self.COUNT.pack(count)
+        tables += self.LENGTH.pack(len(body))
+
+        tmp = self.filename + ".tmp"
+
+        with open(tmp, "wb") as f:
+
+            f.write(self.HEADER.pack(
+
+                self.MAGIC, self.VERSION, st.st_size if st else 0, st.st_mtime_ns if st else 0, bool(conflict_check),
+                zlib.crc32(body, zlib.crc32(tables))
+
+            ))
+
+            f.write(tables)
+            f.write(body)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, self.filename)
+
+        return count
+
+    def read(self):
+        """
+        Reads the records back from the snapshot file, in the order they were written.
+
+        Returns:
+            iterator[dict]: The records
+
+        Raises:
+            FileNotFoundError: If the snapshot does not exist
+            ValueError: If the file is not a snapshot, has another version, or is truncated or corrupt
+                        (raised before the first record is returned)
+        """
+
+        with open(self.filename, "rb") as f:
+
+            buf = f.read()
+
+        try:
+
+            magic, version, _, _, _, crc = self.HEADER.unpack_from(buf, 0)
+
+            if magic != self.MAGIC:
+
+                raise ValueError(f"{self.filename} is not a flight snapshot.")
+
+            if version != self.VERSION:
+
+                raise ValueError(f"{self.filename} is snapshot version {version}, expected {self.VERSION}.")
+
+            # Catches damage the structural checks below cannot see, such as a flipped byte in a number
+            if zlib.crc32(memoryview(buf)[self.HEADER.size:]) != crc:
+
+                raise ValueError(f"{self.filename} is corrupt: its checksum does not match.")
+
+            pos = self.HEADER.size
+
+            strings, pos = self._read_strings(buf, pos)
+            shapes, pos = self._read_shapes(buf, pos, strings)
+
+            count, = self.COUNT.unpack_from(buf, pos)
+            size, = self.LENGTH.unpack_from(buf, pos + self.COUNT.size)
+            pos += self.COUNT.size + self.LENGTH.size
+
+        except struct.error as e:
+
+            raise ValueError(f"{self.filename} is truncated: {e}")
+
+        # Checked before any record is returned, so a cut-off or corrupt file never loads halfway
+        if pos + size != len(buf):
+
+            raise ValueError(f"{self.filename} is truncated: expected {pos + size} bytes, found {len(buf)}.")
+
+        unpacked = self._unpack_records(buf, pos, count, shapes, len(strings))
+
+        lookup = strings.__getitem__
+
+        for shape, values in unpacked:
+
+            keys, packer, n_strings, nones, order, json_keys = shapes[shape]
+
+            row = [*map(lookup, values[:n_strings]), *values[n_strings:], *nones]
+
+            rec = dict(zip(keys, order(row)))
+
+            for key in json_keys:
+
+                rec[key] = json.loads(rec[key])
+
+            yield rec
+
+    def _unpack_records(self, buf, pos, count, shapes, n_strings):
+        """
+        Unpacks the values of every record, checking that the record section holds exactly count well-formed
+        records: each with a known shape, the length that shape packs to, and only string numbers
+        that are in the string table.
+
+        Parameters:
+            buf (bytes): The snapshot contents
+            pos (int): Where the first record starts
+            count (int): The number of records
+            shapes (list[tuple]): The decoded shape table
+            n_strings (int): The size of the string table
+
+        Returns:
+            list[tuple[int, tuple]]: (shape, packed values) per record
+
+        Raises:
+            ValueError: If a record is malformed or the records do not end where the file does
+        """
+
+        unpacked = []
+        largest = -1
+
+        try:
+
+            for _ in range(count):
+
+                length, shape = self.RECORD.unpack_from(buf, pos)
+
+                _, packer, strings_in, _, _, _ = shapes[shape]
+
+                if length != self.RECORD.size + packer.size:
+
+                    raise ValueError(f"a record of {length} bytes has a shape of {self.RECORD.size + packer.size}")
+
+                values = packer.unpack_from(buf, pos + self.RECORD.size)
+
+                if strings_in:
+
+                    largest = max(largest, *values[:strings_in])
+
+                unpacked.append((shape, values))
+
+                pos += length
+
+        except (struct.error, IndexError, ValueError) as e:
+
+            raise ValueError(f"{self.filename} is corrupt: {e}")
+
+        if pos != len(buf) or largest >= n_strings:
+
+            raise ValueError(f"{self.filename} is corrupt: its records do not match its string table and size.")
+
+        return unpacked
+
+    def _read_strings(self, buf, pos):
+        """
+        Decodes the string table.
+
+        Parameters:
+            buf (bytes): The snapshot contents
+            pos (int): Where the string table starts
+
+        Returns:
+            tuple[list[str], int]: The strings by number, and where the next section starts
+        """
+
+        count, = self.COUNT.unpack_from(buf, pos)
+        pos += self.COUNT.size
+
+        lengths = array("I")
+        lengths.frombytes(buf[pos:pos + count * lengths.itemsize])
+
+        if len(lengths) != count:
+
+            raise struct.error("string table is cut short")
+
+        if sys.byteorder == "big":
+
+            lengths.byteswap()
+
+        pos += count * lengths.itemsize
+
+        size, = self.LENGTH.unpack_from(buf, pos)
+        pos += self.LENGTH.size
+
+        # One decode for the whole table; the lengths are in characters, so the strings are plain slices
+        text = buf[pos:pos + size].decode("utf-8", "surrogatepass")
+        ends = list(accumulate(lengths))
+
+        strings = [text[start:end] for start, end in zip([0] + ends, ends)]
+
+        return strings, pos + size
+
+    def _read_shapes(self, buf, pos, strings):
+        """
+        Decodes the shape table into what read needs to rebuild each kind of record.
+
+        Parameters:
+            buf (bytes): The snapshot contents
+            pos (int): Where the shape table starts
+            strings (list[str]): The string table
+
+        Returns:
+            tuple[list[tuple], int]: Per shape (keys, struct, number of string values, None padding,
+                                     getter putting the unpacked values back in key order, keys holding JSON),
+                                     and where the next section starts
+        """
+
+        count, = self.COUNT.unpack_from(buf, pos)
+        pos += self.COUNT.size
+
+        shapes = []
+
+        for _ in range(count):
+
+            n, = struct.unpack_from("<H", buf, pos)
+            pos += 2
+
+            fields = [self.FIELD.unpack_from(buf, pos + i * self.FIELD.size) for i in range(n)]
+            pos += n * self.FIELD.size
+
+            # Position of every field in the unpacked row: string values, then numbers, then the Nones
+            grouped = (
+
+                [i for i, (_, t) in enumerate(fields) if t in (self.STR, self.JSON)] +
+                [i for i, (_, t) in enumerate(fields) if t not in (self.STR, self.JSON, self.NONE)] +
+                [i for i, (_, t) in enumerate(fields) if t == self.NONE]
+
+            )
+
+            where = [0] * n
+
+            for row_pos, field_pos in enumerate(grouped):
+
+                where[field_pos] = row_pos
+
+            if n < 2:
+
+                # itemgetter needs two positions to return a tuple
+                order = lambda row: row
+
+            else:
+
+                order = itemgetter(*where)
+
+            n_strings = sum(t in (self.STR, self.JSON) for _, t in fields)
+            n_nones = sum(t == self.NONE for _, t in fields)
+
+            packer = struct.Struct("<" + "".join(
+
+                self.CODES[t] for _, t in fields if t in (self.STR, self.JSON)
+
+            ) + "".join(
+
+                self.CODES[t] for _, t in fields if t not in (self.STR, self.JSON)
+
+            ))
+
+            shapes.append((
+
+                [strings[k] for k, _ in fields],
+                packer,
+                n_strings,
+                (None,) * n_nones,
+                order,
+                [strings[k] for k, t in fields if t == self.JSON]
+
+            ))
+
+        return shapes, pos
@@ -0,0 +1,253 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+from bisect import bisect_left, insort
+from itertools import chain, islice
+
+
+class SortedIndex:
+
+    # Target number of keys per block; a block is split once it holds twice as many
+    LOAD = 1000
+
+    def __init__(self):
+        """
+        Initializes an empty sorted index: a list of sorted blocks, each at most 2 * LOAD keys long,
+        plus the largest key of every block. Adding or removing a key only shifts one short block,
+        so both stay cheap at millions of keys, unlike bisect.insort on one flat list.
+        Between defer() and flush(), added keys are buffered so a bulk load sorts them all at once.
+        Reading never changes the index, so any number of threads can read it at once while nothing writes.
+
+        Returns:
+            None
+        """
+
+        self._blocks = []
+        self._maxes = []
+
+        # Keys added since defer() was called, not yet in a block
+        self._pending = []
+        self._deferred = False
+
+        self._len = 0
+
+    def __len__(self):
+        """
+        Retrieves the number of keys in the index.
+
+        Returns:
+            int: The number of keys
+        """
+
+        return self._len
+
+    def __iter__(self):
+        """
+        Iterates over every key in sorted order.
+
+        Returns:
+            iterator: The keys
+        """
+
+        for block in self._blocks:
+
+            yield from block
+
+    def add(self, key):
+        """
+        Adds a key. Keys must be unique and mutually comparable (e.g. (datetime, flightID) tuples).
+        Between defer() and flush() the key is only buffered.
+
+        Parameters:
+            key: The key to add
+
+        Returns:
+            None
+        """
+
+        self._len += 1
+
+        if self._deferred:
+
+            self._pending.append(key)
+
+        else:
+
+            self._insert(key)
+
+    def defer(self):
+        """
+        Starts buffering added keys instead of inserting them one at a time, for a bulk load.
+        The index must not be read until flush() is called.
+
+        Returns:
+            None
+        """
+
+        self._deferred = True
+
+    def flush(self):
+        """
+        Moves the buffered keys into the blocks and stops buffering. Call it before the bulk load
+        that called defer() gives up its exclusive access.
+
+        Returns:
+            None
+        """
+
+        self._deferred = False
+
+        self._merge()
+
+    def _merge(self):
+        """
+        Moves the buffered keys into the blocks: one at a time if they are few next to the keys already there,
+        otherwise by sorting everything once and cutting it into new blocks.
+
+        Returns:
+            None
+        """
+
+        pending = self._pending
+
+        if not pending:
+
+            return
+
+        self._pending = []
+
+        if self._blocks and len(pending) * 8 < self._len:
+
+            for key in pending:
+
+                self._insert(key)
+
+            return
+
+        # The blocks are already one sorted run, so this sort mostly costs sorting the new keys
+        keys = list(chain.from_iterable(self._blocks))
+        keys.extend(pending)
+        keys.sort()
+
+        self._blocks = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self._maxes = [block[-1] for block in self._blocks]
+
+    def _insert(self, key):
+        """
+        Inserts one key into its block, splitting the block if it grows too long.
+
+        Parameters:
+            key: The key to insert
+
+        Returns:
+            None
+        """
+
+        if not self._blocks:
+
+            self._blocks.append([key])
+            self._maxes.append(key)
+
+            return
+
+        i = bisect_left(self._maxes, key)
+
+        if i == len(self._maxes):
+
+            # A new largest key (the common case when flights are loaded in date order)
+            i -= 1
+
+            self._blocks[i].append(key)
+            self._maxes[i] = key
+
+        else:
+
+            insort(self._blocks[i], key)
+
+        block = self._blocks[i]
+
+        if len(block) > 2 * self.LOAD:
+
+            self._blocks.insert(i + 1, block[self.LOAD:])
+            self._maxes.insert(i + 1, block[-1])
+
+            del block[self.LOAD:]
+
+            self._maxes[i] = block[-1]
+
+    def remove(self, key):
+        """
+        Removes a key.
+
+        Parameters:
+            key: The key to remove
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the key is not in the index
+        """
+
+        self._merge()
+
+        i = bisect_left(self._maxes, key)
+
+        if i == len(self._maxes):
+
+            raise ValueError(f"{key!r} is not in the index.")
+
+        block = self._blocks[i]
+
+        j = bisect_left(block, key)
+
+        if j == len(block) or block[j] != key:
+
+            raise ValueError(f"{key!r} is not in the index.")
+
+        del block[j]
+
+        self._len -= 1
+
+        if not block:
+
+            del self._blocks[i]
+            del self._maxes[i]
+
+        elif j == len(block):
+
+            self._maxes[i] = block[-1]
+
+    def irange(self, low, high):
+        """
+        Iterates in sorted order over the keys k with low <= k < high, in O(log n + k).
+        For tuple keys, a one-element bound such as (start,) compares below every key starting with start.
+
+        Parameters:
+            low: The inclusive lower bound
+            high: The exclusive upper bound
+
+        Returns:
+            iterator: The keys in the range
+        """
+
+        i = bisect_left(self._maxes, low)
+
+        if i == len(self._maxes):
+
+            return
+
+        j = bisect_left(self._blocks[i], low)
+
+        for block in islice(self._blocks, i, None):
+
+            for k in range(j, len(block)):
+
+                if not block[k] < high:
+
+                    return
+
+                yield block[k]
+
+            j = 0
@@ -0,0 +1,694 @@
+﻿# ECED3410 - Group 3 Project
+# Alice Balser - B00954620
+# Connor McDonald - B00938421
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+from Repository import EPOCH, Repository
+
+
+class SqliteRepository(Repository):
+
+    # Columns a query can filter on, besides "year" (which filters on departureTs)
+    COLUMNS = {
+
+        "airline": "airline",
+        "pilotID": "pilotID",
+        "flightType": "flightType",
+        "aircraftModel": "aircraftModel"
+
+    }
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS flights (
+            seq INTEGER PRIMARY KEY,
+            flightID TEXT NOT NULL UNIQUE,
+            pilotID TEXT NOT NULL COLLATE NOCASE,
+            airline TEXT NOT NULL COLLATE NOCASE,
+            flightType TEXT NOT NULL COLLATE NOCASE,
+            aircraftModel TEXT NOT NULL COLLATE NOCASE,
+            departureTs INTEGER NOT NULL,
+            arrivalTs INTEGER NOT NULL,
+            passengers INTEGER,
+            cargoWeight REAL,
+            doc TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_pilotID ON flights (pilotID);
+        CREATE INDEX IF NOT EXISTS idx_airline ON flights (airline, departureTs);
+        CREATE INDEX IF NOT EXISTS idx_flightType ON flights (flightType);
+        CREATE INDEX IF NOT EXISTS idx_aircraftModel ON flights (aircraftModel, flightType);
+        CREATE INDEX IF NOT EXISTS idx_departureTs ON flights (departureTs);
+        CREATE INDEX IF NOT EXISTS idx_route ON flights (
+            json_extract(doc, '$.departureLocation') COLLATE NOCASE,
+            json_extract(doc, '$.arrivalLocation') COLLATE NOCASE
+        );
+    """
+
+    # The locations live only in the doc column; idx_route indexes these expressions
+    ORIGIN = "json_extract(doc, '$.departureLocation') COLLATE NOCASE"
+    DESTINATION = "json_extract(doc, '$.arrivalLocation') COLLATE NOCASE"
+
+    def __init__(self, filename="flybase.db"):
+        """
+        Initializes a Repository stored in a local SQLite file, creating the table and indexes if needed.
+        It has the same API as Repository; flybase.json stays available through
+        loadFromFile (import) and saveToFile/appendToFile (export).
+
+        Parameters:
+            filename (str): The path of the SQLite database file (":memory:" for a temporary database)
+
+        Returns:
+            None
+        """
+
+        self.conn = None
+
+        # Nesting depth of batches that defer the commit (e.g. a whole file import)
+        self._batch = 0
+
+        super().__init__()
+
+        self.conn = sqlite3.connect(filename)
+        self.conn.executescript(self.SCHEMA)
+
+    @property
+    def records(self):
+        """
+        Retrieves a read-only sequence view over the stored records, read from the database on demand.
+
+        Returns:
+            _SqliteRecordView: The stored records
+        """
+
+        return _SqliteRecordView(self)
+
+    @records.setter
+    def records(self, recs):
+        """
+        Replaces the stored records, validating each new record.
+
+        Parameters:
+            recs (list[dict]): The new records
+
+        Returns:
+            None
+        """
+
+        # Repository.__init__ resets the records before the database is opened; existing rows are kept
+        if self.conn is None:
+
+            return
+
+        self.conn.execute("DELETE FROM flights")
+
+        for rec in recs:
+
+            self.insert(rec)
+
+        self.conn.commit()
+
+    def _commit(self):
+        """
+        Commits the current transaction, unless a batch is in progress.
+
+        Returns:
+            None
+        """
+
+        if self._batch == 0:
+
+            self.conn.commit()
+
+    # ---------------------------------------------------------
+    # STORAGE
+    # ---------------------------------------------------------
+
+    def _row_values(self, rec, dates):
+        """
+        Computes the column values stored for a validated record.
+
+        Parameters:
+            rec (dict): The validated record
+            dates (tuple): The parsed (departure, arrival) dates of the record
+
+        Returns:
+            tuple: The values, in the order used by _add_record and _replace_record
+        """
+
+        return (
+
+            rec["flightID"],
+            str(rec["pilotID"]),
+            str(rec["airline"]),
+            str(rec["flightType"]),
+            str(rec["aircraftModel"]),
+            int((dates[0] - EPOCH).total_seconds()),
+            int((dates[1] - EPOCH).total_seconds()),
+            rec.get("passengers") if str(rec["flightType"]).lower() == "public" else None,
+            rec.get("cargoWeight") if str(rec["flightType"]).lower() == "cargo" else None,
+            json.dumps(rec)
+
+        )
+
+    def _flightID_taken(self, fid, ignore_rec=None):
+        """
+        Checks whether a flightID is already used by a stored record.
+        Stored records are read back as copies, so ignore_rec is matched by flightID.
+
+        Parameters:
+            fid (str): The flightID to check
+            ignore_rec (dict or None): A record to exclude during the check when updating
+
+        Returns:
+            bool: True if another stored record uses the flightID, otherwise False
+        """
+
+        row = self.conn.execute("SELECT 1 FROM flights WHERE flightID = ?", (fid,)).fetchone()
+
+        if row is None:
+
+            return False
+
+        return not (ignore_rec is not None and ignore_rec.get("flightID") == fid)
+
+    def _add_record(self, rec, dates):
+        """
+        Stores an already validated record as a new row.
+
+        Parameters:
+            rec (dict): The record to store
+            dates (tuple): The parsed (departure, arrival) dates of the record
+
+        Returns:
+            None
+        """
+
+        self.conn.execute(
+
+            "INSERT INTO flights (flightID, pilotID, airline, flightType, aircraftModel, "
+            "departureTs, arrivalTs, passengers, cargoWeight, doc) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self._row_values(rec, dates)
+
+        )
+
+        self._commit()
+
+    def _replace_record(self, old_rec, new_rec, dates):
+        """
+        Overwrites the row of a stored record with already validated values.
+        The caller's copy of the record is updated too, like the dict backend does.
+
+        Parameters:
+            old_rec (dict): The stored record (or a copy of it)
+            new_rec (dict): The validated new field values
+            dates (tuple): The parsed (departure, arrival) dates of new_rec
+
+        Returns:
+            None
+        """
+
+        self.conn.execute(
+
+            "UPDATE flights SET flightID = ?, pilotID = ?, airline = ?, flightType = ?, aircraftModel = ?, "
+            "departureTs = ?, arrivalTs = ?, passengers = ?, cargoWeight = ?, doc = ? WHERE flightID = ?",
+            self._row_values(new_rec, dates) + (old_rec["flightID"],)
+
+        )
+
+        self._commit()
+
+        old_rec.clear()
+        old_rec.update(new_rec)
+
+    def _remove_record(self, rec):
+        """
+        Deletes the row of a stored record.
+
+        Parameters:
+            rec (dict): The stored record (or a copy of it)
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the record is not stored, like list.remove
+        """
+
+        cur = self.conn.execute("DELETE FROM flights WHERE flightID = ?", (rec["flightID"],))
+
+        self._commit()
+
+        if cur.rowcount == 0:
+
+            raise ValueError("Record is not in the Repository.")
+
+    # ---------------------------------------------------------
+    # LOOKUPS
+    # ---------------------------------------------------------
+
+    def getByFlightID(self, fid):
+        """
+        Retrieves a record matching the given flightID.
+
+        Parameters:
+            fid (str): The flightID to search for
+
+        Returns:
+            dict or None: A copy of the matching record, or None if not found
+        """
+
+        row = self.conn.execute("SELECT doc FROM flights WHERE flightID = ?", (fid,)).fetchone()
+
+        return json.loads(row[0]) if row is not None else None
+
+    def parsedDates(self, rec):
+        """
+        Retrieves the parsed departure and arrival dates of a record, from the timestamp columns when the record is stored.
+
+        Parameters:
+            rec (dict): The record whose dates are needed
+
+        Returns:
+            tuple[datetime, datetime]: The (departure, arrival) dates
+        """
+
+        row = self.conn.execute(
+
+            "SELECT departureTs, arrivalTs FROM flights WHERE flightID = ?", (rec["flightID"],)
+
+        ).fetchone()
+
+        if row is None:
+
+            return super().parsedDates(rec)
+
+        return (EPOCH + timedelta(seconds=row[0]), EPOCH + timedelta(seconds=row[1]))
+
+    # ---------------------------------------------------------
+    # PUSHED-DOWN QUERIES
+    # ---------------------------------------------------------
+
+    def _where(self, criteria):
+        """
+        Builds a SQL WHERE clause for the given field values. Text fields compare with NOCASE,
+        and "year" becomes a departureTs range so it can use the timestamp index.
+
+        Parameters:
+            criteria (dict): Field/value pairs, where each field is one of INDEXED_FIELDS
+
+        Returns:
+            tuple[str, list] or None: The clause and its parameters, or None if some value can never match
+        """
+
+        clauses = []
+        params = []
+
+        for field, value in criteria.items():
+
+            if field == "year":
+
+                value = str(value)
+
+                if not value.isdigit() or not 1 <= int(value) <= 9998:
+
+                    return None
+
+                start = datetime(int(value), 1, 1)
+                end = datetime(int(value) + 1, 1, 1)
+
+                clauses.append("departureTs >= ? AND departureTs < ?")
+                params.extend([int((start - EPOCH).total_seconds()), int((end - EPOCH).total_seconds())])
+
+            else:
+
+                clauses.append(f"{self.COLUMNS[field]} = ?")
+                params.append(str(value))
+
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def findWhere(self, **criteria):
+        """
+        Retrieves all records matching every given field value, filtered in SQL.
+
+        Parameters:
+            **criteria: Field/value pairs, where each field is one of INDEXED_FIELDS
+
+        Returns:
+            list[dict]: Copies of the matching records
+        """
+
+        where = self._where(criteria)
+
+        if where is None:
+
+            return []
+
+        clause, params = where
+
+        return [json.loads(doc) for doc, in self.conn.execute(f"SELECT doc FROM flights{clause} ORDER BY seq", params)]
+
+    def countWhere(self, **criteria):
+        """
+        Counts all records matching every given field value, in SQL.
+
+        Parameters:
+            **criteria: Field/value pairs, where each field is one of INDEXED_FIELDS
+
+        Returns:
+            int: The number of matching records
+        """
+
+        where = self._where(criteria)
+
+        if where is None:
+
+            return 0
+
+        clause, params = where
+
+        return self.conn.execute(f"SELECT COUNT(*) FROM flights{clause}", params).fetchone()[0]
+
+    def modelAverage(self, model, field):
+        """
+        Computes the average of a numeric field for one aircraft model, in SQL.
+
+        Parameters:
+            model (str): The aircraft model name (case-insensitive)
+            field (str): One of AGGREGATED_FIELDS ("passengers" or "cargoWeight")
+
+        Returns:
+            float or None: The average value, or None if no record of that model has the field
+        """
+
+        column = {"passengers": "passengers", "cargoWeight": "cargoWeight"}[field]
+
+        return self.conn.execute(
+
+            f"SELECT AVG({column}) FROM flights WHERE aircraftModel = ? AND flightType = ?",
+            (str(model), self.AGGREGATED_FIELDS[field])
+
+        ).fetchone()[0]
+
+    def findBetween(self, start, end, **criteria):
+        """
+        Retrieves the records departing in [start, end), using the departureTs index.
+
+        Parameters:
+            start (datetime): The inclusive start of the window
+            end (datetime): The exclusive end of the window
+            **criteria: Further field/value pairs the records must match, as for findWhere
+
+        Returns:
+            list[dict]: Copies of the matching records, in departure order (ties by flightID)
+        """
+
+        where = self._where(criteria)
+
+        if where is None:
+
+            return []
+
+        clause, params = where
+
+        clause = (clause + " AND" if clause else " WHERE") + " departureTs >= ? AND departureTs < ?"
+        params = params + [(start - EPOCH).total_seconds(), (end - EPOCH).total_seconds()]
+
+        return [
+
+            json.loads(doc) for doc, in
+            self.conn.execute(f"SELECT doc FROM flights{clause} ORDER BY departureTs, flightID", params)
+
+        ]
+
+    # ---------------------------------------------------------
+    # ROUTE QUERIES
+    # ---------------------------------------------------------
+
+    def findRoute(self, origin, destination):
+        """
+        Retrieves all flights from one location to another, using the route index.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            list[dict]: Copies of the matching records
+        """
+
+        return [
+
+            json.loads(doc) for doc, in self.conn.execute(
+                f"SELECT doc FROM flights WHERE {self.ORIGIN} = ? AND {self.DESTINATION} = ? ORDER BY seq",
+                (str(origin), str(destination))
+            )
+
+        ]
+
+    def routeCount(self, origin, destination):
+        """
+        Counts the flights from one location to another, using the route index.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            int: The number of flights on the route
+        """
+
+        return self.conn.execute(
+
+            f"SELECT COUNT(*) FROM flights WHERE {self.ORIGIN} = ? AND {self.DESTINATION} = ?",
+            (str(origin), str(destination))
+
+        ).fetchone()[0]
+
+    def routeBlockTime(self, origin, destination):
+        """
+        Computes the average block time of a route in SQL.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+            destination (str): The arrival location (case-insensitive)
+
+        Returns:
+            float or None: The average block time in minutes, or None if no flight flies the route
+        """
+
+        seconds = self.conn.execute(
+
+            f"SELECT AVG(arrivalTs - departureTs) FROM flights WHERE {self.ORIGIN} = ? AND {self.DESTINATION} = ?",
+            (str(origin), str(destination))
+
+        ).fetchone()[0]
+
+        return seconds / 60 if seconds is not None else None
+
+    def routesFrom(self, origin):
+        """
+        Counts the flights from one location to each destination served from it, in SQL.
+
+        Parameters:
+            origin (str): The departure location (case-insensitive)
+
+        Returns:
+            dict: destination -> number of flights, busiest first
+        """
+
+        rows = self.conn.execute(
+
+            f"SELECT MIN({self.DESTINATION}), COUNT(*) FROM flights WHERE {self.ORIGIN} = ? GROUP BY {self.DESTINATION}",
+            (str(origin),)
+
+        )
+
+        return dict(sorted(((str(d), n) for d, n in rows), key=lambda item: (-item[1], item[0])))
+
+    def busiestAirports(self, n=10):
+        """
+        Ranks locations by traffic (departures plus arrivals), in SQL.
+
+        Parameters:
+            n (int or None): How many locations to return, None for all
+
+        Returns:
+            list[tuple[str, int, int]]: (location, departures, arrivals), busiest first (ties by name)
+        """
+
+        traffic = {}
+
+        for column, slot in ((self.ORIGIN, 1), (self.DESTINATION, 2)):
+
+            for label, flights in self.conn.execute(f"SELECT MIN({column}), COUNT(*) FROM flights GROUP BY {column}"):
+
+                traffic.setdefault(str(label).lower(), [str(label), 0, 0])[slot] += flights
+
+        ranked = sorted(traffic.values(), key=lambda e: (-(e[1] + e[2]), e[0]))
+
+        return [tuple(entry) for entry in ranked[:n]]
+
+    # ---------------------------------------------------------
+    # JSON IMPORT
+    # ---------------------------------------------------------
+
+    def loadFromFile(self, filename="flybase.json", **kwargs):
+        """
+        Imports flight records from a JSON file in a single transaction.
+
+        Parameters:
+            filename (str): The path to the JSON file to load
+            **kwargs: Passed on to Repository.loadFromFile (e.g. stream=True)
+
+        Returns:
+            int: The number of successfully inserted records
+        """
+
+        self._batch += 1
+
+        try:
+
+            return super().loadFromFile(filename, **kwargs)
+
+        finally:
+
+            self._batch -= 1
+
+            self._commit()
+
+    def loadSnapshot(self, filename="flybase.snap", **kwargs):
+        """
+        Imports flight records from a binary snapshot in a single transaction.
+
+        Parameters:
+            filename (str): The path of the snapshot file
+            **kwargs: Passed on to Repository.loadSnapshot (e.g. trusted=False)
+
+        Returns:
+            int: The number of records loaded
+        """
+
+        self._batch += 1
+
+        try:
+
+            return super().loadSnapshot(filename, **kwargs)
+
+        finally:
+
+            self._batch -= 1
+
+            self._commit()
+
+    def loadPartitions(self, folder="flybase.parts", **kwargs):
+        """
+        Imports flight records from a partition folder in a single transaction.
+
+        Parameters:
+            folder (str): The partition folder
+            **kwargs: Passed on to Repository.loadPartitions (e.g. year=2024)
+
+        Returns:
+            int: The number of successfully inserted records
+        """
+
+        self._batch += 1
+
+        try:
+
+            return super().loadPartitions(folder, **kwargs)
+
+        finally:
+
+            self._batch -= 1
+
+            self._commit()
+
+    def close(self):
+        """
+        Closes the database connection.
+
+        Returns:
+            None
+        """
+
+        self.conn.close()
+
+
+class _SqliteRecordView:
+
+    def __init__(self, repo):
+        """
+        Initializes a read-only view over the records of a SqliteRepository.
+
+        Parameters:
+            repo (SqliteRepository): The Repository to view
+
+        Returns:
+            None
+        """
+
+        self.repo = repo
+
+    def __len__(self):
+        """
+        Retrieves the number of stored records.
+
+        Returns:
+            int: The number of records
+        """
+
+        return self.repo.conn.execute("SELECT COUNT(*) FROM flights").fetchone()[0]
+
+    def __iter__(self):
+        """
+        Iterates over copies of the stored records, streaming them from the database.
+
+        Returns:
+            iterator[dict]: The records in insertion order
+        """
+
+        for doc, in self.repo.conn.execute("SELECT doc FROM flights ORDER BY seq"):
+
+            yield json.loads(doc)
+
+    def __getitem__(self, index):
+        """
+        Retrieves a record (or a list of records for a slice) by position.
+
+        Parameters:
+            index (int or slice): The position(s) to retrieve
+
+        Returns:
+            dict or list[dict]: Copies of the selected records
+        """
+
+        if isinstance(index, slice) and index.step in (None, 1) and (index.start or 0) >= 0 and (index.stop is None or index.stop >= 0):
+
+            # A forward slice (e.g. one page of a table) reads only its own rows
+            start = index.start or 0
+            limit = -1 if index.stop is None else max(index.stop - start, 0)
+
+            return [json.loads(doc) for doc, in self.repo.conn.execute(
+
+                "SELECT doc FROM flights ORDER BY seq LIMIT ? OFFSET ?", (limit, start)
+
+            )]
+
+        if isinstance(index, slice):
+
+            return list(self)[index]
+
+        if index < 0:
+
+            index += len(self)
+
+        row = self.repo.conn.execute("SELECT doc FROM flights ORDER BY seq LIMIT 1 OFFSET ?", (index,)).fetchone()
+
+        if index < 0 or row is None:
+
+            raise IndexError("record index out of range")
+
+        return json.loads(row[0])
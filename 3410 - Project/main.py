@@ -2,9 +2,29 @@
 # Alice Balser - B00954620
 # Connor McDonald - B00938421
 
+import sys
 
 from Client import Client
+from Journal import Journal
+from LazyRepository import LazyRepository
+from PartitionedRepository import PartitionedRepository
+from Repository import Repository
 
 if __name__ == "__main__":
-    app = Client()
+    # "python main.py --journal" appends changes to flybase.json.log instead of rewriting flybase.json
+    # "python main.py --check-conflicts" rejects flights that double-book an aircraft or pilot
+    # "python main.py --partitions" keeps the database in flybase.parts, one file per year and airline
+    # (split from flybase.json on the first load), and saves only the files that changed
+    # "python main.py --lazy" keeps only the indexed fields in memory and reads full records from flybase.json on demand
+    repo = LazyRepository() if "--lazy" in sys.argv else Repository()
+    repo.setConflictCheck("--check-conflicts" in sys.argv)
+
+    if "--partitions" in sys.argv:
+
+        app = Client(repo=PartitionedRepository(repo))
+
+    else:
+
+        app = Client(repo=repo, journal=Journal() if "--journal" in sys.argv else None)
+
     app.mainMenu()
\ No newline at end of file